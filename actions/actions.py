@@ -126,6 +126,7 @@ class CreateNodeAction(AbstractAction):
 
         # Deactivate node:
         cref.node_db[nref] = False      # Mark node as deactivated (i.e. False) in the canvas' database
+        cref.sync_state(nref, False)
         nref.setVisible(False)          # Toggle-off visibility
         nref.blockSignals(True)         # Block signals
 
@@ -142,6 +143,7 @@ class CreateNodeAction(AbstractAction):
 
         # Re-activate node:
         cref.node_db[nref] = True       # Mark node as reactivated (i.e. False) in the canvas' database
+        cref.sync_state(nref, True)
         nref.blockSignals(False)        # Toggle-on visibility
         nref.setVisible(True)           # Unblock signals
 
@@ -220,9 +222,11 @@ class RemoveNodeAction(AbstractAction):
                 handle.conjugate().free()                   # Free the handle's conjugate
                 handle.connector().setVisible(False)        # Toggle-off connector's visibility
                 cref.conn_db[handle.connector()] = False    # Mark connector as deactivated in the canvas' database
+                cref.sync_state(handle.connector(), False)
 
         # Deactivate node:
         cref.node_db[nref] = False      # Mark node as deactivated in the canvas' database
+        cref.sync_state(nref, False)
         nref.setVisible(False)          # Toggle-off visibility
         nref.blockSignals(True)         # Block signals
 
@@ -248,9 +252,11 @@ class RemoveNodeAction(AbstractAction):
                 handle.conjugate().lock(handle, handle.connector()) # Lock the handle's conjugate
                 handle.connector().setVisible(True)                 # Toggle-on connector's visibility  
                 cref.conn_db[handle.connector()] = True             # Mark connector as reactivated in the canvas' database
+                cref.sync_state(handle.connector(), True)
 
         # Reactivate node:
         cref.node_db[nref] = True
+        cref.sync_state(nref, True)
         nref.blockSignals(False)
         nref.setVisible(True)
 
@@ -323,6 +329,7 @@ class CreateStreamAction(AbstractAction):
 
         # Deactivate terminal:
         cref.term_db[tref] = False
+        cref.sync_state(tref, False)
         tref.setVisible(False)
         tref.blockSignals(True)
 
@@ -349,6 +356,7 @@ class CreateStreamAction(AbstractAction):
 
         # Reactivate terminal:
         cref.term_db[tref] = True
+        cref.sync_state(tref, True)
         tref.blockSignals(False)
         tref.setVisible(True)
 
@@ -414,6 +422,7 @@ class RemoveStreamAction(AbstractAction):
 
         # Deactivate terminal:
         cref.term_db[tref] = False
+        cref.sync_state(tref, False)
         tref.setVisible(False)
         tref.blockSignals(True)
 
@@ -440,6 +449,7 @@ class RemoveStreamAction(AbstractAction):
 
         # Reactivate terminal:
         cref.term_db[tref] = True
+        cref.sync_state(tref, True)
         tref.blockSignals(False)
         tref.setVisible(True)
 
@@ -466,6 +476,7 @@ class RemoveStreamAction(AbstractAction):
 
         # Deactivate terminal:
         cref.term_db[tref] = False
+        cref.sync_state(tref, False)
         tref.setVisible(False)
         tref.blockSignals(True)
 
@@ -503,6 +514,7 @@ class CreateHandleAction(AbstractAction):
             nref[href.eclass][href] == EntityState.HIDDEN
         ):
             nref[href.eclass].pop(href, None)   # Remove handle from node's database
+            nref.release_huid(href)             # Free the handle's symbol
             href.deleteLater()
 
             # Log:
@@ -526,6 +538,7 @@ class CreateHandleAction(AbstractAction):
         href.setVisible(False)
         href.blockSignals(True)
         nref[href.eclass][href] = EntityState.HIDDEN
+        if nref.scene(): nref.scene().sync_state(href, False)
 
     # Redo operation:
     def redo(self)  -> None:
@@ -542,6 +555,7 @@ class CreateHandleAction(AbstractAction):
         href.blockSignals(False)
         href.setVisible(True)
         nref[href.eclass][href] = EntityState.ACTIVE
+        if nref.scene(): nref.scene().sync_state(href, True)
 
 # Class RemoveHandleAction: For handle operations (delete, undo/redo)
 class RemoveHandleAction(AbstractAction):
@@ -577,6 +591,7 @@ class RemoveHandleAction(AbstractAction):
             nref[href.eclass][href] != EntityState.ACTIVE
         ):
             nref[href.eclass].pop(href, None)   # Remove handle from node's database
+            nref.release_huid(href)             # Free the handle's symbol
             href.free(delete_connector = True)  # Delete handle's connector
             href.deleteLater()                  # Delete handle
 
@@ -609,6 +624,7 @@ class RemoveHandleAction(AbstractAction):
 
         # Deactivate handle:
         nref[href.eclass][href] = EntityState.HIDDEN
+        if nref.scene(): nref.scene().sync_state(href, False)
 
     # Undo operation:
     def undo(self)  -> None:
@@ -634,6 +650,7 @@ class RemoveHandleAction(AbstractAction):
         href.blockSignals(False)
         href.setVisible(True)
         nref[href.eclass][href] = EntityState.ACTIVE
+        if nref.scene(): nref.scene().sync_state(href, True)
 
     # Redo operation:
     def redo(self)  -> None:
@@ -660,6 +677,7 @@ class RemoveHandleAction(AbstractAction):
         href.setVisible(False)
         href.blockSignals(True)
         nref[href.eclass][href] = EntityState.HIDDEN
+        if nref.scene(): nref.scene().sync_state(href, False)
 
 # Class ConnectHandleAction: For connector operations (create, undo/redo)
 class ConnectHandleAction(AbstractAction):
@@ -717,6 +735,7 @@ class ConnectHandleAction(AbstractAction):
         lref.setVisible(False)
         lref.blockSignals(True)
         cref.conn_db[lref] = False
+        cref.sync_state(lref, False)
 
     def redo(self):
 
@@ -736,6 +755,7 @@ class ConnectHandleAction(AbstractAction):
         lref.setVisible(True)
         lref.blockSignals(False)
         cref.conn_db[lref] = True
+        cref.sync_state(lref, True)
 
 # Class DisconnectHandleAction: For connector operations (delete, undo/redo)
 class DisconnectHandleAction(AbstractAction):
@@ -790,6 +810,7 @@ class DisconnectHandleAction(AbstractAction):
 
         # Deactivate connector:
         cref.conn_db.pop(lref, None)
+        cref.sync_state(lref, False)
         lref.setVisible(False)
         lref.blockSignals(True)
 
@@ -811,5 +832,6 @@ class DisconnectHandleAction(AbstractAction):
         lref.setVisible(True)
         lref.blockSignals(False)
         cref.conn_db[lref] = True
+        cref.sync_state(lref, True)
 
     def redo(self): self.execute()
\ No newline at end of file
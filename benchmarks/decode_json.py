@@ -0,0 +1,118 @@
+"""
+Times `JsonLib.decode_json` on generated schematics of increasing size, up to 20k connectors. Import must scale
+linearly in the number of connectors: the time per connector should stay flat across sizes. Each size is imported in a
+fresh process, so canvases of earlier sizes don't hold on to memory (20k connectors need about 4 GB).
+
+Usage:
+    python benchmarks/decode_json.py [--sizes 2500 5000 10000 20000] [--handles 25]
+"""
+
+import argparse
+import contextlib
+import copy
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))     # Resources are loaded relative to the root
+sys.path.insert(0, os.getcwd())
+
+from PyQt6.QtCore    import QPointF, QRectF
+from PyQt6.QtWidgets import QApplication
+
+
+# Function template: Serializes a node with `_handles` inputs and outputs
+def template(_handles: int) -> dict:
+
+    from custom              import EntityClass
+    from tabs.schema.canvas  import Canvas
+    from tabs.schema.jsonlib import JsonLib
+
+    canvas = Canvas(QRectF(0, 0, 1000, 1000))
+    node   = canvas.create_node("Node", QPointF(0, 0), False)
+    node.resize(40 * _handles)
+
+    for index in range(_handles):
+        node.create_handle(QPointF(-95, 40 + 40 * index), EntityClass.INP)
+        node.create_handle(QPointF(+95, 40 + 40 * index), EntityClass.OUT)
+
+    return JsonLib.serialize(node)
+
+
+# Function schematic: A chain of nodes, each output connected to the matching input of the next node
+def schematic(_connectors: int, _node: dict) -> str:
+
+    inputs  = [variable["variable-uid"] for variable in _node["variables"] if variable["variable-eclass"].endswith("INP")]
+    outputs = [variable["variable-uid"] for variable in _node["variables"] if variable["variable-eclass"].endswith("OUT")]
+    count   = -(-_connectors // len(outputs)) + 1
+
+    nodes = list()
+    for index in range(count):
+        node = copy.deepcopy(_node)
+        node["node-uid"]      = f"N{index:04d}"
+        node["node-scenepos"] = {"x": 400.0 * (index % 100), "y": 1200.0 * (index // 100)}
+        nodes.append(node)
+
+    connectors = [
+        {
+            "origin-parent-uid" : f"N{index // len(outputs):04d}",
+            "origin-uid"        : outputs[index % len(outputs)],
+            "target-parent-uid" : f"N{index // len(outputs) + 1:04d}",
+            "target-uid"        : inputs[index % len(inputs)]
+        }
+        for index in range(_connectors)
+    ]
+
+    return json.dumps({"SCHEMA": 2, "NODES": nodes, "TERMINALS": [], "CONNECTORS": connectors})
+
+
+# Function measure: Imports one schematic and prints its timing
+def measure(_size: int, _handles: int):
+
+    application = QApplication(sys.argv)
+
+    from tabs.schema.canvas  import Canvas
+    from tabs.schema.jsonlib import JsonLib
+
+    code   = schematic(_size, template(_handles))
+    canvas = Canvas(QRectF(0, 0, 1000, 1000))
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        JsonLib.decode_json(code, canvas, True)
+
+    elapsed = time.perf_counter() - start
+    created = sum(canvas.conn_db.values())
+    assert created == _size, f"{created} of {_size} connectors created"
+
+    print(f"{_size:>10} {len(canvas.node_db):>6} {elapsed:>9.2f} {1e6 * elapsed / _size:>13.1f}", flush=True)
+
+    # Skip tearing down the scene item by item, which takes longer than the import itself:
+    os._exit(0)
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2500, 5000, 10000, 20000])
+    parser.add_argument("--handles", type=int, default=25, help="inputs and outputs per node")
+    parser.add_argument("--single", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if  args.single:
+        measure(args.sizes[0], args.handles)
+        return
+
+    print(f"{'connectors':>10} {'nodes':>6} {'seconds':>9} {'us/connector':>13}", flush=True)
+    for size in args.sizes:
+        subprocess.run([sys.executable, __file__, "--single", "--sizes", str(size), "--handles", str(args.handles)],
+                       stderr=subprocess.DEVNULL,
+                       check=True)
+
+
+if __name__ == "__main__":
+    main()
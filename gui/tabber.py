@@ -22,6 +22,7 @@ from PyQt6.QtWidgets import (
 
 from tabs.schema.viewer import Viewer
 from tabs.schema.canvas import SaveState
+from tabs.optima.session import sessions
 from custom import Dialog
 
 class TabBar(QTabBar):
@@ -128,7 +129,8 @@ class Tabber(QTabWidget):
         _viewer.close()
 
         if _viewer.closed:
-            super().removeTab(_index)   # Call super-class implementation:
+            super().removeTab(_index)               # Call super-class implementation:
+            sessions.shutdown(_viewer.canvas.uid)   # Shut down the canvas' warm AMPL session
 
     @pyqtSlot(int)
     def rename_tab(self, _index):
@@ -16,6 +16,7 @@ from .tabber import Tabber
 from .navbar import NavBar
 
 from tabs.optima.optimizer import Optimizer
+from tabs.optima.session import sessions
 from tabs.database.manager import DataManager
 # from tabs.sheets.manager import Manager
 
@@ -59,6 +60,9 @@ class Gui(QMainWindow):
         self._navbar.sig_save_schema.connect(self._tabber.export_schema)
         self._navbar.sig_show_widget.connect(self.show_widget)
 
+        # Re-solve data-table edits in the optimizer's live mode:
+        self._data.sig_data_committed.connect(self._optima.on_data_committed)
+
         # Initialize menu:
         self._init_menubar()
         self.showMaximized()
@@ -121,4 +125,7 @@ class Gui(QMainWindow):
             event.accept()
 
         if _dialog_code == QMessageBox.StandardButton.No:       event.accept()
-        if _dialog_code == QMessageBox.StandardButton.Cancel:   event.ignore()
\ No newline at end of file
+        if _dialog_code == QMessageBox.StandardButton.Cancel:   event.ignore()
+
+        # Shut down warm AMPL sessions:
+        if event.isAccepted():  sessions.shutdown()
\ No newline at end of file
@@ -158,6 +158,10 @@ class EqnView(QListWidget):
         self.addItem(item)
         self._node()[EntityClass.EQN].append(equation)
 
+        # Push the node's equations to the flow-graph:
+        if isinstance(self._node().scene(), Canvas):
+            self._node().scene().sync_node(self._node())
+
     # Fetch and display node's equations
     def fetch(self):
 
@@ -1,5 +1,6 @@
 import logging
 
+from PyQt6.QtCore import pyqtSignal
 from PyQt6.QtWidgets import QWidget, QGridLayout
 
 from tabs.schema.canvas import Canvas
@@ -9,6 +10,9 @@ from tabs.database.tree import Tree
 
 class DataManager(QWidget):
 
+    # Signals:
+    sig_data_committed = pyqtSignal(object)     # Emitted with the node whose table-data was committed
+
     # Initializer:
     def __init__(self, canvas: Canvas, parent: QWidget | None):
 
@@ -43,6 +47,7 @@ class DataManager(QWidget):
 
         # Connect signals:
         self._sheets.sig_table_modified.connect(self._trview.show_modification_status)
+        self._sheets.sig_table_committed.connect(self.sig_data_committed.emit)
 
     # Clear data:
     def clear(self):
@@ -7,11 +7,13 @@ from PyQt6.QtWidgets import QMenu, QTableWidget, QWidget, QHeaderView, QTableWid
 from custom.dialog import Dialog
 from custom.entity import Entity, EntityClass, EntityState
 from tabs.schema.graph import Node, Handle
+from tabs.schema.canvas import Canvas
 
 class Table(QTableWidget):
 
     # Signals:
-    sig_table_modified = pyqtSignal(Node, bool)
+    sig_table_modified  = pyqtSignal(Node, bool)
+    sig_table_committed = pyqtSignal(Node)      # Emitted after the table's data has been pushed to the node
 
     # Initializer:
     def __init__(self, parent: QWidget | None, **kwargs):
@@ -302,6 +304,10 @@ class Table(QTableWidget):
                     conjugate.minimum = self.cell_data(row, 5)
                     conjugate.maximum = self.cell_data(row, 6)
 
+                    # Push the conjugate's data to the flow-graph:
+                    if isinstance(conjugate.scene(), Canvas):
+                        conjugate.scene().sync_entity(conjugate)
+
             # Update the node's parameters:
             else:
                 entity = Entity()
@@ -318,9 +324,14 @@ class Table(QTableWidget):
                 # Add parameter to dictionary:
                 self._node()[EntityClass.PAR, entity] = EntityState.ACTIVE
 
+        # Push the node's data to the flow-graph:
+        if isinstance(self._node().scene(), Canvas):
+            self._node().scene().sync_node(self._node())
+
         # Notify manager:
         self._unsaved = False
         self.sig_table_modified.emit(self._node(), self._unsaved)
+        self.sig_table_committed.emit(self._node())
 
     def cell_data(self, row, column):
         item = self.item(row, column)
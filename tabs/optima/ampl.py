@@ -1,22 +1,34 @@
+import numpy as np
+
+from dataclasses import dataclass, field
+
 from PyQt6.QtCore import pyqtSignal, QObject
-from amplpy import AMPL, AMPLException, OutputHandler, ErrorHandler
+from amplpy import AMPL, OutputHandler, ErrorHandler
 
 class AMPLOutput(OutputHandler):
 
     def __init__(self):
         self.__output  = None
         self.__history = list()
+        self.listener  = None   # Optional callable, receives each message as it arrives
 
     def output(self, kind, msg):
         self.__output = msg
         self.__history.append(msg)
 
+        if self.listener is not None:
+            self.listener(msg)
+
     def get_output(self):
         return self.__output
 
     def get_history(self):
         return "".join(self.__history)
 
+    def clear(self):
+        self.__output = None
+        self.__history.clear()
+
 class AMPLErrors(ErrorHandler):
 
     def __init__(self):
@@ -28,65 +40,75 @@ class AMPLErrors(ErrorHandler):
     def get_error(self):
         return "".join(self.__error)
 
-class AMPLEngine:
+    def clear(self):
+        self.__error.clear()
 
-    # Initializer:
-    def __init__(self):
+# Class Solution: Columnar results of a solve
+@dataclass
+class Solution:
+    """
+    Results of a solve, stored column-wise: one array of symbols and one float64-array of values each for the
+    variables, parameters and objectives. `timing` holds the wall-clock time (seconds) of each stage of the run.
+    """
 
-        # Initialize base-class
-        super().__init__()
+    var_symbols: np.ndarray
+    var_values : np.ndarray
+    par_symbols: np.ndarray
+    par_values : np.ndarray
+    obj_symbols: np.ndarray
+    obj_values : np.ndarray
+    timing     : dict = field(default_factory=dict)     # Stage ("eval", "solve", "extract") -> seconds
 
-        # Instantiate an AMPL engine:
-        self.__ampl   = AMPL()
-        self.__ampl.set_option("objective_precision", 3)
-        self.__ampl.set_option("solution_precision" , 3)
-        self.__ampl.set_option("display_precision"  , 3)
+    @staticmethod
+    def from_dicts(_var: dict, _par: dict, _obj: dict, _timing: dict | None = None):
 
-        self.__output = AMPLOutput()
-        self.__errors = AMPLErrors()
-        self.__ampl.setOutputHandler(self.__output)
-        self.__ampl.setErrorHandler (self.__errors)
+        def columns(_dict):
+            return np.array(list(_dict.keys()), dtype=object), np.fromiter(_dict.values(), np.float64, len(_dict))
 
-    # This function runs the AMPL optimization engine:
-    def optimize(self, statements: str | None):
+        return Solution(*columns(_var), *columns(_par), *columns(_obj), dict(_timing or {}))
 
-        if not bool(statements):
-            return None
+    @property
+    def var_dict(self) -> dict:     return dict(zip(self.var_symbols.tolist(), self.var_values.tolist()))
 
-        try:
-            self.__ampl.eval(statements)
-            self.__ampl.solve(solver='ipopt', verbose=True)
+    @property
+    def par_dict(self) -> dict:     return dict(zip(self.par_symbols.tolist(), self.par_values.tolist()))
 
-            if self.__ampl.solve_result != 'solved':
-                return None
+    @property
+    def obj_dict(self) -> dict:     return dict(zip(self.obj_symbols.tolist(), self.obj_values.tolist()))
 
-            var_data = dict()
-            par_data = dict()
-            obj_data = dict()
 
-            for var, var_entity in self.__ampl.get_variables():
-                var_data[var] = var_entity.value()
+# Function extract: Bulk-retrieval of a solution
+def extract(_ampl: AMPL, _parameters: dict) -> Solution:
+    """
+    Retrieve all variable- and objective-values with one query each, through AMPL's generic synonyms
+    (`_varname`/`_var`, `_objname`/`_obj`), instead of one round-trip per entity.
 
-            for par, par_entity in self.__ampl.get_parameters():
-                par_data[par] = par_entity.value()
+    Parameters:
+        _ampl (AMPL): The AMPL instance holding the solved model.
+        _parameters (dict): Parameter-symbol -> value, as loaded into the model (parameters are not changed by a
+            solve, so they are not queried).
 
-            for var, obj_entity in self.__ampl.get_objectives():
-                obj_data[var] = obj_entity.value()
+    Returns:
+        Solution: The columnar results.
+    """
 
-            return {"var_dict": var_data, "par_dict": par_data, "obj_dict": obj_data}
+    def query(_names: str, _values: str, _count: str):
 
-        except AMPLException as ampl_exception:
-            self.__errors.error(str(ampl_exception))
-            print(f"{ampl_exception}")
+        if  int(_ampl.get_value(_count)) == 0:
+            return np.empty(0, dtype=object), np.empty(0, dtype=np.float64)
 
-    @property
-    def result(self):
-        return self.__ampl.solve_result
+        rows = _ampl.get_data(_names, _values).to_list()    # (index, name, value) per row
+        return (
+            np.array([row[1] for row in rows], dtype=object),
+            np.fromiter((row[2] for row in rows), np.float64, len(rows))
+        )
 
-    @property
-    def output(self):
-        return self.__output.get_history()
+    var_symbols, var_values = query("_varname", "_var", "_nvars")
+    obj_symbols, obj_values = query("_objname", "_obj", "_nobjs")
 
-    @property
-    def error(self):
-        return self.__errors.get_error()
\ No newline at end of file
+    return Solution(var_symbols,
+                    var_values,
+                    np.array(list(_parameters.keys()), dtype=object),
+                    np.fromiter(_parameters.values(), np.float64, len(_parameters)),
+                    obj_symbols,
+                    obj_values)
@@ -0,0 +1,142 @@
+import os
+import json
+import time
+import hashlib
+import tempfile
+
+import numpy as np
+
+from tabs.optima.ampl import Solution
+from tabs.optima.model import fmt
+from tabs.optima.script import PARAM_STMT, VAR_STMT, OBJ_STMT, statements
+
+
+# Function canonical: Canonical form of an AMPL script
+def canonical(_script: str, _values: dict | None = None) -> str:
+    """
+    Return a canonical form of a script: comments and redundant whitespace are removed, parameters are declared with
+    their current value (`_values` takes precedence over the script's defaults), and declarations and constraints are
+    sorted. Objectives keep their order, since the first one is the one solved. Scripts that differ only in layout or
+    in the order of their declarations have the same canonical form.
+    """
+
+    _values = _values or dict()
+    par, var, obj, con = list(), list(), list(), list()
+
+    for statement in statements(_script):
+
+        if  match := PARAM_STMT.match(statement):
+            symbol = match.group(1)
+            value  = fmt(_values[symbol]) if symbol in _values else match.group(2)
+            par.append(f"param {symbol} default {value}" if value is not None else f"param {symbol}")
+
+        elif VAR_STMT.match(statement):     var.append(statement)
+        elif OBJ_STMT.match(statement):     obj.append(statement)
+        else:                               con.append(statement)
+
+    return ";\n".join([*sorted(par), *sorted(var), *obj, *sorted(con)]) + ";\n"
+
+
+# Function solution_key: Cache-key of a solve
+def solution_key(_script: str, _values: dict | None, _options: dict) -> str:
+    """
+    Hash the canonical form of a script together with the options of the session that solves it (backend, solver,
+    tolerances), so that changing any of them yields a different key.
+    """
+
+    digest = hashlib.sha256(canonical(_script, _values).encode())
+    digest.update(json.dumps(_options, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+# Class SolutionCache: Persistent LRU-cache of solutions
+class SolutionCache:
+    """
+    On-disk cache of solutions, one .npz-file per key. Reading an entry refreshes its modification time, and when
+    the cache grows beyond `capacity` bytes the least recently used entries are deleted. Entries are written to a
+    temporary file first and renamed, so that concurrent readers never see partial files.
+    """
+
+    # Default location and size-cap:
+    DIRECTORY = os.path.join(os.path.expanduser("~"), ".climact", "solutions")
+    CAPACITY  = 256 * 1024 * 1024
+
+    # Initializer:
+    def __init__(self, _directory: str | None = None, _capacity: int | None = None):
+
+        self.directory = _directory or SolutionCache.DIRECTORY
+        self.capacity  = _capacity  or SolutionCache.CAPACITY
+
+    def path(self, _key: str) -> str:
+        return os.path.join(self.directory, f"{_key}.npz")
+
+    def get(self, _key: str) -> Solution | None:
+        """
+        Return the cached solution for a key, or None.
+        """
+
+        path  = self.path(_key)
+        start = time.perf_counter()
+        try:
+            with np.load(path) as data:
+                solution = Solution(data["var_symbols"].astype(object), data["var_values"],
+                                    data["par_symbols"].astype(object), data["par_values"],
+                                    data["obj_symbols"].astype(object), data["obj_values"])
+
+            os.utime(path)
+
+        except (OSError, KeyError, ValueError):
+            return None
+
+        solution.timing = {"cache": time.perf_counter() - start}
+        return solution
+
+    def put(self, _key: str, _solution: Solution):
+        """
+        Store a solution, then evict the least recently used entries if the cache exceeds its capacity.
+        """
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            handle, temp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(handle, "wb") as file:
+                np.savez(file,
+                         var_symbols=_solution.var_symbols.astype(str), var_values=_solution.var_values,
+                         par_symbols=_solution.par_symbols.astype(str), par_values=_solution.par_values,
+                         obj_symbols=_solution.obj_symbols.astype(str), obj_values=_solution.obj_values)
+
+            os.replace(temp, self.path(_key))
+
+        except OSError:
+            return
+
+        self.evict()
+
+    def evict(self):
+
+        entries = list()
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if  entry.name.endswith(".npz"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+
+            if  total <= self.capacity:
+                break
+
+            try:
+                os.remove(path)
+                total -= size
+
+            except OSError:
+                continue
+
+    def clear(self):
+
+        if  os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if  name.endswith(".npz"):
+                    os.remove(os.path.join(self.directory, name))
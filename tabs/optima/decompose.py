@@ -0,0 +1,448 @@
+import time
+import threading
+import multiprocessing
+
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+
+import numpy as np
+import scipy.sparse as sp
+
+from scipy.sparse.csgraph import connected_components
+
+from tabs.optima.ampl import Solution
+from tabs.optima.expression import render, terms
+from tabs.optima.script import ScriptModel
+from tabs.optima.session import create_session
+from tabs.schema.equation import ParseError, symbols
+
+
+# Class Block: Independent part of a model
+@dataclass
+class Block:
+    """
+    Independent part of a model: a set of variables, the constraints that couple them, and the terms of each
+    objective that depend on them. Blocks share no variables, so they can be solved separately and the objectives
+    recovered as the sum of the blocks' objective values.
+    """
+
+    index      : int
+    variables  : list = field(default_factory=list)     # Variable-symbols
+    parameters : list = field(default_factory=list)     # Parameter-symbols referenced by the block
+    constraints: list = field(default_factory=list)     # Constraint-statements
+    objectives : dict = field(default_factory=dict)     # Objective-name -> (sense, [(sign, term), ...])
+
+    def script(self, _model: ScriptModel) -> str:
+        """
+        Render the block as a stand-alone AMPL script.
+        """
+
+        par_section = ["# Parameter(s):\n", *(f"{_model.sources[symbol]};\n" for symbol in self.parameters)]
+        var_section = ["# Variable(s):\n",  *(f"{_model.sources[symbol]};\n" for symbol in self.variables)]
+        obj_section = ["# Objective(s):\n"]
+        eqn_section = ["# Equation(s):\n",  *(f"{statement};\n" for statement in self.constraints)]
+
+        # Blocks without objective-terms are solved as feasibility problems:
+        for name, (sense, items) in self.objectives.items() if any(items for _, items in self.objectives.values()) else ():
+            expression = " ".join(f"{'+' if sign > 0 else '-'} {render(tree)}" for sign, tree in items) or "0"
+            obj_section.append(f"{sense} {name}: {expression.removeprefix('+ ')};\n")
+
+        return "\n".join(["".join(par_section), "".join(var_section), "".join(obj_section), "".join(eqn_section)])
+
+
+# Class BlockReport: Outcome of a block's solve
+@dataclass
+class BlockReport:
+    index      : int
+    variables  : int
+    constraints: int
+    status     : str   = "pending"
+    elapsed    : float = float("nan")
+    error      : str   = ""
+
+
+# Function decompose: Splits a script into independent blocks
+def decompose(_script: str) -> tuple[ScriptModel, list[Block]]:
+    """
+    Split a script into blocks that share no variables. The incidence of variables in constraints and objective-terms
+    is assembled into a sparse bipartite graph, whose connected components are the blocks. Connectors are shared by
+    the equations of the two nodes they join, so the blocks follow the connected components of the flowsheet, except
+    where a parameter (instead of a variable) separates two parts.
+
+    Objectives are split into their additive terms; a term couples the variables it contains, but separate terms
+    do not. Constraints and terms without variables are assigned to the first block.
+
+    Parameters:
+        _script (str): The AMPL script (see `ModelBuilder.build()`).
+
+    Returns:
+        tuple: (parsed model, blocks in order of their first variable).
+
+    Raises:
+        ParseError: For statements outside the subset emitted by `ModelBuilder`.
+    """
+
+    model  = ScriptModel(_script)
+    index  = dict(model.index)
+    rows   = list()     # Constraint-index, or (objective-index, term-index)
+    links  = list()     # Variable-columns of each row
+
+    def columns(_trees):
+
+        found = set()
+        for tree in _trees:
+            symbols(tree, found)
+
+        # Undeclared symbols are kept as variables, the solver reports them:
+        for symbol in sorted(found.difference(model.defaults, index)):
+            index[symbol] = len(index)
+
+        return [index[symbol] for symbol in found if symbol not in model.defaults]
+
+    for row, (_, _, lhs, rhs) in enumerate(model.constraints):
+        rows .append(row)
+        links.append(columns((lhs, rhs)))
+
+    split = [terms(tree) for _, _, tree in model.objectives]
+    for objective, items in enumerate(split):
+        for term, (_, tree) in enumerate(items):
+            rows .append((objective, term))
+            links.append(columns((tree,)))
+
+    # Bipartite incidence graph: variables first, then rows:
+    n_vars = len(index)
+    edges  = [(column, n_vars + row) for row, cols in enumerate(links) for column in cols]
+    graph  = sp.coo_matrix((np.ones(len(edges)), tuple(np.array(edges, dtype=np.int64).reshape(-1, 2).T)),
+                           shape=(n_vars + len(rows), n_vars + len(rows)))
+
+    _, labels = connected_components(graph, directed=False)
+
+    # Number blocks by their first variable, and drop components without variables into the first block:
+    order  = dict()
+    for label in labels[:n_vars]:
+        order.setdefault(int(label), len(order))
+
+    blocks = [Block(number) for number in range(max(len(order), 1))]
+    number = [order.get(int(label), 0) for label in labels[n_vars:]]     # Block of each row
+
+    for symbol, column in index.items():
+        if  symbol in model.index:
+            blocks[order[int(labels[column])]].variables.append(symbol)
+
+    for row, key in enumerate(rows):
+
+        if  isinstance(key, int):
+            blocks[number[row]].constraints.append(model.statements[key])
+            continue
+
+        objective, term = key
+        name, sense, _  = model.objectives[objective]
+        blocks[number[row]].objectives.setdefault(name, (sense, list()))[1].append(split[objective][term])
+
+    # Every block declares the objectives in the same order, so that each solves for the same (first) objective:
+    for item in blocks:
+        item.objectives = {name: item.objectives.get(name, (sense, list())) for name, sense, _ in model.objectives}
+
+    # Parameters referenced by the rows of each block, and those their defaults depend on:
+    needed = [set() for _ in blocks]
+    for row, key in enumerate(rows):
+
+        if  isinstance(key, int):
+            _, _, lhs, rhs = model.constraints[key]
+            symbols(lhs, needed[number[row]])
+            symbols(rhs, needed[number[row]])
+
+        else:
+            objective, term = key
+            symbols(split[objective][term][1], needed[number[row]])
+
+    for item, referenced in zip(blocks, needed):
+
+        found   = referenced.intersection(model.defaults)
+        pending = list(found)
+        while pending:
+            default = model.defaults[pending.pop()]
+            for symbol in (symbols(default) if default is not None else ()):
+                if  symbol in model.defaults and symbol not in found:
+                    found.add(symbol)
+                    pending.append(symbol)
+
+        item.parameters = [symbol for symbol in model.defaults if symbol in found]
+
+    return model, blocks
+
+
+# Per-process session (see `_init_worker()`):
+_session = None
+
+
+def _init_worker(_backend: str, _solver: str, _time_limit: float | None = None):
+
+    global _session
+    _session = create_session(_backend, _solver, _time_limit)
+
+
+def solve_block(_session,
+                _index: int,
+                _script: str,
+                _values: dict,
+                _initial: dict,
+                _timeout: float | None):
+    """
+    Solve one block with the given session.
+
+    Returns:
+        tuple: (index, status, elapsed seconds, Solution or None, error-message)
+    """
+
+    start = time.perf_counter()
+    timed = threading.Event()
+
+    def expire():
+        timed.set()
+        _session.interrupt()
+
+    try:
+        if  _session.load(_script, None, _values) is None:
+            return _index, "error", time.perf_counter() - start, None, _session.error
+
+        timer = threading.Timer(_timeout, expire) if _timeout else None
+        if timer:   timer.start()
+
+        try:        result = _session.solve(_initial)
+        finally:
+            if timer:   timer.cancel()
+
+    except Exception as exception:
+        return _index, "error", time.perf_counter() - start, None, str(exception)
+
+    elapsed = time.perf_counter() - start
+
+    # Wall-clock limit reached, here or inside the solver (native backend):
+    if  timed.is_set() or _session.result == "limit":
+        return _index, "timeout", elapsed, None, ""
+
+    if  result is None:     return _index, _session.result or "failed", elapsed, None, _session.error
+
+    return _index, "solved", elapsed, result, ""
+
+
+def _solve_block(*args):
+    return solve_block(_session, *args)
+
+
+# Function merge: Joins the solutions of blocks
+def merge(_blocks: list[Block], _solutions: list[Solution | None], _objectives: list[str]) -> Solution:
+    """
+    Join the solutions of independent blocks (None for blocks that were not solved). Objective values are the sums
+    over the blocks, and NaN if a block holding terms of the objective was not solved.
+    """
+
+    solved = [solution for solution in _solutions if solution is not None]
+    params = dict()
+    for solution in solved:
+        params.update(solution.par_dict)
+
+    values = np.zeros(len(_objectives))
+    for block, solution in zip(_blocks, _solutions):
+
+        obj = solution.obj_dict if solution is not None else {
+            name: np.nan for name, (_, items) in block.objectives.items() if items
+        }
+        values += np.fromiter((obj.get(name, 0.0) for name in _objectives), np.float64, len(_objectives))
+
+    return Solution(np.concatenate([solution.var_symbols for solution in solved] or [np.empty(0, dtype=object)]),
+                    np.concatenate([solution.var_values  for solution in solved] or [np.empty(0)]),
+                    np.array(list(params), dtype=object),
+                    np.fromiter(params.values(), np.float64, len(params)),
+                    np.array(_objectives, dtype=object),
+                    values)
+
+
+# Class BlockSession: Solves the independent blocks of a model in parallel
+class BlockSession:
+    """
+    Mirrors the interface of `AMPLSession`. Loading a script splits it into independent blocks (see `decompose()`),
+    solving dispatches the blocks to a pool of worker-processes, each holding a session of the given backend, and
+    merges their solutions. A block that fails does not affect the others: its variables are left out of the merged
+    solution and its outcome is recorded in `report`. Models with a single block are solved in-process.
+    """
+
+    # Initializer:
+    def __init__(self,
+                 _backend: str = "ampl",
+                 _solver: str = "ipopt",
+                 _workers: int | None = None,
+                 _timeout: float | None = None):
+
+        self.backend  = _backend
+        self.solver   = _solver
+        self.workers  = _workers
+        self.timeout  = _timeout     # Per-block wall-clock limit (seconds)
+        self.listener = None
+        self.report   = list()       # BlockReport of each block of the last solve
+
+        self._model     = None
+        self._blocks    = list()     # (Block, script)
+        self._signature = None
+        self._values    = dict()
+        self._result    = None
+        self._error     = str()
+        self._timing    = dict()
+        self._session   = None       # In-process session for single-block models
+        self._interrupt = threading.Event()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Name                      Description
+    # ------------------------------------------------------------------------------------------------------------------
+    # 1. load                   Splits a script into blocks.
+    # 2. solve                  Solves the blocks in parallel and merges the results.
+    # 3. interrupt              Skips blocks that have not started.
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def start(self):    pass
+
+    def load(self, _script: str, _signature = None, _values: dict | None = None) -> bool | None:
+
+        self._error = str()
+        start       = time.perf_counter()
+        in_place    = _signature is not None and _signature == self._signature and self._model is not None
+
+        if  not in_place:
+            try:
+                self._model, blocks = decompose(_script)
+                self._blocks        = [(block, block.script(self._model)) for block in blocks]
+
+            except ParseError as error:
+                self._error, self._model, self._signature = str(error), None, None
+                return None
+
+        self._values    = dict(_values or {})
+        self._signature = _signature
+        self._timing    = {"decompose": time.perf_counter() - start}
+        return in_place
+
+    def solve(self, _initial: dict | None = None):
+        """
+        Solve the loaded blocks.
+
+        Returns:
+            Solution | None: The merged results, or None if no block could be solved.
+        """
+
+        self._interrupt.clear()
+        _initial  = _initial or dict()
+        start     = time.perf_counter()
+        tasks     = [
+            (block.index,
+             script,
+             {symbol: self._values[symbol] for symbol in block.parameters if symbol in self._values},
+             {symbol: _initial[symbol] for symbol in block.variables if symbol in _initial},
+             self.timeout)
+            for block, script in self._blocks
+        ]
+
+        self.report = [BlockReport(block.index, len(block.variables), len(block.constraints))
+                       for block, _ in self._blocks]
+        solutions   = [None] * len(tasks)
+
+        def collect(_index, _status, _elapsed, _solution, _error):
+
+            report = self.report[_index]
+            report.status, report.elapsed, report.error = _status, _elapsed, _error
+            solutions[_index] = _solution
+            self._emit(f"Block {_index}: {report.variables} variable(s), {report.constraints} constraint(s): "
+                       f"{_status} in {_elapsed * 1e3:.1f} ms{f' ({_error})' if _error else ''}\n")
+
+        self._emit(f"Decomposed into {len(tasks)} independent block(s)\n")
+
+        # A single block is solved in-process, without the cost of spawning workers:
+        if  len(tasks) == 1:
+
+            self._session = self._session or create_session(self.backend, self.solver, self.timeout)
+            self._session.listener = self.listener
+            collect(*solve_block(self._session, *tasks[0]))
+
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers,
+                                     mp_context=multiprocessing.get_context("spawn"),
+                                     initializer=_init_worker,
+                                     initargs=(self.backend, self.solver, self.timeout)) as executor:
+
+                # Largest blocks first, so the pool is not left waiting on a large block submitted last:
+                order   = sorted(range(len(tasks)), key=lambda index: -self.report[index].variables)
+                pending = {executor.submit(_solve_block, *tasks[index]) for index in order}
+
+                while pending:
+
+                    done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(*future.result())
+
+                    if  self._interrupt.is_set():
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        break
+
+        for report in self.report:
+            if  report.status == "pending":
+                report.status = "cancelled"
+
+        self._timing["solve"] = time.perf_counter() - start
+
+        statuses = {report.status for report in self.report}
+        failed   = [report for report in self.report if report.status != "solved"]
+
+        if  not failed:         self._result = "solved"
+        elif len(failed) < len(self.report):
+            self._result = "partial"
+        else:
+            self._result = statuses.pop() if len(statuses) == 1 else "failure"
+
+        self._error = "\n".join(f"Block {report.index}: {report.status} {report.error}".rstrip() for report in failed)
+
+        if  len(failed) == len(self.report):
+            return None
+
+        start    = time.perf_counter()
+        solution = merge(self.blocks, solutions, [name for name, _, _ in self._model.objectives])
+
+        self._timing["merge"] = time.perf_counter() - start
+        solution.timing = dict(self._timing)
+        return solution
+
+    def _emit(self, _message: str):
+
+        if  self.listener is not None:
+            self.listener(_message)
+
+    def interrupt(self):
+
+        self._interrupt.set()
+        if  self._session is not None:
+            self._session.interrupt()
+
+    def shutdown(self):
+
+        self.interrupt()
+        if  self._session is not None:
+            self._session.shutdown()
+
+        self._model, self._session = None, None
+
+    @property
+    def blocks(self):   return [block for block, _ in self._blocks]
+
+    @property
+    def options(self):  return {"backend": "blocks", "blocks": self.backend, "solver": self.solver}
+
+    @property
+    def running(self):  return self._model is not None
+
+    @property
+    def result(self):   return self._result
+
+    @property
+    def output(self):   return str()
+
+    @property
+    def error(self):    return self._error
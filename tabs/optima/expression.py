@@ -0,0 +1,359 @@
+import math
+
+from tabs.schema.equation import ParseError
+
+
+# Class NonlinearError: Raised when an expression is not linear in its variables
+class NonlinearError(ValueError):
+    pass
+
+
+# Functions that can be folded when their arguments are constant:
+FUNCTIONS = {
+    "exp"  : math.exp,
+    "log"  : math.log,
+    "log10": math.log10,
+    "sqrt" : math.sqrt,
+    "abs"  : abs,
+    "sin"  : math.sin,
+    "cos"  : math.cos,
+    "tan"  : math.tan,
+    "min"  : min,
+    "max"  : max
+}
+
+
+# Operator symbols and precedences (see `render()`):
+OPERATORS  = {"add": "+", "sub": "-", "mul": "*", "div": "/", "pow": "^"}
+PRECEDENCE = {"add": 1, "sub": 1, "sum": 1, "mul": 2, "div": 2, "neg": 3, "pow": 4}
+
+
+# Function render: Renders a syntax tree as an AMPL expression
+def render(_tree: tuple) -> str:
+    """
+    Render a syntax tree as text that parses back into an equivalent tree, parenthesizing only where precedence or
+    left-associativity require it.
+    """
+
+    kind = _tree[0]
+
+    if  kind == "num":  return repr(float(_tree[1]))
+    if  kind == "sym":  return _tree[1]
+    if  kind == "call": return f"{_tree[1]}({', '.join(render(arg) for arg in _tree[2])})"
+
+    def operand(_child, _tighter: bool):
+        text = render(_child)
+        rank = PRECEDENCE["neg"] if _child[0] == "num" and _child[1] < 0 else PRECEDENCE.get(_child[0], 5)
+        return f"({text})" if rank < PRECEDENCE[kind] or (_tighter and rank == PRECEDENCE[kind]) else text
+
+    if  kind == "neg":  return f"-{operand(_tree[1], False)}"
+    if  kind == "pow":  return f"{operand(_tree[1], True)}^{operand(_tree[2], False)}"
+
+    if  kind == "sum":
+        return " ".join([operand(_tree[1], False), *(f"{OPERATORS[op]} {operand(term, True)}" for op, term in _tree[2])])
+
+    return f"{operand(_tree[1], False)} {OPERATORS[kind]} {operand(_tree[2], True)}"
+
+
+# Function terms: Splits a syntax tree into its additive terms
+def terms(_tree: tuple, _sign: float = 1.0, _found: list | None = None) -> list[tuple[float, tuple]]:
+    """
+    Split a syntax tree into the terms of its top-level sum, so that `tree == sum(sign * term)`.
+
+    Returns:
+        list: (sign, tree) of each term, in order.
+    """
+
+    _found = list() if _found is None else _found
+    kind   = _tree[0]
+
+    if  kind in ("add", "sub"):
+        terms(_tree[1], _sign, _found)
+        terms(_tree[2], _sign if kind == "add" else -_sign, _found)
+
+    elif kind == "sum":
+        terms(_tree[1], _sign, _found)
+        for op, term in _tree[2]:
+            terms(term, _sign if op == "add" else -_sign, _found)
+
+    elif kind == "neg":
+        terms(_tree[1], -_sign, _found)
+
+    else:
+        _found.append((_sign, _tree))
+
+    return _found
+
+
+# Function fold: Substitutes constants into a syntax tree and folds constant sub-trees
+def fold(_tree: tuple, _constants: dict) -> tuple:
+    """
+    Replace the symbols found in `_constants` by their values and evaluate every sub-tree that is constant, dropping
+    additions of zero and multiplications by one. The result is equivalent to the input for the given constants.
+    """
+
+    kind = _tree[0]
+
+    if  kind == "num":  return _tree
+    if  kind == "sym":  return ("num", float(_constants[_tree[1]])) if _tree[1] in _constants else _tree
+
+    if  kind == "call":
+        args = tuple(fold(arg, _constants) for arg in _tree[2])
+        if  _tree[1] in FUNCTIONS and all(arg[0] == "num" for arg in args):
+            try:                        return ("num", constant(FUNCTIONS[_tree[1]], *(arg[1] for arg in args)))
+            except NonlinearError:      pass
+
+        return ("call", _tree[1], args)
+
+    if  kind == "neg":
+        arg = fold(_tree[1], _constants)
+        return ("num", -arg[1]) if arg[0] == "num" else ("neg", arg)
+
+    if  kind == "sum":  return fold_sum(_tree[1], _tree[2], _constants)
+    if  kind in ("add", "sub"): return fold_sum(_tree[1], ((kind, _tree[2]),), _constants)
+
+    lhs = fold(_tree[1], _constants)
+    rhs = fold(_tree[2], _constants)
+    lnum, rnum = lhs[0] == "num", rhs[0] == "num"
+
+    if  lnum and rnum:
+        a, b = lhs[1], rhs[1]
+        try:
+            if  kind == "mul":  return ("num", a * b)
+            if  kind == "div":  return ("num", a / b)
+            if  kind == "pow":  return ("num", float(a ** b))
+
+        except (ArithmeticError, ValueError, TypeError):
+            return (kind, lhs, rhs)
+
+    if  kind == "mul" and lnum and lhs[1] == 1.0:       return rhs
+    if  kind in ("mul", "div") and rnum and rhs[1] == 1.0:  return lhs
+    if  kind == "pow" and rnum and rhs[1] == 1.0:       return lhs
+
+    return (kind, lhs, rhs)
+
+
+# Function fold_sum: Folds the terms of a sum
+def fold_sum(_first: tuple, _rest: tuple, _constants: dict) -> tuple:
+    """
+    Fold the sum `_first (op term)...` from left to right (see `fold()`): numbers are added up while the sum is
+    constant, a number following another one at the end of the sum is combined with it (e.g. (a + 6) - 40 -> a - 34),
+    zero terms are dropped and `0 - b` becomes -b.
+
+    Returns:
+        tuple: A single term, or a "sum"-node.
+    """
+
+    # A leading sum is spliced, sums are left-associative: (a + b) - c == a + b - c:
+    first = fold(_first, _constants)
+    items = [("add", first[1]), *first[2]] if first[0] == "sum" else [("add", first)]
+
+    for op, term in _rest:
+
+        rhs  = fold(term, _constants)
+        lhs  = items[0][1] if len(items) == 1 else None
+        lnum = lhs is not None and lhs[0] == "num"
+        rnum = rhs[0] == "num"
+
+        if  lnum and rnum:
+            try:
+                items = [("add", ("num", lhs[1] + rhs[1] if op == "add" else lhs[1] - rhs[1]))]
+                continue
+
+            except (ArithmeticError, ValueError, TypeError):
+                pass
+
+        elif rnum and lhs is None and items[-1][1][0] == "num":
+            last  = items.pop()
+            total = (last[1][1] if last[0] == "add" else -last[1][1]) + (rhs[1] if op == "add" else -rhs[1])
+            if  total != 0.0:
+                items.append(("add" if total >= 0 else "sub", ("num", abs(total))))
+
+            continue
+
+        if  rnum and rhs[1] == 0.0:
+            continue
+
+        if  lnum and lhs[1] == 0.0 and op == "add" and rhs[0] == "sum":
+            items = [("add", rhs[1]), *rhs[2]]
+
+        elif lnum and lhs[1] == 0.0:
+            items = [("add", rhs if op == "add" else ("neg", rhs))]
+
+        else:
+            items.append((op, rhs))
+
+    return items[0][1] if len(items) == 1 else ("sum", items[0][1], tuple(items[1:]))
+
+
+# Function constant: Evaluates a function of constants
+def constant(_function, *args) -> float:
+    """
+    Apply a function to constant arguments. Raises `NonlinearError` where the result is undefined or not a finite real
+    number (e.g. log(0), sqrt(-1), an overflow or a division by zero), so that the expression is treated as one that
+    can't be reduced to a linear form.
+    """
+
+    try:
+        return float(_function(*args))
+
+    except (ArithmeticError, ValueError, TypeError) as error:
+        raise NonlinearError(f"Undefined constant expression: {error}") from None
+
+
+# Function linearize: Expresses a syntax tree as a linear combination of variables
+def linearize(_tree: tuple, _constants: dict) -> tuple[dict, float]:
+    """
+    Express a syntax tree as `sum(coefficient * variable) + constant`. Symbols found in `_constants` are replaced by
+    their values, all other symbols are treated as variables.
+
+    Parameters:
+        _tree (tuple): Syntax tree (see `Parser`).
+        _constants (dict): Symbol -> value of symbols that are fixed (e.g. parameters).
+
+    Returns:
+        tuple: (coefficients, constant), where `coefficients` maps variable-symbols to floats.
+
+    Raises:
+        NonlinearError: If the expression is not linear in its variables, or a constant sub-expression is undefined
+            for the given constants (see `constant()`).
+    """
+
+    kind = _tree[0]
+
+    if  kind == "num":
+        return {}, _tree[1]
+
+    if  kind == "sym":
+        name = _tree[1]
+        if  name in _constants:
+            return {}, float(_constants[name])
+
+        return {name: 1.0}, 0.0
+
+    if  kind == "neg":
+        coefs, const = linearize(_tree[1], _constants)
+        return {name: -value for name, value in coefs.items()}, -const
+
+    if  kind in ("add", "sub"):
+
+        lcoefs, lconst = linearize(_tree[1], _constants)
+        rcoefs, rconst = linearize(_tree[2], _constants)
+        sign = 1.0 if kind == "add" else -1.0
+
+        for name, value in rcoefs.items():
+            lcoefs[name] = lcoefs.get(name, 0.0) + sign * value
+
+        return lcoefs, lconst + sign * rconst
+
+    if  kind == "sum":
+
+        coefs, const = linearize(_tree[1], _constants)
+        for op, term in _tree[2]:
+
+            tcoefs, tconst = linearize(term, _constants)
+            sign = 1.0 if op == "add" else -1.0
+
+            for name, value in tcoefs.items():
+                coefs[name] = coefs.get(name, 0.0) + sign * value
+
+            const += sign * tconst
+
+        return coefs, const
+
+    if  kind == "mul":
+
+        lcoefs, lconst = linearize(_tree[1], _constants)
+        rcoefs, rconst = linearize(_tree[2], _constants)
+
+        if  lcoefs and rcoefs:
+            raise NonlinearError("Product of variables")
+
+        coefs, scale = (rcoefs, lconst) if not lcoefs else (lcoefs, rconst)
+        return {name: scale * value for name, value in coefs.items()}, lconst * rconst
+
+    if  kind == "div":
+
+        rcoefs, rconst = linearize(_tree[2], _constants)
+        if  rcoefs:
+            raise NonlinearError("Division by a variable")
+
+        if  rconst == 0.0:
+            raise NonlinearError("Undefined constant expression: division by zero")
+
+        lcoefs, lconst = linearize(_tree[1], _constants)
+        return {name: value / rconst for name, value in lcoefs.items()}, lconst / rconst
+
+    if  kind == "pow":
+
+        bcoefs, bconst = linearize(_tree[1], _constants)
+        ecoefs, econst = linearize(_tree[2], _constants)
+
+        if  ecoefs:                 raise NonlinearError("Variable exponent")
+        if  not bcoefs:             return {}, constant(pow, bconst, econst)
+        if  econst == 1.0:          return bcoefs, bconst
+        if  econst == 0.0:          return {}, 1.0
+
+        raise NonlinearError("Power of a variable")
+
+    if  kind == "call":
+
+        name = _tree[1]
+        args = [linearize(arg, _constants) for arg in _tree[2]]
+
+        if  any(coefs for coefs, _ in args):    raise NonlinearError(f"Function '{name}' of a variable")
+        if  name not in FUNCTIONS:              raise ParseError(f"Unknown function '{name}'")
+
+        return {}, constant(FUNCTIONS[name], *(const for _, const in args))
+
+    raise ParseError(f"Unknown node '{kind}'")
+
+
+# Function degree: Structural degree of a syntax tree in its variables
+def degree(_tree: tuple, _constants) -> int:
+    """
+    Return 0 if a syntax tree is constant and 1 if it is linear in its variables (symbols not in `_constants`). The
+    test is structural: only the position of the variables matters, constants are never evaluated, so that it holds
+    for any values of the parameters (unlike `linearize()`, which may fail on e.g. a division by zero).
+
+    Raises:
+        NonlinearError: If the expression is not linear in its variables.
+        ParseError: For unknown functions or nodes.
+    """
+
+    kind = _tree[0]
+
+    if  kind == "num":  return 0
+    if  kind == "sym":  return 0 if _tree[1] in _constants else 1
+    if  kind == "neg":  return degree(_tree[1], _constants)
+    if  kind == "sum":  return max(degree(term, _constants) for term in (_tree[1], *(term for _, term in _tree[2])))
+
+    if  kind == "call":
+
+        if  _tree[1] not in FUNCTIONS:
+            raise ParseError(f"Unknown function '{_tree[1]}'")
+
+        if  any(degree(arg, _constants) for arg in _tree[2]):
+            raise NonlinearError(f"Function '{_tree[1]}' of a variable")
+
+        return 0
+
+    if  kind not in OPERATORS:
+        raise ParseError(f"Unknown node '{kind}'")
+
+    lhs = degree(_tree[1], _constants)
+    rhs = degree(_tree[2], _constants)
+
+    if  kind in ("add", "sub"):     return max(lhs, rhs)
+    if  kind == "mul" and lhs + rhs > 1:    raise NonlinearError("Product of variables")
+    if  kind == "mul":              return lhs + rhs
+    if  kind == "div" and rhs:      raise NonlinearError("Division by a variable")
+    if  kind == "div":              return lhs
+    if  rhs:                        raise NonlinearError("Variable exponent")
+    if  not lhs:                    return 0
+
+    # A variable base is linear only under a literal exponent of 1 (or 0), whatever the parameter values:
+    if  _tree[2] in (("num", 1.0), ("num", 0.0)):
+        return 1 if _tree[2][1] == 1.0 else 0
+
+    raise NonlinearError("Power of a variable")
@@ -0,0 +1,550 @@
+import math
+import functools
+
+from dataclasses import dataclass
+
+import numpy as np
+import scipy.sparse as sp
+
+from tabs.optima.script import ScriptModel
+from tabs.schema.equation import ParseError, slotted, symbols
+
+
+# Vectorized functions and their derivatives, in terms of the argument `a` and the result `v`:
+FUNCTIONS = {
+    "exp"  : (np.exp  , lambda a, v: v),
+    "log"  : (np.log  , lambda a, v: 1.0 / a),
+    "log10": (np.log10, lambda a, v: 1.0 / (a * math.log(10.0))),
+    "sqrt" : (np.sqrt , lambda a, v: 0.5 / v),
+    "abs"  : (np.abs  , lambda a, v: np.sign(a)),
+    "sin"  : (np.sin  , lambda a, v: np.cos(a)),
+    "cos"  : (np.cos  , lambda a, v: -np.sin(a)),
+    "tan"  : (np.tan  , lambda a, v: 1.0 + v * v)
+}
+
+# Functions of any number of arguments (the derivative follows the selected argument, the first one on ties):
+SELECTORS = {"min": np.minimum, "max": np.maximum}
+
+
+# Function abstract: Separates a syntax tree's shape from its numbers
+@functools.lru_cache(maxsize=65536)
+def abstract(_tree: tuple) -> tuple[tuple, tuple]:
+    """
+    Replace the numbers of a syntax tree (with slots, see `Template`) by constant-inputs ("const", index), so that
+    expressions that differ only in their numbers share a shape, and hence a `Tape`.
+
+    Returns:
+        tuple: (shape, constants).
+    """
+
+    constants = list()
+
+    def walk(_node):
+
+        kind = _node[0]
+        if  kind == "num":
+            constants.append(_node[1])
+            return ("const", len(constants) - 1)
+
+        if  kind == "slot": return _node
+        if  kind == "call": return ("call", _node[1], tuple(walk(arg) for arg in _node[2]))
+        if  kind == "neg":  return ("neg", walk(_node[1]))
+        if  kind == "sum":  return ("sum", walk(_node[1]), tuple((op, walk(term)) for op, term in _node[2]))
+
+        return (kind, walk(_node[1]), walk(_node[2]))
+
+    return walk(_tree), tuple(constants)
+
+
+# Class Tape: Syntax tree flattened into instructions
+@dataclass(frozen=True)
+class Tape:
+    """
+    Instructions of a shape (see `abstract()`) in evaluation order. Each instruction is (kind, operands, argument),
+    where operands are the indices of earlier instructions and the argument is the slot-index ("slot"), the constant-
+    index ("const") or the function-name ("call"). The last instruction is the result.
+    """
+
+    code  : tuple
+    slots : int
+    consts: int
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Name                      Description
+    # ------------------------------------------------------------------------------------------------------------------
+    # 1. active                 Instructions that depend on the given slots.
+    # 2. forward                Evaluates the instructions, with optional tangents (forward-mode differentiation).
+    # 3. reverse                Propagates adjoints from the result to the slots (reverse-mode differentiation).
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def active(self, _slots) -> list[bool]:
+
+        active = list()
+        for kind, operands, argument in self.code:
+            active.append(argument in _slots if kind == "slot" else any(active[index] for index in operands))
+
+        return active
+
+    def forward(self, _inputs: list, _constants: np.ndarray, _tangents: list | None = None) -> tuple[list, list]:
+        """
+        Evaluate the tape on arrays of any (common) shape.
+
+        Parameters:
+            _inputs (list): Value of each slot.
+            _constants (np.ndarray): Constant-inputs, indexed along the last axis (broadcast against the inputs).
+            _tangents (list | None): Tangent of each slot (None where zero), or None to skip differentiation.
+
+        Returns:
+            tuple: (values, tangents) of all instructions (tangents are None where zero, or if not requested).
+        """
+
+        values   = list()
+        tangents = list()
+        derive   = _tangents is not None
+
+        for kind, operands, argument in self.code:
+
+            args = [values[index] for index in operands]
+            dots = [tangents[index] for index in operands] if derive else ()
+            dot  = None
+
+            if  kind == "slot":
+                value = _inputs[argument]
+                if  derive: dot = _tangents[argument]
+
+            elif kind == "const":
+                value = _constants[..., argument]
+
+            elif kind == "neg":
+                value = -args[0]
+                if  derive and dots[0] is not None: dot = -dots[0]
+
+            elif kind in ("add", "sub"):
+                a, b  = args
+                value = a + b if kind == "add" else a - b
+                if  derive:
+                    da, db = dots
+                    if   db is None:    dot = da
+                    elif da is None:    dot = db if kind == "add" else -db
+                    else:               dot = da + db if kind == "add" else da - db
+
+            elif kind == "mul":
+                a, b  = args
+                value = a * b
+                if  derive:
+                    dot = combine(None if dots[0] is None else dots[0] * b, None if dots[1] is None else a * dots[1])
+
+            elif kind == "div":
+                a, b  = args
+                value = a / b
+                if  derive:
+                    dot = combine(None if dots[0] is None else dots[0] / b, None if dots[1] is None else -value * dots[1] / b)
+
+            elif kind == "pow":
+                a, b  = args
+                value = np.power(a, b)
+                if  derive:
+                    dot = combine(
+                        None if dots[0] is None else b * np.power(a, b - 1.0) * dots[0],
+                        None if dots[1] is None else value * np.log(a) * dots[1]
+                    )
+
+            elif kind == "call" and argument in SELECTORS:
+                value = functools.reduce(SELECTORS[argument], args)
+                if  derive and any(item is not None for item in dots):
+                    dot = select(value, args, dots)
+
+            elif kind == "call" and argument in FUNCTIONS:
+                function, derivative = FUNCTIONS[argument]
+                value = function(args[0])
+                if  derive and dots[0] is not None:
+                    dot = derivative(args[0], value) * dots[0]
+
+            else:
+                raise ParseError(f"Unknown function '{argument}'")
+
+            values.append(value)
+            tangents.append(dot)
+
+        return values, tangents
+
+    def reverse(self, _values: list, _slots) -> dict:
+        """
+        Propagate the adjoint of the result back to the given slots.
+
+        Parameters:
+            _values (list): Values of all instructions (see `forward()`).
+            _slots (iterable): Slots to differentiate for; sub-trees that don't depend on them are skipped.
+
+        Returns:
+            dict: Slot -> derivative of the result (slots the result doesn't depend on are missing).
+        """
+
+        active   = self.active(set(_slots))
+        adjoints = [None] * len(self.code)
+        result   = dict()
+
+        if  not active[-1]:
+            return result
+
+        adjoints[-1] = np.ones_like(_values[-1], dtype=np.float64)
+
+        def give(_index, _adjoint):
+            if  active[_index]:
+                adjoints[_index] = _adjoint if adjoints[_index] is None else adjoints[_index] + _adjoint
+
+        for position in range(len(self.code) - 1, -1, -1):
+
+            w = adjoints[position]
+            if  w is None:
+                continue
+
+            kind, operands, argument = self.code[position]
+            args  = [_values[index] for index in operands]
+            value = _values[position]
+
+            if  kind == "slot":
+                result[argument] = w if argument not in result else result[argument] + w
+
+            elif kind == "neg":
+                give(operands[0], -w)
+
+            elif kind == "add":
+                give(operands[0], w)
+                give(operands[1], w)
+
+            elif kind == "sub":
+                give(operands[0], w)
+                give(operands[1], -w)
+
+            elif kind == "mul":
+                give(operands[0], w * args[1])
+                give(operands[1], w * args[0])
+
+            elif kind == "div":
+                give(operands[0], w / args[1])
+                give(operands[1], -w * value / args[1])
+
+            elif kind == "pow":
+                a, b = args
+                give(operands[0], w * b * np.power(a, b - 1.0))
+                if  active[operands[1]]:
+                    give(operands[1], w * value * np.log(a))
+
+            elif kind == "call" and argument in SELECTORS:
+                taken = np.zeros(np.shape(value), dtype=np.bool_)
+                for index, arg in zip(operands, args):
+                    mask  = (arg == value) & ~taken
+                    taken = taken | mask
+                    give(index, w * mask)
+
+            elif kind == "call":
+                give(operands[0], w * FUNCTIONS[argument][1](args[0], value))
+
+        return result
+
+
+# Function combine: Sum of two tangents, either of which may be None (zero)
+def combine(_a, _b):
+
+    if  _a is None: return _b
+    if  _b is None: return _a
+    return _a + _b
+
+
+# Function select: Tangent of a min/max, following the selected argument
+def select(_value, _args: list, _dots: list):
+
+    dot   = np.zeros(np.shape(_value))
+    taken = np.zeros(np.shape(_value), dtype=np.bool_)
+    for arg, item in zip(_args, _dots):
+        mask  = (arg == _value) & ~taken
+        taken = taken | mask
+        if  item is not None:
+            dot = np.where(mask, item, dot)
+
+    return dot
+
+
+# Function record: Flattens a shape into a tape
+@functools.lru_cache(maxsize=4096)
+def record(_shape: tuple) -> Tape:
+
+    code   = list()
+    counts = [0, 0]
+
+    def walk(_node) -> int:
+
+        kind = _node[0]
+        if  kind == "slot":
+            counts[0] = max(counts[0], _node[1] + 1)
+            code.append(("slot", (), _node[1]))
+
+        elif kind == "const":
+            counts[1] = max(counts[1], _node[1] + 1)
+            code.append(("const", (), _node[1]))
+
+        elif kind == "call":
+            operands = tuple(walk(arg) for arg in _node[2])
+            code.append(("call", operands, _node[1]))
+
+        elif kind == "neg":
+            code.append(("neg", (walk(_node[1]),), None))
+
+        # Sums are recorded as a chain of binary "add"/"sub" instructions:
+        elif kind == "sum":
+            total = walk(_node[1])
+            for op, term in _node[2]:
+                code.append((op, (total, walk(term)), None))
+                total = len(code) - 1
+
+        else:
+            left  = walk(_node[1])
+            right = walk(_node[2])
+            code.append((kind, (left, right), None))
+
+        return len(code) - 1
+
+    walk(_shape)
+    return Tape(tuple(code), counts[0], counts[1])
+
+
+# Class Group: Rows of a system that share a shape
+@dataclass
+class Group:
+
+    tape     : Tape
+    rows     : np.ndarray           # Row of each member
+    inputs   : np.ndarray           # (members, slots): Column of each slot's symbol in the input-matrix
+    constants: np.ndarray           # (members, constants): Numbers of each member
+    variables: tuple                # Slots that hold a variable in at least one member
+    targets  : np.ndarray = None    # (members, slots): Position of each slot's derivative in the CSR-data, -1 if none
+
+
+# Class System: Expressions grouped by shape
+class System:
+    """
+    A system of expressions prepared for vectorized evaluation. Each row is an expression with slots (see `Template`)
+    plus the name bound to each slot. Rows that differ only in their names and numbers share a shape and are evaluated
+    as one group, on arrays of shape (sets, members): a whole network of identical unit-models costs one pass over a
+    single short tape, however many sets of values are evaluated at once.
+
+    Names listed as variables are read from `x`, all other names are parameters.
+    """
+
+    # Initializer:
+    def __init__(self, _rows: list[tuple[tuple, tuple]], _variables: list[str]):
+        """
+        Parameters:
+            _rows (list): (tree, names) of each row, where `tree` is an expression with slots.
+            _variables (list[str]): Variable-symbols, in column order. All other names are parameters.
+        """
+
+        self.variables  = list(_variables)
+        self.parameters = list()    # Names that aren't variables, in order of first use
+        self.shape      = (len(_rows), len(self.variables))
+
+        columns = {symbol: column for column, symbol in enumerate(self.variables)}
+        members = dict()            # Shape -> [rows, names, constants]
+
+        def column(_name):
+            if  _name not in columns:
+                columns[_name] = len(self.variables) + len(self.parameters)
+                self.parameters.append(_name)
+
+            return columns[_name]
+
+        for row, (tree, names) in enumerate(_rows):
+            shape, constants = abstract(tree)
+            entry = members.setdefault(shape, ([], [], []))
+            entry[0].append(row)
+            entry[1].append([column(name) for name in names])
+            entry[2].append(constants)
+
+        self._groups = list()
+        for shape, (rows, inputs, constants) in members.items():
+
+            tape   = record(shape)
+            rows   = np.asarray(rows, dtype=np.int64)
+            inputs = np.asarray(inputs, dtype=np.int64).reshape(len(rows), tape.slots)
+            consts = np.asarray(constants, dtype=np.float64).reshape(len(rows), tape.consts)
+            slots  = np.flatnonzero((inputs < len(self.variables)).any(axis=0))
+
+            self._groups.append(Group(tape, rows, inputs, consts, tuple(slots.tolist())))
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Name                      Description
+    # ------------------------------------------------------------------------------------------------------------------
+    # 1. from_model             System of a parsed script's constraints (and, optionally, objectives).
+    # 2. inputs                 Stacks variable- and parameter-values into the input-matrix.
+    # ------------------------------------------------------------------------------------------------------------------
+
+    @classmethod
+    def from_model(cls, _model: ScriptModel, _objectives: bool = False):
+        """
+        System of the constraints of a script, as `lhs - rhs` in declaration order, followed by the objectives if
+        `_objectives` is set.
+        """
+
+        rows = [(("sub", template.lhs, template.rhs), template.slots) for template in _model.templates]
+        if  _objectives:
+            for _, _, tree in _model.objectives:
+                names = tuple(sorted(symbols(tree)))
+                rows.append((slotted(tree, {name: slot for slot, name in enumerate(names)}), names))
+
+        return cls(rows, _model.variables)
+
+    def inputs(self, _x, _parameters: dict) -> np.ndarray:
+        """
+        Stack the values of the variables and parameters into the input-matrix of shape (sets, columns).
+
+        Parameters:
+            _x (array-like): Variable-values of shape (variables,) or (sets, variables).
+            _parameters (dict): Parameter-symbol -> value or array of shape (sets,).
+
+        Raises:
+            KeyError: If a parameter has no value.
+        """
+
+        _x = np.atleast_2d(np.asarray(_x, dtype=np.float64))
+        missing = [name for name in self.parameters if name not in _parameters]
+        if  missing:
+            raise KeyError(f"No value for parameter(s): {', '.join(missing[:10])}")
+
+        sets = max([len(_x), *(np.size(_parameters[name]) for name in self.parameters)])
+        Z    = np.empty((sets, len(self.variables) + len(self.parameters)))
+
+        Z[:, :len(self.variables)] = _x
+        for index, name in enumerate(self.parameters):
+            Z[:, len(self.variables) + index] = _parameters[name]
+
+        return Z
+
+    def _single(self, _x, _parameters: dict) -> bool:
+        return np.ndim(_x) == 1 and all(np.ndim(_parameters[name]) == 0 for name in self.parameters)
+
+
+# Class Jacobian: Sparse Jacobian of a system of expressions by automatic differentiation
+class Jacobian(System):
+    """
+    Exact first derivatives of a system of expressions (see `System`) with respect to its variables, in CSR form. The
+    pattern (`indptr`, `indices`) is fixed when the Jacobian is created; `values()` evaluates the nonzeros for any
+    number of variable- and parameter-sets at once. Derivatives come from one reverse sweep per group, so their cost
+    doesn't grow with the number of variables, unlike finite differences.
+    """
+
+    # Initializer:
+    def __init__(self, _rows: list[tuple[tuple, tuple]], _variables: list[str]):
+
+        super().__init__(_rows, _variables)
+
+        # Pattern: one entry per (row, variable); variables bound to several slots of a row share it:
+        n_vars = max(len(self.variables), 1)
+        keys   = list()
+        for group in self._groups:
+            member, slot = np.nonzero(group.inputs < len(self.variables))
+            keys.append(group.rows[member] * n_vars + group.inputs[member, slot])
+
+        keys, position = np.unique(np.concatenate(keys) if keys else np.zeros(0, dtype=np.int64), return_inverse=True)
+        self.indices   = (keys % n_vars).astype(np.int64)
+        self.indptr    = np.zeros(self.shape[0] + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys // n_vars, minlength=self.shape[0]), out=self.indptr[1:])
+
+        # Position of each (member, slot) derivative in the data-array:
+        offset = 0
+        for group in self._groups:
+            is_var = group.inputs < len(self.variables)
+            count  = int(is_var.sum())
+            group.targets = np.full(group.inputs.shape, -1, dtype=np.int64)
+            group.targets[is_var] = position[offset:offset + count]
+            offset += count
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Name                      Description
+    # ------------------------------------------------------------------------------------------------------------------
+    # 1. values                 Nonzeros of the Jacobian (reverse mode), for one or many sets.
+    # 2. evaluate               Values of the expressions and nonzeros of the Jacobian, in one pass.
+    # 3. matrix                 The Jacobian as a sparse CSR-matrix, for a single set.
+    # 4. jvp                    Jacobian-vector products (forward mode), without forming the Jacobian.
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def values(self, _x, _parameters: dict) -> np.ndarray:
+        """
+        Evaluate the nonzeros of the Jacobian (in the order of `indices`).
+
+        Returns:
+            np.ndarray: Shape (nonzeros,) if `_x` is one-dimensional and all parameters are scalars, otherwise
+                (sets, nonzeros).
+        """
+
+        return self.evaluate(_x, _parameters, False)[1]
+
+    def evaluate(self, _x, _parameters: dict, _expressions: bool = True) -> tuple[np.ndarray | None, np.ndarray]:
+        """
+        Evaluate the expressions (rows) and the nonzeros of the Jacobian, sharing the forward pass. For a linear
+        system, evaluated at `x = 0`, these are the negated right-hand sides and the coefficient matrix.
+
+        Returns:
+            tuple: (expressions, nonzeros) of shape (rows,) and (nonzeros,), or (sets, ...) as for `values()`. The
+                expressions are None if `_expressions` is not set.
+        """
+
+        Z    = self.inputs(_x, _parameters)
+        data = np.zeros((len(Z), len(self.indices)))
+        rows = np.zeros((len(Z), self.shape[0])) if _expressions else None
+
+        with np.errstate(all="ignore"):
+            for group in self._groups:
+
+                if  not group.variables and not _expressions:
+                    continue
+
+                inputs    = [Z[:, group.inputs[:, slot]] for slot in range(group.tape.slots)]
+                values, _ = group.tape.forward(inputs, group.constants)
+
+                if  _expressions:
+                    rows[:, group.rows] = values[-1]
+
+                for slot, adjoint in group.tape.reverse(values, group.variables).items():
+                    mask = group.targets[:, slot] >= 0
+                    data[:, group.targets[mask, slot]] += np.broadcast_to(adjoint, (len(Z), len(group.rows)))[:, mask]
+
+        if  self._single(_x, _parameters):
+            return None if rows is None else rows[0], data[0]
+
+        return rows, data
+
+    def matrix(self, _x, _parameters: dict) -> sp.csr_matrix:
+        return sp.csr_matrix((self.values(_x, _parameters), self.indices, self.indptr), shape=self.shape)
+
+    def jvp(self, _x, _parameters: dict, _v) -> np.ndarray:
+        """
+        Evaluate `J @ v` by forward-mode differentiation.
+
+        Parameters:
+            _v (array-like): Direction of shape (variables,) or (sets, variables).
+
+        Returns:
+            np.ndarray: Shape (rows,) or (sets, rows), as for `values()`.
+        """
+
+        Z = self.inputs(_x, _parameters)
+        V = np.zeros_like(Z)
+        V[:, :len(self.variables)] = np.atleast_2d(np.asarray(_v, dtype=np.float64))
+
+        out = np.zeros((len(Z), self.shape[0]))
+        with np.errstate(all="ignore"):
+            for group in self._groups:
+
+                if  not group.variables:
+                    continue
+
+                inputs   = [Z[:, group.inputs[:, slot]] for slot in range(group.tape.slots)]
+                tangents = [V[:, group.inputs[:, slot]] if slot in group.variables else None
+                            for slot in range(group.tape.slots)]
+
+                _, dots = group.tape.forward(inputs, group.constants, tangents)
+                if  dots[-1] is not None:
+                    out[:, group.rows] = dots[-1]
+
+        return out[0] if self._single(_x, _parameters) and np.ndim(_v) == 1 else out
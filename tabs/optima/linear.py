@@ -0,0 +1,343 @@
+import time
+import threading
+
+import numpy as np
+import scipy.sparse as sp
+
+from scipy.optimize import linprog
+from scipy.sparse.linalg import spsolve
+
+from tabs.optima.ampl import Solution
+from tabs.optima.expression import NonlinearError, degree, linearize
+from tabs.optima.jacobian import Jacobian
+from tabs.optima.script import ScriptModel
+from tabs.schema.equation import ParseError, symbols
+
+
+# Class LinearModel: Parsed linear AMPL script
+class LinearModel(ScriptModel):
+    """
+    Structure of a linear AMPL script, parsed once (see `ScriptModel`). `assemble()` turns it into sparse matrices
+    for a given set of parameter values: the coefficients are the Jacobian of the constraints and objectives (see
+    `Jacobian`), whose sparsity pattern is compiled on first use and kept for later assemblies.
+
+    Raises `ParseError` for statements outside the subset emitted by `ModelBuilder`, and `NonlinearError` if any
+    constraint or objective is not linear in the variables.
+    """
+
+    # Initializer:
+    def __init__(self, _script: str):
+
+        super().__init__(_script)
+
+        # Check linearity once, structurally (parameter values don't affect it and aren't evaluated):
+        for _, _, lhs, rhs in self.constraints:     self.check(("sub", lhs, rhs))
+        for _, _, tree in self.objectives:          self.check(tree)
+
+        # Rows of the equalities and inequalities, and the sign that turns the latter into `<=` rows:
+        relations   = np.array([relation for _, relation, _, _ in self.constraints], dtype=object)
+        self._eq    = np.flatnonzero(relations == "=")
+        self._ub    = np.flatnonzero(relations != "=")
+        self._sign  = np.where(relations[self._ub] == ">=", -1.0, 1.0)
+
+        self._jacobian = None
+
+    def check(self, _tree: tuple):
+        """
+        Raise `NonlinearError` if a tree isn't linear in the variables, and `ParseError` if it uses undeclared symbols.
+        """
+
+        # Membership per symbol, as `set - dict.keys()` would copy all keys for every row:
+        unknown = {symbol for symbol in symbols(_tree) if symbol not in self.defaults and symbol not in self.index}
+        if  unknown:
+            raise ParseError(f"Undeclared symbol(s): {', '.join(sorted(unknown))}")
+
+        degree(_tree, self.defaults)
+
+    def limits(self, _parameters: dict) -> list[tuple]:
+        """
+        Return the (lower, upper) bound of every variable, in column order (None if unbounded).
+        """
+
+        limits = [(None, None)] * len(self.variables)
+        for symbol, (lower, upper) in self.bounds.items():
+            limits[self.index[symbol]] = (
+                None if lower is None else linearize(lower, _parameters)[1],
+                None if upper is None else linearize(upper, _parameters)[1]
+            )
+
+        return limits
+
+    def row(self, _lhs: tuple, _rhs: tuple, _constants: dict) -> tuple[dict, float]:
+        """
+        Linearize `lhs - rhs` into (coefficients, -constant), i.e. the row and right-hand side of `A x (rel) b`.
+        """
+
+        coefs, const = linearize(("sub", _lhs, _rhs), _constants)
+        unknown = [symbol for symbol in coefs if symbol not in self.index]
+        if  unknown:
+            raise ParseError(f"Undeclared symbol(s): {', '.join(sorted(unknown))}")
+
+        return coefs, -const
+
+    @property # Jacobian (datatype = Jacobian): Rows of the constraints, then the objectives (compiled on first use)
+    def jacobian(self) -> Jacobian:
+
+        if  self._jacobian is None:
+            self._jacobian = Jacobian.from_model(self, True)
+
+        return self._jacobian
+
+    def assemble(self, _values: dict | None = None):
+        """
+        Assemble the model's matrices for the given parameter values. Rows are linear, so they are evaluated at
+        `x = 0`: the Jacobian holds the coefficients and the rows' values the negated right-hand sides.
+
+        Returns:
+            tuple: (A_eq, b_eq, A_ub, b_ub, c, c0, sense, parameters), with sparse CSR-matrices and `c`/`c0` the
+                coefficients and constant of the first objective (None if there is none).
+
+        Raises:
+            NonlinearError: If a coefficient or constant is undefined for the given values (e.g. division by zero).
+        """
+
+        parameters = self.parameters(_values)
+        jacobian   = self.jacobian
+        F, data    = jacobian.evaluate(np.zeros(len(self.variables)), parameters)
+
+        if  not (np.isfinite(F).all() and np.isfinite(data).all()):
+            raise NonlinearError("Undefined constant expression: coefficient(s) not finite for the parameter values")
+
+        J = sp.csr_matrix((data, jacobian.indices, jacobian.indptr), shape=jacobian.shape)
+        J.eliminate_zeros()
+
+        A_eq, b_eq = J[self._eq], -F[self._eq]
+        A_ub, b_ub = sp.diags(self._sign) @ J[self._ub], -self._sign * F[self._ub]
+
+        c, c0, sense = None, 0.0, None
+        if  self.objectives:
+
+            row   = len(self.constraints)
+            sense = self.objectives[0][1]
+            c, c0 = J[row].toarray().ravel(), float(F[row])
+
+        return A_eq.tocsr(), b_eq, A_ub.tocsr(), b_ub, c, c0, sense, parameters
+
+
+# Function is_linear: Checks whether a script can be solved by `LinearSession`
+def is_linear(_script: str) -> bool:
+
+    try:
+        LinearModel(_script)
+        return True
+
+    except (ValueError, ArithmeticError, RecursionError):
+        return False
+
+
+# Class LinearSession: AMPL-free backend for linear models
+class LinearSession:
+    """
+    Mirrors the interface of `AMPLSession` for linear models. Balances (as many independent equations as variables,
+    no inequalities, no objective) are solved with a sparse direct solver, everything else with `linprog` (HiGHS).
+    The parsed model is kept across runs with the same structure, so what-if runs only re-assemble the matrices.
+    HiGHS stops at `time_limit` on its own; `interrupt()` takes effect between the stages of a solve.
+    """
+
+    # Initializer:
+    def __init__(self, _time_limit: float | None = None):
+
+        self.time_limit = _time_limit
+        self.listener   = None
+
+        self._model     = None
+        self._signature = None
+        self._values    = dict()
+        self._result    = None
+        self._error     = str()
+        self._timing    = dict()
+        self._parsed    = (None, None)  # (script, model) of the last call to `accepts()`
+        self._interrupt = threading.Event()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Name                      Description
+    # ------------------------------------------------------------------------------------------------------------------
+    # 1. accepts                Checks whether a script is linear (the parsed model is reused by `load()`).
+    # 2. load                   Loads a script.
+    # 3. solve                  Solves the loaded model.
+    # 4. interrupt              Stops a running solve at the next stage (thread-safe).
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def start(self):    pass
+
+    def accepts(self, _script: str) -> bool:
+
+        try:
+            self._parsed = (_script, LinearModel(_script))
+            return True
+
+        # Scripts that can't be parsed or evaluated (or are nested too deeply to) are left to AMPL:
+        except (ValueError, ArithmeticError, RecursionError) as error:
+            self._error  = str(error)
+            self._parsed = (None, None)
+            return False
+
+    def load(self, _script: str, _signature = None, _values: dict | None = None) -> bool | None:
+
+        self._error = str()
+        start       = time.perf_counter()
+        in_place    = _signature is not None and _signature == self._signature and self._model is not None
+
+        if  not in_place:
+            try:
+                script, model = self._parsed
+                self._model   = model if script is _script or script == _script else LinearModel(_script)
+                self._parsed  = (None, None)
+
+            except (ValueError, ArithmeticError) as error:
+                self._error     = str(error)
+                self._signature = None
+                return None
+
+        self._values    = dict(_values or {})
+        self._signature = _signature
+        self._timing    = {"eval": time.perf_counter() - start}
+        return in_place
+
+    def solve(self, _initial: dict | None = None):
+        """
+        Solve the loaded model. Initial values are not needed by the direct and simplex/IPM solvers and are ignored.
+
+        Returns:
+            Solution | None: The results, or None if the model could not be solved.
+        """
+
+        model = self._model
+        start = time.perf_counter()
+        self._interrupt.clear()
+
+        try:
+            A_eq, b_eq, A_ub, b_ub, c, c0, sense, parameters = model.assemble(self._values)
+            limits = model.limits(parameters)
+
+        except (ValueError, ArithmeticError) as error:
+            self._error, self._result = str(error), "failure"
+            return None
+
+        self._timing["eval"] += time.perf_counter() - start
+        if  self.interrupted():
+            return None
+
+        self._emit(f"Linear backend: {len(model.variables)} variables, {A_eq.shape[0]} equalities, "
+                   f"{A_ub.shape[0]} inequalities\n")
+
+        start = time.perf_counter()
+        x     = None
+
+        # Nothing left to solve (e.g. after presolve), only check the constant rows:
+        if  not model.variables:
+
+            if  np.all(np.abs(b_eq) <= 1e-9) and np.all(b_ub >= -1e-9):
+                x, self._result = np.zeros(0), "solved"
+
+            else:
+                self._error, self._result = "Constant constraint(s) violated", "infeasible"
+                return None
+
+        # Square balance: sparse direct solve:
+        elif c is None and A_ub.shape[0] == 0 and A_eq.shape[0] == A_eq.shape[1] > 0:
+
+            with np.errstate(all="ignore"):
+                try:                x = spsolve(A_eq.tocsc(), b_eq)
+                except Exception:   x = None
+
+            lower = np.array([-np.inf if lo is None else lo for lo, _ in limits])
+            upper = np.array([+np.inf if hi is None else hi for _, hi in limits])
+
+            if  x is not None and np.all(np.isfinite(x)) and np.all((x >= lower - 1e-9) & (x <= upper + 1e-9)):
+                self._emit("Sparse direct solve: solved\n")
+                self._result = "solved"
+
+            else:
+                x = None
+                self._emit("Sparse direct solve: singular system or bounds violated, falling back to linprog\n")
+
+        # Optimization, or non-square/singular balance: linprog (HiGHS):
+        if  x is None and self.interrupted():
+            return None
+
+        if  x is None:
+
+            objective = np.zeros(len(model.variables)) if c is None else (-c if sense == "maximize" else c)
+            options   = {"time_limit": self.time_limit} if self.time_limit else {}
+            result    = linprog(objective,
+                                A_ub=A_ub if A_ub.shape[0] else None,
+                                b_ub=b_ub if A_ub.shape[0] else None,
+                                A_eq=A_eq if A_eq.shape[0] else None,
+                                b_eq=b_eq if A_eq.shape[0] else None,
+                                bounds=limits,
+                                method="highs",
+                                options=options)
+
+            self._emit(f"HiGHS: {result.message}\n")
+            if  self.interrupted():
+                return None
+
+            self._result = {0: "solved", 1: "limit", 2: "infeasible", 3: "unbounded"}.get(result.status, "failure")
+
+            if  result.status != 0:
+                self._error = result.message
+                return None
+
+            x = result.x
+
+        self._timing["solve"] = time.perf_counter() - start
+
+        start    = time.perf_counter()
+        obj      = {} if c is None else {model.objectives[0][0]: float(c @ x + c0)}
+        solution = Solution(np.array(model.variables, dtype=object),
+                            np.asarray(x, dtype=np.float64),
+                            np.array(list(parameters), dtype=object),
+                            np.fromiter(parameters.values(), np.float64, len(parameters)),
+                            np.array(list(obj), dtype=object),
+                            np.fromiter(obj.values(), np.float64, len(obj)))
+
+        self._timing["extract"] = time.perf_counter() - start
+        solution.timing = dict(self._timing)
+        return solution
+
+    def _emit(self, _message: str):
+
+        if  self.listener is not None:
+            self.listener(_message)
+
+    def interrupted(self) -> bool:
+        """
+        Returns True (and marks the run as interrupted) if `interrupt()` was called since the solve started.
+        """
+
+        if  self._interrupt.is_set():
+            self._emit("Linear backend: interrupted\n")
+            self._error, self._result = "Solve interrupted", "interrupted"
+            return True
+
+        return False
+
+    def interrupt(self):    self._interrupt.set()
+
+    def shutdown(self):     self._model = None
+
+    @property
+    def options(self):  return {"backend": "linear", "time_limit": self.time_limit}
+
+    @property
+    def running(self):  return self._model is not None
+
+    @property
+    def result(self):   return self._result
+
+    @property
+    def output(self):   return str()
+
+    @property
+    def error(self):    return self._error
@@ -0,0 +1,289 @@
+import math
+
+from dataclasses import dataclass, field
+
+from tabs.schema.flowgraph import FlowGraph
+
+
+# Function fmt: Formats a float for an AMPL script
+def fmt(_value: float) -> str:
+    return repr(float(_value))
+
+
+# Function dat: Renders parameter values as an AMPL data-section
+def dat(_parameters: dict) -> str:
+    return "".join(f"param {symbol} := {fmt(value)};\n" for symbol, value in _parameters.items())
+
+
+# Class Fragment: Generated AMPL-block of a single node
+@dataclass
+class Fragment:
+    """
+    AMPL-block generated for a single node. Declarations are kept separate from the rendered equations, because a
+    connector-symbol is shared by two nodes and must only be declared once in the script.
+    """
+
+    revision    : int                                   # Node-revision the fragment was generated for
+    declarations: list = field(default_factory=list)    # (symbol, entity-id, is-parameter, declaration, bounds)
+    equations   : str  = ""                             # Rendered equations of the node
+
+
+# Class ModelBuilder: Section-buffered AMPL emitter
+class ModelBuilder:
+    """
+    Generates an AMPL script from a `FlowGraph`. Each section (parameters, variables, objectives, equations) is
+    collected in a list and joined once, and the block generated for each node is cached against the node's revision
+    counter, so regenerating after an edit only re-emits the nodes whose revision has changed.
+
+    Constraints are named after the node they belong to (`equation_<node-uid>_<index>`) and bounds after the symbol
+    they restrict (`bound_<symbol>_min/max`), so editing one node does not renumber the rest of the script.
+
+    Parameters are declared with `default` values, so that a warm AMPL session can update them in place. `signature`
+    identifies the structure of the last script (everything but parameter values), and `parameters` holds the values.
+    The same script is also available split into its structure (`model`, a .mod-file without parameter values) and
+    its data (`data`, a .dat-file). Parameter values are read from the graph when the script is joined, not cached in
+    the fragments, so edits of values alone (see `FlowGraph.DATA_FIELDS`) never regenerate a node's block, and
+    `reload()` picks them up without rebuilding the script at all.
+    """
+
+    # Script prefix:
+    PREFIX = "# AMPL Optimization\n"
+
+    # Initializer:
+    def __init__(self, _graph: FlowGraph):
+
+        self._graph = _graph
+        self._cache = dict()    # Node-id -> Fragment
+
+        # Filled by `build()`:
+        self.entity_map = dict()    # Symbol -> entity-id
+        self.parameters = dict()    # Parameter-symbol -> value
+        self.signature  = None      # Hash of the script's structure
+        self.structural = True      # Whether the last build changed the script's structure (signature)
+        self.script     = None      # The last script
+
+        # Structure of the last build, reused by `reload()`:
+        self._sections   = list()   # Variable-, objective- and equation-sections
+        self._objectives = None
+        self._revision   = -1       # Graph-revision
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Name                      Description
+    # ------------------------------------------------------------------------------------------------------------------
+    # 1. declare                Renders the declaration (and bounds) of a single symbol.
+    # 2. fragment               Returns the (cached) fragment of a node.
+    # 3. build                  Joins all fragments into a script.
+    # 4. join                   Renders the parameter-section and joins it with the other sections.
+    # 5. reload                 Re-reads parameter values if only values have changed since the last build.
+    # 6. model, data            The last script's structure (.mod) and parameter values (.dat).
+    # 7. invalidate             Drops the cached fragments.
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def declare(self, _symbol: str, _eid: int) -> tuple:
+        """
+        Render the declaration of a symbol. The symbol is declared as a parameter if its entity has a value, and as
+        a variable (with optional bound-constraints) otherwise.
+
+        Parameters:
+            _symbol (str): Model-symbol.
+            _eid (int): Entity-id the symbol is declared for.
+
+        Returns:
+            tuple: (symbol, entity-id, is-parameter, declaration, bounds)
+        """
+
+        # Parameter values are filled in by `build()`:
+        value = self._graph.ent_float["value"][_eid]
+        if  not math.isnan(value):
+            return _symbol, _eid, True, f"param {_symbol}", ""
+
+        bounds  = str()
+        minimum = self._graph.ent_float["minimum"][_eid]
+        maximum = self._graph.ent_float["maximum"][_eid]
+
+        if  not math.isnan(minimum):    bounds += f"subject to bound_{_symbol}_min: {_symbol} - {fmt(minimum)} >= 0.0;\n"
+        if  not math.isnan(maximum):    bounds += f"subject to bound_{_symbol}_max: {_symbol} - {fmt(maximum)} <= 0.0;\n"
+
+        return _symbol, _eid, False, f"var {_symbol};\n", bounds
+
+    def fragment(self, _nid: int) -> Fragment:
+        """
+        Return the fragment of a node, regenerating it only if the node's revision has changed.
+
+        Parameters:
+            _nid (int): Node-id.
+
+        Returns:
+            Fragment: The node's AMPL-block.
+        """
+
+        revision = int(self._graph.node_rev[_nid])
+        cached   = self._cache.get(_nid)
+        if  cached is not None and cached.revision == revision:
+            return cached
+
+        graph    = self._graph
+        n_prefix = graph.node_uid[_nid]
+        fragment = Fragment(revision)
+
+        # Handles are declared under their connector's symbol (unconnected handles are skipped):
+        for eid in graph.handles(_nid):
+            symbol = graph.symbol_of(eid)
+            if  symbol is not None:
+                fragment.declarations.append(self.declare(symbol, eid))
+
+        # Parameters are prefixed with the node's UID:
+        for eid in graph.parameters(_nid):
+            symbol = f"{n_prefix}_{graph.ent_text['symbol'][eid]}"
+            fragment.declarations.append(self.declare(symbol, eid))
+
+        fragment.equations = "".join(
+            f"subject to equation_{n_prefix}_{index}: {equation};\n"
+            for index, equation in enumerate(graph.substituted(_nid))
+        )
+
+        self._cache[_nid] = fragment
+        return fragment
+
+    def build(self, _objectives: dict) -> str:
+        """
+        Generate the AMPL script.
+
+        Parameters:
+            _objectives (dict): Objective expression -> "Maximize" or "Minimize" (see `ObjectiveSetup`).
+
+        Returns:
+            str: The AMPL script.
+        """
+
+        # Only values have changed, the structure of the last script is reused:
+        if  self.reload(_objectives):
+            return self.script
+
+        graph = self._graph
+        self.entity_map.clear()
+        self.parameters.clear()
+
+        # Section buffers (the parameter-section is rendered by `join()`):
+        var_section = ["# Variable(s):\n"]
+        obj_section = ["# Objective(s):\n"]
+        eqn_section = ["# Equation(s):\n"]
+
+        # Declares a symbol once, the first entity to claim it wins:
+        def emit(_symbol, _eid, _is_par, _declaration, _bounds):
+
+            if  _symbol in self.entity_map:
+                return
+
+            self.entity_map[_symbol] = _eid
+            if  _is_par:
+                self.parameters[_symbol] = float(graph.ent_float["value"][_eid])
+
+            else:
+                var_section.append(_declaration)
+                if _bounds: eqn_section.append(_bounds)
+
+        # Total-flow of connected, labelled terminals:
+        for nid in graph.nodes(FlowGraph.Role.TERMINAL):
+
+            handles = graph.handles(nid)
+            if  not handles:
+                continue
+
+            socket = handles[0]
+            label  = graph.ent_text["label"][socket]
+            if  not label or graph.symbol_of(socket) is None:
+                continue
+
+            symbol, eid, is_par, declaration, _ = self.declare(f"TOTAL_{label}", socket)
+            emit(symbol, eid, is_par, declaration, "")
+
+        # Node-blocks:
+        for nid in graph.nodes(FlowGraph.Role.NODE):
+
+            fragment = self.fragment(nid)
+            for declaration in fragment.declarations:
+                emit(*declaration)
+
+            eqn_section.append(fragment.equations)
+
+        # Objectives:
+        ocount = 0
+        for objective, sense in _objectives.items():
+            if bool(objective):
+                obj_section.append(f"{sense.lower()} obj_{ocount}: {objective};\n")
+                ocount += 1
+
+        self._sections = [
+            "".join(var_section),
+            "".join(obj_section),
+            "".join(eqn_section)
+        ]
+
+        # Parameter values are excluded from the signature (see `AMPLSession.load()`):
+        signature = hash((tuple(self.parameters), *self._sections))
+
+        self.structural  = signature != self.signature
+        self.signature   = signature
+        self._objectives = dict(_objectives)
+        self._revision   = graph.revision
+
+        self.script = self.join()
+        return self.script
+
+    def join(self, _values: bool = True) -> str:
+        """
+        Join the parameter-section and the cached sections into a script. Parameters are declared at their current
+        value, or without a value if `_values` is False.
+        """
+
+        declarations = "".join(
+            f"param {symbol} default {fmt(value)};\n" if _values else f"param {symbol};\n"
+            for symbol, value in self.parameters.items()
+        )
+
+        return "\n".join([self.PREFIX, "# Parameter(s):\n" + declarations, *self._sections])
+
+    def reload(self, _objectives: dict) -> bool:
+        """
+        Re-read the parameter values from the graph, if neither the graph's structure nor the objectives have changed
+        since the last build. The script is re-joined with the new values, and `signature` is kept.
+
+        Parameters:
+            _objectives (dict): Objective expression -> "Maximize" or "Minimize" (see `ObjectiveSetup`).
+
+        Returns:
+            bool: True if the values were reloaded, False if the script has to be rebuilt.
+        """
+
+        if  self.script is None or self._revision != self._graph.revision or self._objectives != _objectives:
+            return False
+
+        values = self._graph.ent_float["value"]
+        for symbol in self.parameters:
+            self.parameters[symbol] = float(values[self.entity_map[symbol]])
+
+        self.structural = False
+        self.script     = self.join()
+        return True
+
+    @property
+    def model(self) -> str:
+        """
+        The last script without parameter values (a .mod-file, see `data`).
+        """
+
+        return self.join(False)
+
+    @property
+    def data(self) -> str:
+        """
+        The parameter values of the last script (a .dat-file, see `model`).
+        """
+
+        return dat(self.parameters)
+
+    def invalidate(self):
+
+        self._cache.clear()
+        self._revision = -1
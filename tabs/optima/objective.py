@@ -101,4 +101,8 @@ class ObjectiveSetup(QFrame):
             self.__editor_3.text() : self.__choice_3.selected()
         }
 
-        return objectives
\ No newline at end of file
+        return objectives
+
+    # Get optimization type ("Scalarized" or "Pareto"):
+    def get_opt_type(self) -> str:
+        return self.__group_1.checkedButton().text()
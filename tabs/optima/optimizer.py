@@ -1,18 +1,42 @@
-from PyQt6.QtCore import pyqtSignal
-from PyQt6.QtWidgets import QWidget, QGridLayout, QTextEdit, QLabel, QPushButton, QFrame, QStackedWidget, QTabWidget
+import numpy as np
+
+from PyQt6.QtGui import QTextCursor
+from PyQt6.QtCore import pyqtSignal, QTimer
+from PyQt6.QtWidgets import QWidget, QGridLayout, QTextEdit, QLabel, QPushButton, QFrame, QStackedWidget, QTabWidget, QSpinBox, QCheckBox, QFileDialog, QTableWidget, QTableWidgetItem
 
-from custom.entity import EntityClass, EntityState
 from custom.separator import Separator
 
-from tabs.optima.ampl import AMPLEngine
+from tabs.optima.ampl import Solution
+from tabs.optima.cache import SolutionCache, solution_key
+from tabs.optima.model import ModelBuilder
 from tabs.optima.objective import ObjectiveSetup
+from tabs.optima.session import sessions
+from tabs.optima.structure import StructureAnalyzer, StructureReport
+from tabs.optima.decompose import BlockSession
+from tabs.optima.presolve import PresolveSession
+from tabs.optima.residual import compile_residual
+from tabs.optima.worker import SolveThread
+from tabs.optima.writers import write_model
+from tabs.optima.panels import Context, ScenarioPanel, ParetoPanel, UncertaintyPanel, SensitivityPanel, SurrogatePanel
 from tabs.schema.canvas import Canvas
 
 
 class Optimizer(QWidget):
 
     # Signals:
-    sig_modify_connectors = pyqtSignal(dict)
+    sig_modify_connectors = pyqtSignal(object)     # Emitted with the `Solution` of a finished solve
+
+    # Default wall-clock limit for a solve (seconds):
+    TIME_LIMIT = 600
+
+    # Delay (ms) between the last canvas-edit and the structural analysis:
+    ANALYSIS_DELAY = 250
+
+    # Delay (ms) between the last data-table commit and a live re-solve (commits within it are coalesced):
+    LIVE_DELAY = 400
+
+    # Tolerance of the residual check of solutions, relative to the largest variable value (see `verify()`):
+    TOLERANCE = 1e-6
 
     # Initializer:
     def __init__(self, canvas: Canvas, parent: QWidget = None):
@@ -21,13 +45,53 @@ class Optimizer(QWidget):
         super().__init__(parent)
 
         # Dictionaries:
-        self.var_dict   = dict()
+        self.var_dict   = dict()    # Last solution: variable-symbol -> value
         self.par_dict   = dict()
-        self.entity_map = dict()
+        self.entity_map = dict()    # Symbol -> entity-id (see `ModelBuilder`)
+
+        # Last solution by entity-id, for warm-starts (connector-symbols may be reassigned between runs):
+        self._warm = dict()
 
         # Store the canvas' reference:
         self._canvas = canvas
 
+        # Script-builder, reads the canvas' flow-graph:
+        self._builder = ModelBuilder(canvas.graph)
+        self._script  = None    # Last generated script
+
+        # Solutions of previous runs, persisted across sessions, and the cache-key of the running solve:
+        self._cache = SolutionCache()
+        self._key   = None
+
+        # Solver thread, and a timer enforcing the wall-clock limit:
+        self._thread  = None
+        self._timer   = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.on_time_limit)
+
+        # Structural analysis (degrees of freedom, singularities), re-run shortly after each canvas-edit:
+        self._structure = StructureAnalyzer(canvas.graph)
+        self._analysis  = QTimer(self)
+        self._analysis.setSingleShot(True)
+        self._analysis.setInterval(Optimizer.ANALYSIS_DELAY)
+        self._analysis.timeout.connect(self.analyze)
+
+        # Live re-solve of data-table commits (see `on_data_committed()`): debounce-timer, wall-clock limit, the running
+        # live solve and its cache-key, and whether a newer commit or a manual run waits for the running solve to stop:
+        self._live = QTimer(self)
+        self._live.setSingleShot(True)
+        self._live.setInterval(Optimizer.LIVE_DELAY)
+        self._live.timeout.connect(self.live_solve)
+
+        self._live_limit = QTimer(self)
+        self._live_limit.setSingleShot(True)
+        self._live_limit.timeout.connect(self.on_live_limit)
+
+        self._live_thread = None
+        self._live_key    = None
+        self._live_queued = False
+        self._run_queued  = False
+
         # Editor style:
         style = ("QTextEdit {"
                  "border: none;"
@@ -46,6 +110,7 @@ class Optimizer(QWidget):
         self._wstack = QStackedWidget(self)
         self._editor = QTextEdit(self)
         self._result = QTextEdit(self)
+        self._tables = QTableWidget(self)
         self._setup  = QWidget(self)
         self._obj    = ObjectiveSetup(None)
 
@@ -57,7 +122,7 @@ class Optimizer(QWidget):
         # Organize tab-widget:
         self._tabwid.addTab(self._editor, "Model")
         self._tabwid.addTab(self._result, "Log")
-        self._tabwid.addTab(QWidget(), "Analysis")
+        self._tabwid.addTab(self._tables, "Analysis")
 
         # Separators:
         __hline_top = Separator(QFrame.Shape.HLine, None)
@@ -71,6 +136,43 @@ class Optimizer(QWidget):
         self.__gen.pressed.connect(self.generate)
         self.__run.pressed.connect(self.run)
 
+        self.__stb = QCheckBox("Stub Solver")
+        self.__lin = QCheckBox("Native Linear Solver")
+        self.__dec = QCheckBox("Decompose")
+        self.__pre = QCheckBox("Presolve")
+        self.__exp = QPushButton("Export Model")
+        self.__lin.setChecked(True)
+        self.__exp.pressed.connect(self.export_model)
+
+        self.__live = QCheckBox("Live Solve")
+        self.__live.setToolTip("Re-solve the model shortly after parameter values are committed in the data-table")
+        self.__live.toggled.connect(self.on_live_toggled)
+
+        # Analysis panels, run on the generated model (see `context()`). The sensitivity analysis uses the sampling
+        # setup of the Monte Carlo panel, and surrogates are fitted to its last run:
+        self._scenarios   = ScenarioPanel(self.context, self)
+        self._uncertainty = UncertaintyPanel(self.context, self)
+        self._pareto      = ParetoPanel(self.context, self)
+        self._sensitivity = SensitivityPanel(self.context, self._uncertainty, self)
+        self._surrogate   = SurrogatePanel(self.context, self)
+
+        self._uncertainty.sig_ensemble_ready.connect(self._surrogate.set_ensemble)
+        self._pareto.sig_running.connect(self.on_sweep_running)
+
+        for panel in (self._scenarios, self._uncertainty, self._pareto, self._sensitivity, self._surrogate):
+            panel.sig_log_cleared.connect(self.on_log_cleared)
+            panel.sig_log_message.connect(self.on_log_message)
+            panel.sig_table_ready.connect(self.on_table_ready)
+
+        # Structure of the model (see `analyze()`):
+        self._dof = QLabel(self)
+
+        # Wall-clock time limit:
+        self._limit = QSpinBox(self)
+        self._limit.setRange(1, 86400)
+        self._limit.setValue(Optimizer.TIME_LIMIT)
+        self._limit.setSuffix(" s")
+
         # Layout:
         self.__main_layout = QGridLayout(self)
         self.__main_layout.setContentsMargins(0, 0, 0, 0)
@@ -91,194 +193,476 @@ class Optimizer(QWidget):
         self.__setup_layout.addWidget(self._wstack, 4, 0, 1, 4)
         self.__setup_layout.setRowStretch(5, 10)
 
+        self.__setup_layout.addWidget(QLabel("Time Limit"), 5, 0)
+        self.__setup_layout.addWidget(self._limit, 5, 1)
         self.__setup_layout.addWidget(self.__gen, 5, 2)
         self.__setup_layout.addWidget(self.__run, 5, 3)
+        self.__setup_layout.addWidget(self.__lin, 6, 0, 1, 2)
+        self.__setup_layout.addWidget(self.__stb, 6, 2)
+        self.__setup_layout.addWidget(self.__dec, 7, 0, 1, 2)
+        self.__setup_layout.addWidget(self.__pre, 7, 2)
+        self.__setup_layout.addWidget(self.__exp, 7, 3)
+        self.__setup_layout.addWidget(self._scenarios, 8, 0, 1, 4)
+        self.__setup_layout.addWidget(self._uncertainty, 9, 0, 1, 4)
+        self.__setup_layout.addWidget(self._pareto, 10, 0, 1, 4)
+        self.__setup_layout.addWidget(self._sensitivity, 11, 0, 1, 4)
+        self.__setup_layout.addWidget(self._surrogate, 12, 0, 1, 4)
+        self.__setup_layout.addWidget(self.__live, 13, 0, 1, 2)
+        self.__setup_layout.addWidget(self._dof, 14, 0, 1, 4)
 
         # Signal-slot connections:
         self._editor.textChanged.connect(self.auto_enable)
+        self.sig_modify_connectors.connect(self._canvas.apply_results)
+        self._canvas.sig_canvas_state.connect(lambda: self._analysis.start())
 
     # Generates an AMPL script:
     def generate(self):
 
-        # Clear editor:
-        self._editor.clear()
+        self.par_dict.clear()
 
-        var_set = set()
-        par_set = set()
+        # Only nodes edited since the last call are re-emitted, and value-only edits reuse the last script's structure
+        # (see `ModelBuilder`):
+        self._script    = self._builder.build(self._obj.get_objectives())
+        self.entity_map = self._builder.entity_map
 
-        self.par_dict.clear()
-        self.var_dict.clear()
-        self.entity_map.clear()
+        self._editor.setText(self._script)
+        self.analyze(self._builder)
 
-        ecount = 0
-        ocount = 0
-        scr_prfx = "# AMPL Optimization\n"
-        eqn_prfx = f"subject to equation_"
+    def context(self) -> Context:
+        """
+        Generate the script and return it with everything the analysis panels need to solve it.
+        """
 
-        # Sections:
-        var_section = "# Variable(s):\n"
-        eqn_section = "# Equation(s):\n"
-        obj_section = "# Objective(s):\n"
-        par_section = "# Parameter(s):\n"
+        self.generate()
 
-        for terminal, state in self._canvas.term_db.items():
+        parameters = dict(self._builder.parameters)
+        return Context(self._script,
+                       parameters,
+                       [symbol for symbol in self.entity_map if symbol not in parameters],
+                       self.entity_map,
+                       self._canvas.graph,
+                       self.backend(self._script),
+                       self._limit.value(),
+                       self.initial_values())
 
-            # Skip unconnected terminals or hidden terminals::
-            if (
-                not bool(terminal.socket.label) or 
-                not terminal.socket.connected or
-                not state
-            ):  
-                continue
+    @property
+    def whatif(self):
+        """
+        What-if queries on the last fitted surrogate (see `SurrogatePanel`), or None.
+        """
 
-            # Define entity name:
-            entity_name = f"TOTAL_{terminal.socket.label}"
+        return self._surrogate.whatif
 
-            # Define total-flow variable:
-            if (
-                    entity_name not in var_set and
-                    entity_name not in par_set
-            ):
+    def run(self):
 
-                if bool(terminal.socket.value): # If value is provided, define entity as parameter
+        # If a solve is in progress, the button cancels it:
+        if  self._thread is not None:
+            self._thread.cancel()
+            self._result.append("Solve cancelled.")
+            return
+
+        if  self._pareto.running:
+            self._pareto.cancel("Pareto sweep cancelled, waiting for running points to finish.")
+            return
+
+        if  self._obj.get_opt_type() == "Pareto":
+            self._pareto.run()
+            return
+
+        # A running live solve uses the same warm session, so it's stopped first and the run starts once it has
+        # finished (see `on_live_finished()`):
+        if  self._live_thread is not None:
+            self._live_queued = False
+            self._run_queued  = True
+            self._live_thread.cancel()
+            self._result.append("Stopping the live solve, the model is solved once it has finished.")
+            return
+
+        # Values edited (e.g. in the data-table) since the script was generated are picked up without rebuilding it, as
+        # long as the script hasn't been edited by hand and the model's structure hasn't changed:
+        script = self._editor.toPlainText()
+        if  script == self._script and self._builder.reload(self._obj.get_objectives()) and self._builder.script != script:
+            self._script = script = self._builder.script
+            self._editor.setText(script)
+
+        # Structurally singular models are reported before they reach the solver:
+        report = self.analyze() if script == self._script else None
+
+        # Reuse the canvas' warm session. If the script hasn't been edited by hand since it was generated, only the
+        # changed parameter values are sent to the solver. Decomposed models are solved block-wise across a pool of
+        # worker-processes (see decompose.py):
+        backend = self.backend(script)
+        session = BlockSession(backend, _timeout=self._limit.value()) if self.__dec.isChecked() else \
+                  sessions.session(self._canvas.uid, backend, self._limit.value())
+
+        # Presolve reduces the script for the current parameter values before it reaches the session:
+        if  self.__pre.isChecked():
+            session = PresolveSession(session)
+
+        initial = self.initial_values()
+        values  = dict(self._builder.parameters) if script == self._script else None
+
+        # Unchanged models (same canonical script, parameter values and solver options) are answered from the cache:
+        self._key = solution_key(script, values, session.options)
+        cached    = self._cache.get(self._key)
+        if  cached is not None:
+            self._result.clear()
+            self._result.append(f"Backend: {backend} (cached result {self._key[:12]})")
+            self._tabwid.setCurrentWidget(self._result)
+            self.show_result("solved", cached, str())
+            if  values is not None:
+                self.verify(cached)
+
+            return
+
+        if  values is not None: thread = SolveThread(session, script, self._builder.signature, values, initial)
+        else:                   thread = SolveThread(session, script, _initial=initial)
+
+        thread.output_ready.connect(self.on_output_ready)
+        thread.result_ready.connect(self.on_result_ready)
+        thread.error_occurred.connect(self._result.append)
+        thread.finished.connect(self.on_thread_finished)
+
+        self._result.clear()
+        self._result.append(f"Backend: {backend}")
+        self._tabwid.setCurrentWidget(self._result)
 
-                    par_section = f"param TOTAL_{terminal.socket.label} = {terminal.socket.value};\n"
-                    par_set.add(entity_name)
+        if  report is not None and report.singular:
+            self._result.append(f"{report}\n")
 
-                    # Map variable name to entity:
-                    self.entity_map[entity_name] = terminal.socket
+        self._thread = thread
+        self._thread.start()
+        self._timer.start(self._limit.value() * 1000)
 
-                else:   # Define as variable
+        self.__gen.setEnabled(False)
+        self.__run.setText("Cancel")
 
-                    var_section += f"var {entity_name};\n"
-                    var_set.add(entity_name)
+    def analyze(self, builder: ModelBuilder | None = None) -> StructureReport:
+        """
+        Run the structural analysis of the canvas' equations (see structure.py) and show its summary. Variables are
+        taken from the builder's last script if given, and derived from the flow-graph otherwise.
+        """
 
-                    # Map variable name to entity:
-                    self.entity_map[entity_name] = terminal.socket
+        variables = None if builder is None else [symbol for symbol in builder.entity_map if symbol not in builder.parameters]
+        report    = self._structure.analyze(variables)
 
-                    # group, equation = self._canvas.group_flows(terminal.socket.label, generate_eqn = True)
-                    # eqn_section += f"{eqn_prfx}{ecount}: {equation}\n"
-                    #ecount += 1
+        self._dof.setText(f"Equations: {report.equations}  Variables: {report.variables}  DOF: {report.dof}  "
+                          f"Redundant: {report.redundant}  Loops: {len(report.blocks)}")
+        self._dof.setStyleSheet("QLabel {color: #c0392b;}" if report.singular else "")
+        self._dof.setToolTip(str(report))
+        return report
 
-        for node, state in self._canvas.node_db.items():
+    def backend(self, script: str) -> str:
+        """
+        Choose the backend for a script: the stub solver if selected, the native linear solver if selected and the
+        script is linear, and AMPL otherwise.
+        """
 
-            # Skip hidden nodes:
-            if not state: continue
+        if  self.__stb.isChecked():
+            return "stub"
 
-            n_prefix = node.uid
-            var_list = [
-                variable for variable, state in node[EntityClass.VAR].items() 
-                if state == EntityState.ACTIVE
-            ]
+        if  self.__lin.isChecked() and sessions.session(self._canvas.uid, "linear").accepts(script):
+            return "linear"
 
-            par_list = [
-                parameter for parameter, state in node[EntityClass.PAR].items()
-                if state == EntityState.ACTIVE
-            ]
+        return "ampl"
 
-            print(f"Node has {len(var_list)} variables and {len(par_list)} parameters")
+    def initial_values(self) -> dict:
+        """
+        Return the previous solution of each variable in the current model, resolved through `entity_map`.
+        """
 
-            for variable in var_list:
+        return {
+            symbol: self._warm[eid]
+            for symbol, eid in self.entity_map.items()
+            if  eid in self._warm
+        }
 
-                # Null-check:
-                if variable.connector is None:  continue
+    def on_output_ready(self, line: str):
 
-                symbol = variable.connector().symbol
-                self.entity_map[symbol] = variable
+        self._result.moveCursor(QTextCursor.MoveOperation.End)
+        self._result.insertPlainText(line)
 
-                # If the variable is already declared, skip processing:
-                if  symbol in var_set | par_set:
-                    continue
+    def on_result_ready(self, result: Solution | None):
 
-                # Declare variable (as a parameter if its value is defined):
-                if  bool(variable.value):
-                    par_set.add(symbol)
-                    par_section += f"param {symbol} = {variable.value};\n"
+        session = self._thread.session
+        if  result is not None and session.result == "solved":
+            self._cache.put(self._key, result)
 
-                else:
-                    var_set.add(symbol)
-                    var_section += f"var {symbol};\n"
+        self.show_result(session.result, result, session.error)
 
-                    # If bounds are provided, add them as equations:
-                    if  bool(variable.minimum):
-                        eqn_section += f"{eqn_prfx}{ecount}: {symbol} - {variable.minimum} >= 0.0;\n"
-                        ecount += 1
+        # Solutions of the generated script are checked against the canvas' equations:
+        thread = self._thread
+        if  result is not None and thread.values is not None and thread.signature == self._builder.signature:
+            self.verify(result)
 
-                    if  bool(variable.maximum):
-                        eqn_section += f"{eqn_prfx}{ecount}: {symbol} - {variable.maximum} <= 0.0;\n"
-                        ecount += 1
+    def show_result(self, status: str, result: Solution | None, error: str):
 
-            for parameter in par_list:
+        self._result.append("-" * 36)
+        self._result.append(f"AMPL Result: [{status}]")
+        self._result.append("-" * 36)
 
-                # Convenience variable:
-                symbol = f"{n_prefix}_{parameter.symbol}"
-                self.entity_map[symbol] = parameter
+        if  result is not None:
 
-                # If parameter has already been declared, skip processing:
-                if symbol in var_set | par_set:
-                    continue
+            # Remember the solution for warm-starts:
+            self.var_dict = result.var_dict
+            self.par_dict = result.par_dict
+            for symbol, value in self.var_dict.items():
+                if  symbol in self.entity_map:
+                    self._warm[self.entity_map[symbol]] = value
 
-                # If the parameter doesn't have a value, declare it as a variable
-                if  bool(parameter.value):
-                    par_set.add(symbol)
-                    par_section += f"param {symbol} = {parameter.value};\n"
+            output = "\n".join(
+                f"{symbol}\t= {value}"
+                for symbols, values in [
+                    (result.var_symbols, result.var_values),
+                    (result.par_symbols, result.par_values),
+                    (result.obj_symbols, result.obj_values)
+                ]
+                for symbol, value in zip(symbols.tolist(), values.tolist())
+            )
 
-                else:
-                    var_set.add(symbol)
-                    var_section += f"var {symbol};\n"
+            timing = ", ".join(f"{stage} {seconds * 1e3:.1f} ms" for stage, seconds in result.timing.items())
 
-                    # If bounds are provided, add them as equations:
-                    if  bool(parameter.minimum):
-                        eqn_section += f"{eqn_prfx}{ecount}: {symbol} - {parameter.minimum} >= 0.0;\n"
-                        ecount += 1
+            self._result.append(output)
+            self._result.append("-" * 36)
+            self._result.append(f"Timing: {timing}")
+            self.sig_modify_connectors.emit(result)
 
-                    if  bool(parameter.maximum):
-                        eqn_section += f"{eqn_prfx}{ecount}: {symbol} - {parameter.maximum} <= 0.0;\n"
-                        ecount += 1
+        else:
+            self._result.append(error)
 
-            for equation in node.substituted():
-                eqn_section += f"{eqn_prfx}{ecount}: {equation};\n"
-                ecount += 1
+    def on_time_limit(self):
+
+        if  self._thread is not None:
+            self._thread.cancel()
+            self._result.append(f"Time limit ({self._limit.value()} s) reached, solve interrupted.")
+
+    def on_thread_finished(self):
+
+        self._timer.stop()
+        self._thread = None
+
+        self.__gen.setEnabled(True)
+        self.__run.setText("Optimize")
+
+        # Commits that arrived during the solve are re-solved now:
+        if  self._live_queued:
+            self._live_queued = False
+            self._live.start()
+
+    def on_data_committed(self, node):
+        """
+        Schedule a live re-solve after a data-table commit. Each commit restarts the debounce-timer, so a burst of
+        edits is solved once, with the values of the last one.
+        """
+
+        if  self.__live.isChecked() and node is not None and node.scene() is self._canvas:
+            self._live.start()
+
+    def live_solve(self):
+        """
+        Re-solve the model with the current parameter values. If only values have changed since the last build, they
+        are sent to the canvas' warm session as a data-only update (see `ModelBuilder.reload()`). A running live solve
+        is stale, so it is interrupted and the model is re-solved once it has stopped; other solves are waited for.
+        """
+
+        if  self._live_thread is not None or self._thread is not None:
+            self._live_queued = True
+            if  self._live_thread is not None:
+                self._live_thread.cancel()
+            return
+
+        # The editor is left as is: `run()` picks up the new values (or structure) when the user optimizes next:
+        objectives = self._obj.get_objectives()
+        try:
+            if  not self._builder.reload(objectives):
+                self._builder.build(objectives)
+                self.entity_map = self._builder.entity_map
 
-        dictionary = self._obj.get_objectives()
-        objectives = dictionary.keys()
+        except Exception as exception:
+            self._result.append(f"Live solve: {exception}")
+            return
 
-        for objective in objectives:
-            if bool(objective):
-                obj_section += f"{dictionary[objective].lower()} obj_{ocount}: {objective};\n"
-                ocount    += 1
+        script  = self._builder.script
+        values  = dict(self._builder.parameters)
+        session = sessions.session(self._canvas.uid, self.backend(script), self._limit.value())
 
-        script = f"{scr_prfx}\n{par_section}\n{var_section}\n{obj_section}\n{eqn_section}"
-        self._editor.setText(script)
+        self._live_key = solution_key(script, values, session.options)
+        cached = self._cache.get(self._live_key)
+        if  cached is not None:
+            self.apply_live(cached, "cached")
+            return
 
-    def run(self):
+        thread = SolveThread(session, script, self._builder.signature, values, self.initial_values())
+        thread.result_ready.connect(self.on_live_result)
+        thread.error_occurred.connect(lambda error: self._result.append(f"Live solve: {error}"))
+        thread.finished.connect(self.on_live_finished)
 
-        engine = AMPLEngine()
-        result = engine.optimize(self._editor.toPlainText())
+        self._live_thread = thread
+        self._live_thread.start()
+        self._live_limit.start(self._limit.value() * 1000)
 
-        self._result.setText(f"AMPL Result: [{engine.result}]")
-        self._result.append ("-" * 36)
+    def on_live_result(self, result: Solution | None):
 
-        if engine.result == "solved":
+        thread = self._live_thread
+        if  thread is None or thread.cancelled:
+            return
 
-            output = str()
-            for key in result["var_dict"].keys():
-                output += f"{key}\t= {result["var_dict"][key]}\n"
+        if  result is None:
+            self._result.append(f"Live solve: [{thread.session.result}] {thread.session.error}")
+            return
 
-            for key in result["par_dict"].keys():
-                output += f"{key}\t= {result["par_dict"][key]}\n"
+        if  thread.session.result == "solved":
+            self._cache.put(self._live_key, result)
 
-            for key in result["obj_dict"].keys():
-                output += f"{key}\t= {result["obj_dict"][key]}\n"
+        self.apply_live(result, thread.session.result)
 
-            self._result.append(output)
-            self.sig_modify_connectors.emit(result)
+    def apply_live(self, result: Solution, status: str):
+        """
+        Show the result of a live solve on the canvas' connectors, and keep it for warm-starts.
+        """
 
-        else:
-            self._result.append(engine.error)
+        self.var_dict = result.var_dict
+        self.par_dict = result.par_dict
+        for symbol, value in self.var_dict.items():
+            if  symbol in self.entity_map:
+                self._warm[self.entity_map[symbol]] = value
+
+        timing = ", ".join(f"{stage} {seconds * 1e3:.1f} ms" for stage, seconds in result.timing.items())
+
+        self.sig_modify_connectors.emit(result)
+        self._result.append(f"Live solve: [{status}] {timing}".rstrip())
+        self.verify(result, True)
+
+    def verify(self, result: Solution, quiet: bool = False):
+        """
+        Check a solution of the generated model against the canvas' equations and the variables' bounds (see
+        `Residual.feasible()`), and log the outcome (only violations if `quiet`). Solutions that don't cover all
+        variables, and those of the stub solver, aren't checked.
+        """
+
+        if  self.__stb.isChecked():
+            return
+
+        try:
+            residual = compile_residual(self._canvas.graph, self._builder)
+            if  any(symbol not in result.var_dict for symbol in residual.variables):
+                return
+
+            # The solution's own parameter values, as the data-table may have been edited during the solve:
+            x          = np.array([result.var_dict[symbol] for symbol in residual.variables], dtype=np.float64)
+            parameters = {symbol: value for symbol, value in result.par_dict.items() if symbol in residual.defaults}
+            tolerance  = Optimizer.TOLERANCE * max(1.0, float(np.abs(x).max(initial=0.0)))
+            feasible   = residual.feasible(x, parameters, tolerance)
+
+        except (ValueError, KeyError):
+            return
+
+        if  feasible:
+            if  not quiet:
+                self._result.append(f"Residual check: {residual.shape[0]} equation(s) satisfied")
+
+            return
+
+        violation = residual.violation(x, parameters)
+        violated  = np.flatnonzero(~(violation <= tolerance))
+        outside   = np.count_nonzero((x < residual.lower - tolerance) | (x > residual.upper + tolerance))
 
+        summary   = [f"{len(violated)} of {residual.shape[0]} equation(s) violated"]
+        if  len(violated):
+            worst = violated[np.argmax(np.nan_to_num(violation[violated], nan=np.inf))]
+            summary.append(f"worst: {residual.names[worst]} ({violation[worst]:.3g})")
+
+        if  outside:
+            summary.append(f"{outside} variable(s) outside their bounds")
+
+        self._result.append(f"Residual check: {', '.join(summary)}")
+
+    def on_live_limit(self):
+
+        if  self._live_thread is not None:
+            self._live_thread.cancel()
+            self._result.append(f"Live solve: time limit ({self._limit.value()} s) reached, solve interrupted.")
+
+    def on_live_finished(self):
+
+        self._live_limit.stop()
+        self._live_thread = None
+
+        # Start a manual run that was waiting for the live solve to stop:
+        if  self._run_queued:
+            self._run_queued = False
+            self.run()
+
+        # Re-solve with the values of the commits that superseded the interrupted solve (after a manual run, once it
+        # has finished, see `on_thread_finished()`):
+        if  self._live_queued and self._thread is None:
+            self._live_queued = False
+            self.live_solve()
+
+    def on_live_toggled(self, checked: bool):
+
+        if  checked:
+            return
+
+        self._live.stop()
+        self._live_queued = False
+        if  self._live_thread is not None:
+            self._live_thread.cancel()
+
+    def on_sweep_running(self, running: bool):
+
+        self.__gen.setEnabled(not running)
+        self.__run.setText("Cancel" if running else "Optimize")
+
+    def export_model(self):
+        """
+        Write the model in the editor as a .nl-file (any model), as an LP/MPS-file (linear models), for solvers
+        that read these formats directly, or as separate AMPL model- and data-files.
+        """
+
+        _file, _code = QFileDialog.getSaveFileName(None, "Export model", "./model.nl",
+                                                   "AMPL .nl (*.nl);;CPLEX LP (*.lp);;MPS (*.mps);;AMPL model and data (*.mod)")
+        if  not _file:
+            return
+
+        script = self._editor.toPlainText()
+        values = dict(self._builder.parameters) if script == self._script else None
+
+        try:
+            write_model(script, _file, values, self.initial_values())
+            self._result.append(f"Model written to {_file}")
+
+        except (ValueError, OSError) as exception:
+            self._result.append(f"Export failed: {exception}")
+
+        self._tabwid.setCurrentWidget(self._result)
+
+    def on_log_cleared(self, heading: str):
+
+        self._result.clear()
+        self._result.append(heading)
         self._tabwid.setCurrentWidget(self._result)
 
+    def on_log_message(self, message: str, show: bool):
+
+        self._result.append(message)
+        if  show:
+            self._tabwid.setCurrentWidget(self._result)
+
+    def on_table_ready(self, headers: list, rows: list, show: bool):
+
+        self._tables.clear()
+        self._tables.setRowCount(len(rows))
+        self._tables.setColumnCount(len(headers))
+        self._tables.setHorizontalHeaderLabels(headers)
+
+        for row, cells in enumerate(rows):
+            for column, text in enumerate(cells):
+                self._tables.setItem(row, column, QTableWidgetItem(text))
+
+        if  show:
+            self._tabwid.setCurrentWidget(self._tables)
+
     def auto_enable(self):
 
         if bool(self._editor.toPlainText()):
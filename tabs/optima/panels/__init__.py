@@ -0,0 +1,6 @@
+from .base import Context, Panel
+from .scenario import ScenarioPanel, scenario_rows
+from .pareto import ParetoPanel
+from .uncertainty import UncertaintyPanel
+from .sensitivity import SensitivityPanel
+from .surrogate import SurrogatePanel
@@ -0,0 +1,98 @@
+from dataclasses import dataclass, field
+from typing import Callable
+
+from PyQt6.QtCore import pyqtSignal
+from PyQt6.QtWidgets import QWidget, QGridLayout
+
+
+# Class Context: The generated model, as the analysis panels run it
+@dataclass
+class Context:
+    script     : str                                    # Generated script (hand-edits in the editor are ignored)
+    parameters : dict                                   # Parameter-symbol -> value
+    symbols    : list = field(default_factory=list)     # Variable-symbols to collect
+    entity_map : dict = field(default_factory=dict)     # Symbol -> entity-id (see `ModelBuilder`)
+    graph      : object = None                          # The canvas' flow-graph (parameter sigmas)
+    backend    : str = "ampl"                           # See `create_session()`
+    timeout    : float | None = None                    # Per-solve wall-clock limit (seconds)
+    initial    : dict = field(default_factory=dict)     # Variable-symbol -> initial value
+
+    def objectives(self, _columns: list) -> list:
+        """
+        Return the columns that are objectives (i.e. not symbols of the canvas).
+        """
+
+        return [column for column in _columns if column not in self.entity_map]
+
+
+# Class Panel: Base of the analysis panels hosted by `Optimizer`
+class Panel(QWidget):
+    """
+    A row of the optimizer's setup that runs one kind of analysis in a worker-thread. Panels read the model through
+    the `_context` callable given by their host and report through signals, so they don't depend on the optimizer.
+    """
+
+    # Signals:
+    sig_log_cleared = pyqtSignal(str)               # A run started: clear the log and show the heading
+    sig_log_message = pyqtSignal(str, bool)         # Line for the log, and whether to bring the log to the front
+    sig_table_ready = pyqtSignal(list, list, bool)  # Headers, rows of cell-texts, and whether to bring them to the front
+    sig_running     = pyqtSignal(bool)              # Emitted when a run starts and when it has finished
+
+    # Initializer:
+    def __init__(self, _context: Callable[[], Context], parent: QWidget | None = None):
+
+        # Initialize base-class:
+        super().__init__(parent)
+
+        self._context = _context
+        self._thread  = None
+
+        # Layout, aligned with the optimizer's setup-grid (four columns):
+        self._layout = QGridLayout(self)
+        self._layout.setContentsMargins(0, 0, 0, 0)
+        self._layout.setSpacing(12)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Name                      Description
+    # ------------------------------------------------------------------------------------------------------------------
+    # 1. running                Whether the panel's thread is running.
+    # 2. start                  Connects and starts a worker-thread.
+    # 3. cancel                 Cancels the running thread.
+    # ------------------------------------------------------------------------------------------------------------------
+
+    @property
+    def running(self) -> bool:  return self._thread is not None
+
+    def log(self, _message: str, _show: bool = False):  self.sig_log_message.emit(_message, _show)
+
+    def start(self, _thread, _heading: str):
+        """
+        Connect the standard signals of a worker-thread (`progress_made`, `result_ready`, `error_occurred`) to the
+        panel's `on_progress()`, `on_result()` and the log, and start it.
+        """
+
+        _thread.progress_made.connect(self.on_progress)
+        _thread.result_ready.connect(self.on_result)
+        _thread.error_occurred.connect(self.log)
+        _thread.finished.connect(self.on_finished)
+
+        self.sig_log_cleared.emit(_heading)
+
+        self._thread = _thread
+        self._thread.start()
+        self.sig_running.emit(True)
+
+    def cancel(self, _message: str):
+
+        if  self._thread is not None:
+            self._thread.cancel()
+            self.log(_message)
+
+    def on_progress(self, *args):   pass
+
+    def on_result(self, _result):   pass
+
+    def on_finished(self):
+
+        self._thread = None
+        self.sig_running.emit(False)
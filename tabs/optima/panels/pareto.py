@@ -0,0 +1,68 @@
+from PyQt6.QtWidgets import QWidget, QLabel, QComboBox, QSpinBox
+
+from tabs.optima.panels.base import Panel
+from tabs.optima.panels.scenario import scenario_rows
+from tabs.optima.pareto import ParetoFront, ParetoThread, METHODS
+
+
+# Class ParetoPanel: Sweeps the Pareto front of the objectives
+class ParetoPanel(Panel):
+    """
+    Settings of Pareto sweeps. Sweeps are started by the optimizer's Optimize-button when the objective setup is set
+    to Pareto (see `Optimizer.run()`), which cancels them while they run.
+    """
+
+    # Initializer:
+    def __init__(self, _context, parent: QWidget | None = None):
+
+        # Initialize base-class:
+        super().__init__(_context, parent)
+
+        # Pareto front of the last generated script (keeps solved points across sweeps):
+        self._front = None
+
+        self._method = QComboBox(self)
+        self._method.addItems(METHODS)
+        self._divisions = QSpinBox(self)
+        self._divisions.setRange(1, 1000)
+        self._divisions.setValue(10)
+        self._divisions.setSuffix(" divisions")
+
+        # Layout:
+        self._layout.addWidget(QLabel("Pareto Sweep"), 0, 0)
+        self._layout.addWidget(self._method, 0, 1)
+        self._layout.addWidget(self._divisions, 0, 2)
+
+    def run(self):
+
+        # Points are solved on the generated model. Solved points are kept while the script is unchanged, so refining
+        # the sweep only solves the new points:
+        context = self._context()
+
+        if  self._front is None or self._front.source != context.script:
+            try:
+                self._front = ParetoFront(context.script,
+                                          context.parameters,
+                                          context.symbols,
+                                          _timeout=context.timeout,
+                                          _initial=context.initial,
+                                          _backend=context.backend)
+
+            except ValueError as error:
+                self.log(str(error), True)
+                return
+
+        method, divisions = self._method.currentText(), self._divisions.value()
+        self.start(ParetoThread(self._front, method, divisions),
+                   f"Pareto sweep ({method}, {divisions} divisions), {len(self._front.cache)} point(s) cached:")
+
+    def on_progress(self, completed: int, total: int, name: str, status: str):
+        self.log(f"[{completed}/{total}] {name}: {status}")
+
+    def on_result(self, front: ParetoFront):
+
+        values, table = front.front()
+        self.log(f"{len(table)} non-dominated point(s) of {len(front.cache)} solved:")
+        self.log("\n".join("\t".join(f"{value:.6g}" for value in row) for row in values.tolist()))
+
+        self.sig_table_ready.emit(*scenario_rows(table), True)
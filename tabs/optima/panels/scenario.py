@@ -0,0 +1,69 @@
+from PyQt6.QtWidgets import QWidget, QLabel, QPushButton, QFileDialog
+
+from tabs.optima.panels.base import Panel
+from tabs.optima.scenario import ScenarioThread, ScenarioTable, read_scenarios
+
+
+# Function scenario_rows: Headers and cell-texts of a scenario table
+def scenario_rows(_table: ScenarioTable) -> tuple[list, list]:
+
+    headers = ["Scenario", "Status", *_table.columns]
+    rows    = [
+        [name, _table.status[row], *(f"{value:.6g}" for value in _table.values[row])]
+        for row, name in enumerate(_table.names)
+    ]
+
+    return headers, rows
+
+
+# Class ScenarioPanel: Solves the scenarios of a CSV-file in parallel
+class ScenarioPanel(Panel):
+
+    # Initializer:
+    def __init__(self, _context, parent: QWidget | None = None):
+
+        # Initialize base-class:
+        super().__init__(_context, parent)
+
+        # Buttons:
+        self.__run = QPushButton("Run Scenarios")
+        self.__run.pressed.connect(self.run)
+
+        # Layout:
+        self._layout.addWidget(QLabel("Scenarios"), 0, 0)
+        self._layout.addWidget(self.__run, 0, 3)
+
+    def run(self):
+
+        # If a batch is in progress, the button cancels it:
+        if  self.running:
+            self.cancel("Scenario batch cancelled, waiting for running scenarios to finish.")
+            return
+
+        _file, _code = QFileDialog.getOpenFileName(None, "Select scenario file", "./", "CSV files (*.csv)")
+        if  not _code:
+            return
+
+        context   = self._context()
+        scenarios = read_scenarios(_file)
+        thread    = ScenarioThread(context.script,
+                                   context.parameters,
+                                   scenarios,
+                                   context.symbols,
+                                   _timeout=context.timeout,
+                                   _initial=context.initial,
+                                   _backend=context.backend)
+
+        self.start(thread, f"Solving {len(scenarios)} scenario(s):")
+        self.__run.setText("Cancel Scenarios")
+
+    def on_progress(self, completed: int, total: int, name: str, status: str):
+        self.log(f"[{completed}/{total}] {name}: {status}")
+
+    def on_result(self, table: ScenarioTable):
+        self.sig_table_ready.emit(*scenario_rows(table), True)
+
+    def on_finished(self):
+
+        super().on_finished()
+        self.__run.setText("Run Scenarios")
@@ -0,0 +1,105 @@
+from PyQt6.QtWidgets import QWidget, QLabel, QPushButton, QComboBox
+
+from tabs.optima.panels.base import Panel
+from tabs.optima.panels.uncertainty import UncertaintyPanel
+from tabs.optima.sensitivity import SensitivityThread, Study, Indices, MEASURES, METHODS
+from tabs.optima.uncertainty import uncertain_parameters
+
+
+# Class SensitivityPanel: Ranks the parameters by their influence on the objectives (Sobol / Morris)
+class SensitivityPanel(Panel):
+
+    # Initializer:
+    def __init__(self, _context, _sampling: UncertaintyPanel, parent: QWidget | None = None):
+        """
+        Parameters:
+            _context (callable): Returns the `Context` of a run.
+            _sampling (UncertaintyPanel): Provides the sample-count and distribution.
+        """
+
+        # Initialize base-class:
+        super().__init__(_context, parent)
+
+        self._sampling = _sampling
+        self._run      = None   # Context of the running (or last) run
+
+        self.__run = QPushButton("Run Sensitivity")
+        self._design = QComboBox(self)
+        self._design.addItems(METHODS)
+        self.__run.pressed.connect(self.run)
+
+        # Layout:
+        self._layout.addWidget(QLabel("Sensitivity"), 0, 0)
+        self._layout.addWidget(self._design, 0, 1)
+        self._layout.addWidget(self.__run, 0, 3)
+
+    def run(self):
+
+        # If a run is in progress, the button cancels it (re-running resumes it, see `run_sensitivity()`):
+        if  self.running:
+            self.cancel("Sensitivity run cancelled, waiting for running batches to finish.")
+            return
+
+        context   = self._context()
+        uncertain = uncertain_parameters(context.graph, context.parameters, context.entity_map)
+        if  not uncertain:
+            self.log("No parameter has a sigma, nothing to analyze.", True)
+            return
+
+        method    = self._design.currentText()
+        samples   = self._sampling.samples
+        self._run = context
+        thread    = SensitivityThread(context.script,
+                                      context.parameters,
+                                      uncertain,
+                                      context.symbols,
+                                      samples,
+                                      _method=method,
+                                      _distribution=self._sampling.distribution,
+                                      _timeout=context.timeout,
+                                      _initial=context.initial,
+                                      _backend=context.backend)
+
+        self.start(thread, f"Sensitivity analysis ({method}) of {len(uncertain)} parameter(s), "
+                           f"{samples} {'trajectories' if method == 'morris' else 'base samples'}:")
+        self.__run.setText("Cancel Sensitivity")
+
+    def on_progress(self, completed: int, total: int, indices: Indices):
+
+        self.log(f"[{completed}/{total}]")
+        self.show_indices(indices, False)
+
+    def on_result(self, study: Study):
+
+        indices = study.indices()
+        self.show_indices(indices, True)
+
+        # Rank the parameters by their influence on each objective:
+        for column in self._run.objectives(indices.columns):
+            ranking = ", ".join(f"{symbol} ({value:.3g})" for symbol, value in indices.ranking(column))
+            self.log(f"{column}: {ranking}")
+
+        self.log(f"{len(study) - study.failed}/{len(study)} point(s) solved"
+                 f"{' (resumed)' if study.resumed else ''}, files saved to {study.directory}")
+
+    def show_indices(self, _indices: Indices, _show: bool):
+
+        # One row per parameter, one column per measure and objective (all outputs if there are no objectives):
+        measures = MEASURES[_indices.method]
+        outputs  = self._run.objectives(_indices.columns) or _indices.columns
+        headers  = ["Parameter", *(f"{name} {column}" for column in outputs for name in measures)]
+        rows     = [
+            [symbol, *(
+                f"{_indices.measures[name][row, _indices.columns.index(output)]:.4g}"
+                for output in outputs
+                for name in measures
+            )]
+            for row, symbol in enumerate(_indices.symbols)
+        ]
+
+        self.sig_table_ready.emit(headers, rows, _show)
+
+    def on_finished(self):
+
+        super().on_finished()
+        self.__run.setText("Run Sensitivity")
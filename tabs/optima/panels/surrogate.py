@@ -0,0 +1,69 @@
+from PyQt6.QtWidgets import QWidget, QLabel, QPushButton, QComboBox
+
+from tabs.optima.panels.base import Context, Panel
+from tabs.optima.surrogate import WhatIf, KINDS, fit_surrogate
+from tabs.optima.uncertainty import Ensemble
+
+
+# Class SurrogatePanel: Fits a surrogate to the last Monte Carlo run, for what-if queries
+class SurrogatePanel(Panel):
+
+    # Initializer:
+    def __init__(self, _context, parent: QWidget | None = None):
+
+        # Initialize base-class:
+        super().__init__(_context, parent)
+
+        self._ensemble = None   # Last Monte Carlo run and the `Context` it sampled (see `set_ensemble()`)
+        self.whatif    = None   # What-if queries on the last fitted surrogate (see `fit_surrogate()`)
+
+        self.__fit = QPushButton("Fit Surrogate")
+        self._kind = QComboBox(self)
+        self._kind.addItems(KINDS)
+        self.__fit.pressed.connect(self.fit)
+
+        # Layout:
+        self._layout.addWidget(QLabel("Surrogate"), 0, 0)
+        self._layout.addWidget(self._kind, 0, 1)
+        self._layout.addWidget(self.__fit, 0, 3)
+
+    def set_ensemble(self, _ensemble: Ensemble, _context: Context):
+        """
+        Keep a finished Monte Carlo run, its samples are the training data of the surrogate.
+        """
+
+        self._ensemble = (_ensemble, _context)
+
+    def fit(self):
+
+        if  self._ensemble is None:
+            self.log("Run Monte Carlo first, its samples are the training data of the surrogate.", True)
+            return
+
+        if  self.whatif is not None:
+            self.whatif.shutdown()
+
+        # Queries outside the trained domain are solved on the script the ensemble was sampled from:
+        ensemble, context = self._ensemble
+
+        kind = self._kind.currentText()
+        try:
+            surrogate   = fit_surrogate(kind, ensemble)
+            self.whatif = WhatIf(surrogate,
+                                 context.script,
+                                 context.parameters,
+                                 context.backend,
+                                 _initial=context.initial,
+                                 _timeout=context.timeout)
+
+        except Exception as exception:
+            self.log(f"Surrogate fit failed: {exception}", True)
+            return
+
+        self.log(f"Fitted {kind} surrogate of {len(surrogate.columns)} output(s) to "
+                 f"{surrogate.samples} sample(s), leave-one-out errors:")
+        self.log(", ".join(
+            f"{column} ± {error:.3g}"
+            for column, error in zip(surrogate.columns, surrogate.rmse)
+            if  column not in context.entity_map
+        ), True)
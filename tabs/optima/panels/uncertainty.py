@@ -0,0 +1,105 @@
+from PyQt6.QtCore import pyqtSignal
+from PyQt6.QtWidgets import QWidget, QPushButton, QCheckBox, QComboBox, QSpinBox
+
+from tabs.optima.panels.base import Panel
+from tabs.optima.uncertainty import UncertaintyThread, Ensemble, Statistics, DISTRIBUTIONS, PERCENTILES, uncertain_parameters
+
+
+# Class UncertaintyPanel: Propagates the parameters' sigmas through the model (Monte Carlo)
+class UncertaintyPanel(Panel):
+
+    # Signals:
+    sig_ensemble_ready = pyqtSignal(object, object)     # Ensemble of a finished run, and the `Context` it sampled
+
+    # Initializer:
+    def __init__(self, _context, parent: QWidget | None = None):
+
+        # Initialize base-class:
+        super().__init__(_context, parent)
+
+        # Context of the running (or last) run:
+        self._run = None
+
+        self.__run = QPushButton("Run Monte Carlo")
+        self.__lhs = QCheckBox("Latin Hypercube")
+        self._dist = QComboBox(self)
+        self._dist.addItems(DISTRIBUTIONS)
+        self._samples = QSpinBox(self)
+        self._samples.setRange(10, 1000000)
+        self._samples.setValue(1000)
+        self._samples.setSuffix(" samples")
+        self.__run.pressed.connect(self.run)
+
+        # Layout:
+        self._layout.addWidget(self._samples, 0, 0)
+        self._layout.addWidget(self._dist, 0, 1)
+        self._layout.addWidget(self.__lhs, 0, 2)
+        self._layout.addWidget(self.__run, 0, 3)
+
+    # Sampling setup, shared with the sensitivity analysis:
+    @property
+    def samples(self) -> int:   return self._samples.value()
+
+    @property
+    def distribution(self) -> str:  return self._dist.currentText()
+
+    def run(self):
+
+        # If a run is in progress, the button cancels it:
+        if  self.running:
+            self.cancel("Monte Carlo run cancelled, waiting for running batches to finish.")
+            return
+
+        context   = self._context()
+        uncertain = uncertain_parameters(context.graph, context.parameters, context.entity_map)
+        if  not uncertain:
+            self.log("No parameter has a sigma, nothing to sample.", True)
+            return
+
+        self._run = context
+        thread    = UncertaintyThread(context.script,
+                                      context.parameters,
+                                      uncertain,
+                                      context.symbols,
+                                      self.samples,
+                                      _distribution=self.distribution,
+                                      _latin=self.__lhs.isChecked(),
+                                      _timeout=context.timeout,
+                                      _initial=context.initial,
+                                      _backend=context.backend)
+
+        self.start(thread, f"Sampling {len(uncertain)} parameter(s), {self.samples} sample(s):")
+        self.__run.setText("Cancel Monte Carlo")
+
+    def on_progress(self, completed: int, total: int, statistics: Statistics):
+
+        objectives = self._run.objectives(statistics.columns)
+        summary    = ", ".join(
+            f"{symbol} = {mean:.6g} ± {std:.3g}"
+            for symbol, mean, std in zip(statistics.columns, statistics.mean, statistics.std)
+            if  symbol in objectives
+        )
+        self.log(f"[{completed}/{total}] {summary}")
+        self.show_statistics(statistics, False)
+
+    def on_result(self, ensemble: Ensemble):
+
+        self.show_statistics(ensemble.statistics, True)
+        self.log(f"Samples and results saved to {ensemble.directory}")
+        self.sig_ensemble_ready.emit(ensemble, self._run)
+
+    def show_statistics(self, _statistics: Statistics, _show: bool):
+
+        headers = ["Symbol", "Samples", "Mean", "Std", *(f"P{q:g}" for q in PERCENTILES)]
+        columns = [_statistics.count, _statistics.mean, _statistics.std, *_statistics.percentiles.values()]
+        rows    = [
+            [symbol, *(f"{values[row]:.6g}" for values in columns)]
+            for row, symbol in enumerate(_statistics.columns)
+        ]
+
+        self.sig_table_ready.emit(headers, rows, _show)
+
+    def on_finished(self):
+
+        super().on_finished()
+        self.__run.setText("Run Monte Carlo")
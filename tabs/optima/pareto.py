@@ -0,0 +1,294 @@
+import re
+import itertools
+
+import numpy as np
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from tabs.optima.model import fmt
+from tabs.optima.scenario import Scenario, ScenarioTable, run_scenarios
+
+
+# Objectives as emitted by `ModelBuilder`, one per line:
+OBJECTIVE = re.compile(r"^(maximize|minimize)\s+(\w+)\s*:(.+);[ \t]*$", re.MULTILINE)
+
+# Sweep methods:
+METHODS = ("epsilon", "weighted")
+
+# Bound of inactive epsilon-constraints (treated as infinite by AMPL solvers and HiGHS):
+INACTIVE = 1e20
+
+
+# Function scalarize: Rewrites a multi-objective script for Pareto sweeps
+def scalarize(_script: str) -> tuple[str, list[str], np.ndarray]:
+    """
+    Replace the objectives of a script by a single, parametrized objective. Each objective `f_i` is bound to a
+    variable `pareto_J_i`, and with `s_i` = +1 (minimize) or -1 (maximize):
+
+        minimize pareto: sum(pareto_w_i * s_i * pareto_J_i)
+        subject to pareto_eps_i: s_i * pareto_J_i <= pareto_eps_i
+
+    Weighted-sum and epsilon-constraint points differ only in the values of `pareto_w_i` and `pareto_eps_i`, so all
+    points share one structure and a warm session only updates parameter values between them.
+
+    Returns:
+        tuple: (script, objective-names, signs)
+    """
+
+    found = OBJECTIVE.findall(_script)
+    if  len(found) < 2:
+        raise ValueError("A Pareto front needs at least two objectives")
+
+    names = [name for _, name, _ in found]
+    signs = np.array([1.0 if sense == "minimize" else -1.0 for sense, _, _ in found])
+
+    par_section = ["\n# Pareto sweep:\n"]
+    var_section = list()
+    eqn_section = list()
+    terms       = list()
+
+    for index, ((_, name, expression), sign) in enumerate(zip(found, signs)):
+
+        par_section.append(f"param pareto_w_{index} default {fmt(1.0 if index == 0 else 0.0)};\n")
+        par_section.append(f"param pareto_eps_{index} default {fmt(INACTIVE)};\n")
+        var_section.append(f"var pareto_J_{index};\n")
+        eqn_section.append(f"subject to pareto_def_{index}: pareto_J_{index} = {expression.strip()};\n")
+        eqn_section.append(f"subject to pareto_eps_{index}: {fmt(sign)} * pareto_J_{index} <= pareto_eps_{index};\n")
+        terms.append(f"pareto_w_{index} * {fmt(sign)} * pareto_J_{index}")
+
+    script = OBJECTIVE.sub("", _script)
+    script = "".join([script, *par_section, *var_section, f"minimize pareto: {' + '.join(terms)};\n", *eqn_section])
+
+    return script, names, signs
+
+
+# Function simplex: Evenly spaced weight-vectors
+def simplex(_count: int, _divisions: int) -> np.ndarray:
+    """
+    Return all weight-vectors of `_count` components in steps of 1/`_divisions` that sum to one.
+    """
+
+    points = [
+        combination
+        for combination in itertools.product(range(_divisions + 1), repeat=_count)
+        if  sum(combination) == _divisions
+    ]
+
+    return np.array(points, dtype=np.float64) / _divisions
+
+
+# Function non_dominated: Mask of the non-dominated rows of a matrix
+def non_dominated(_values: np.ndarray) -> np.ndarray:
+    """
+    Return a boolean mask of the rows that no other row dominates, all columns being minimized. Rows holding NaN
+    are excluded.
+    """
+
+    valid  = ~np.isnan(_values).any(axis=1)
+    values = _values[valid]
+
+    # Row j dominates row i if it is nowhere worse and somewhere better:
+    le = (values[None, :, :] <= values[:, None, :]).all(axis=2)
+    lt = (values[None, :, :] <  values[:, None, :]).any(axis=2)
+
+    mask        = np.zeros(len(_values), dtype=bool)
+    mask[valid] = ~(le & lt).any(axis=1)
+    return mask
+
+
+# Class ParetoFront: Cached Pareto sweep of a model
+class ParetoFront:
+    """
+    Pareto sweep of a multi-objective model (see `scalarize()`). Every solved point is cached under its parameter
+    values, so refining or extending the sweep only solves the points that are new. Points are solved in parallel by
+    the scenario runner, whose worker-processes keep their sessions warm and visit the points in order of their
+    parameter values, so that each point starts from the solution of a neighbour.
+    """
+
+    # Initializer:
+    def __init__(self, _script: str, _parameters: dict, _symbols: list[str], **kwargs):
+        """
+        Parameters:
+            _script (str): The AMPL script with two or more objectives (see `ModelBuilder.build()`).
+            _parameters (dict): Base parameter values (see `ModelBuilder.parameters`).
+            _symbols (list[str]): Symbols to collect, e.g. connector-symbols.
+            **kwargs: Forwarded to `run_scenarios()`.
+        """
+
+        self.source = _script
+        self.script, self.names, self.signs = scalarize(_script)
+
+        self.base       = dict(_parameters)
+        self.symbols    = [f"pareto_J_{index}" for index in range(len(self.names))] + list(_symbols)
+        self.kwargs     = kwargs
+        self.cache      = dict()    # Point (tuple of parameter values) -> (status, values in `columns`-order)
+        self.anchors    = None      # Payoff-table: row i optimizes objective i alone (minimization form)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Name                      Description
+    # ------------------------------------------------------------------------------------------------------------------
+    # 1. solve                  Solves the points that are not cached.
+    # 2. payoff                 Solves each objective alone (ideal and nadir of the front).
+    # 3. sweep                  Solves an epsilon-constraint or weighted-sum sweep.
+    # 4. front                  Returns the non-dominated points.
+    # ------------------------------------------------------------------------------------------------------------------
+
+    @property
+    def columns(self) -> list[str]:     return ["pareto"] + self.symbols
+
+    def overrides(self, _weights, _epsilons) -> dict:
+
+        values = {f"pareto_w_{index}": float(weight) for index, weight in enumerate(_weights)}
+        values.update({f"pareto_eps_{index}": float(epsilon) for index, epsilon in enumerate(_epsilons)})
+        return values
+
+    def solve(self, _points: list[dict], _progress = None, _cancelled = None) -> list[tuple]:
+        """
+        Solve the given points (parameter overrides), skipping those already cached.
+
+        Returns:
+            list[tuple]: (status, values) of each point, in order.
+        """
+
+        keys    = [tuple(point.values()) for point in _points]
+        missing = list(dict.fromkeys(key for key in keys if key not in self.cache))
+
+        if  missing:
+            names     = list(_points[0])
+            scenarios = [Scenario(f"point_{index}", dict(zip(names, key))) for index, key in enumerate(missing)]
+            table     = run_scenarios(self.script,
+                                      self.base,
+                                      scenarios,
+                                      self.symbols,
+                                      _progress=_progress,
+                                      _cancelled=_cancelled,
+                                      **self.kwargs)
+
+            for index, key in enumerate(missing):
+                if  table.status[index] not in ("pending", "timeout"):  # Retried by the next sweep
+                    self.cache[key] = (table.status[index], table.values[index].copy())
+
+        return [self.cache.get(key, ("pending", None)) for key in keys]
+
+    def objectives(self, _values: np.ndarray) -> np.ndarray:
+        """
+        Objective values (minimization form, `s_i * J_i`) from result-rows in `columns`-order.
+        """
+
+        return _values[..., 1:1 + len(self.names)] * self.signs
+
+    def payoff(self, **kwargs) -> np.ndarray:
+        """
+        Optimize each objective alone and return the payoff-table (minimization form): its diagonal is the ideal
+        point, and the worst value of each column approximates the nadir point.
+        """
+
+        count  = len(self.names)
+        points = [self.overrides(np.eye(count)[index], [INACTIVE] * count) for index in range(count)]
+        rows   = self.solve(points, **kwargs)
+
+        if  any(values is None or status != "solved" for status, values in rows):
+            failed = [name for name, (status, _) in zip(self.names, rows) if status != "solved"]
+            raise RuntimeError(f"Could not optimize objective(s) {', '.join(failed)} alone")
+
+        self.anchors = self.objectives(np.array([values for _, values in rows]))
+        return self.anchors
+
+    def sweep(self, _method: str = "epsilon", _divisions: int = 10, **kwargs):
+        """
+        Solve a sweep with `_divisions` steps along each objective.
+
+        epsilon:    Optimize the first objective with the others bounded on a grid between their ideal and nadir
+                    values (the others carry a small weight, so that weakly dominated points are avoided).
+        weighted:   Optimize weighted sums over a simplex-lattice of weights, scaled by the objectives' ranges.
+        """
+
+        if  _method not in METHODS:
+            raise ValueError(f"Unknown sweep method '{_method}'")
+
+        anchors = self.payoff(**kwargs) if self.anchors is None else self.anchors
+        count   = len(self.names)
+        ideal   = anchors.min(axis=0)
+        nadir   = anchors.max(axis=0)
+        scale   = 1.0 / np.where(nadir > ideal, nadir - ideal, 1.0)
+
+        if  _method == "weighted":
+            points = [self.overrides(weights * scale, [INACTIVE] * count) for weights in simplex(count, _divisions)]
+
+        else:
+            steps   = np.linspace(0.0, 1.0, _divisions + 1)
+            weights = np.r_[1.0, np.full(count - 1, 1e-4)] * scale
+            points  = [
+                self.overrides(weights, [INACTIVE, *(ideal[1:] + np.array(grid) * (nadir[1:] - ideal[1:]))])
+                for grid in itertools.product(steps, repeat=count - 1)
+            ]
+
+        self.solve(points, **kwargs)
+
+    def front(self) -> tuple[np.ndarray, ScenarioTable]:
+        """
+        Return the non-dominated points among all solved points.
+
+        Returns:
+            tuple: (objective values of the non-dominated points in their original sense, one row per point, sorted
+                by the first objective; a table of the points with one column per objective and collected symbol)
+        """
+
+        solved = [values for status, values in self.cache.values() if status == "solved"]
+        if  not solved:
+            return np.empty((0, len(self.names))), ScenarioTable([], self.names + self.symbols[len(self.names):])
+
+        values = np.array(solved)
+        points = self.objectives(values)
+        mask   = non_dominated(points)
+
+        # Duplicates (points found by several sweep-points) are kept once:
+        _, unique = np.unique(points[mask].round(9), axis=0, return_index=True)
+        values    = values[mask][unique]
+        order     = np.argsort(values[:, 1])
+        values    = values[order]
+
+        table = ScenarioTable([f"P{index}" for index in range(len(values))],
+                              self.names + self.symbols[len(self.names):])
+        table.status = ["solved"] * len(values)
+        table.values = values[:, 1:]
+
+        return values[:, 1:1 + len(self.names)], table
+
+
+class ParetoThread(QThread):
+
+    # Signals:
+    progress_made  = pyqtSignal(int, int, str, str)     # Completed, total, point, status
+    result_ready   = pyqtSignal(object)                 # ParetoFront
+    error_occurred = pyqtSignal(str)
+
+    # Initializer:
+    def __init__(self, _front: ParetoFront, _method: str, _divisions: int):
+        """
+        Initializes the ParetoThread class.
+
+        Args:
+            _front (ParetoFront): The (cached) front to extend.
+            _method (str): One of `METHODS`.
+            _divisions (int): Steps along each objective.
+        """
+        super().__init__()
+
+        self.front     = _front
+        self.method    = _method
+        self.divisions = _divisions
+        self.cancelled = False
+
+    def run(self):
+
+        def progress(completed, total, index, status):
+            self.progress_made.emit(completed, total, f"point {index}", status)
+
+        try:
+            self.front.sweep(self.method, self.divisions, _progress=progress, _cancelled=lambda: self.cancelled)
+            self.result_ready.emit(self.front)
+
+        except Exception as exception:  self.error_occurred.emit(str(exception))
+
+    def cancel(self):   self.cancelled = True
@@ -0,0 +1,306 @@
+import math
+import time
+
+from collections import deque
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from tabs.optima.ampl import Solution
+from tabs.optima.expression import NonlinearError, fold, linearize, render
+from tabs.optima.model import fmt
+from tabs.optima.script import ScriptModel
+from tabs.schema.equation import ParseError, symbols
+
+
+# Feasibility tolerance of rows that presolve evaluates itself:
+TOLERANCE = 1e-9
+
+
+# Class PresolveReport: What presolve removed
+@dataclass
+class PresolveReport:
+
+    rows       : int  = 0   # Constraints before presolve
+    columns    : int  = 0   # Variables before presolve
+    folded     : int  = 0   # Parameters folded into constants
+    bounds     : int  = 0   # Single-variable inequalities turned into variable bounds
+    fixed      : int  = 0   # Variables fixed by single-variable equalities (and substituted)
+    constant   : int  = 0   # Rows left without variables (and satisfied)
+    duplicates : int  = 0   # Rows identical to an earlier row
+    infeasible : list = field(default_factory=list)     # Rows that presolve found violated (left in the model)
+
+    @property
+    def removed_rows(self) -> int:      return self.bounds + self.fixed + self.constant + self.duplicates
+
+    @property
+    def removed_columns(self) -> int:   return self.fixed
+
+    def __str__(self):
+
+        text = (f"Presolve: removed {self.removed_rows} of {self.rows} row(s) and {self.removed_columns} of "
+                f"{self.columns} column(s): {self.bounds} bound(s), {self.fixed} fixed variable(s), {self.constant} "
+                f"constant and {self.duplicates} duplicate row(s); {self.folded} parameter(s) folded")
+
+        if  self.infeasible:
+            text += f"; violated: {', '.join(self.infeasible)}"
+
+        return text
+
+
+# Class Presolved: Reduced script and what is needed to restore the full solution
+@dataclass
+class Presolved:
+
+    script    : str
+    fixed     : dict    # Variable-symbol -> value of the variables removed by presolve
+    parameters: dict    # Parameter-symbol -> value of the folded parameters
+    report    : PresolveReport
+
+    def restore(self, _solution: Solution) -> Solution:
+        """
+        Add the fixed variables and folded parameters to the solution of the reduced script.
+        """
+
+        return Solution(np.concatenate([_solution.var_symbols, np.array(list(self.fixed), dtype=object)]),
+                        np.concatenate([_solution.var_values, np.fromiter(self.fixed.values(), np.float64, len(self.fixed))]),
+                        np.array(list(self.parameters), dtype=object),
+                        np.fromiter(self.parameters.values(), np.float64, len(self.parameters)),
+                        _solution.obj_symbols,
+                        _solution.obj_values,
+                        dict(_solution.timing))
+
+
+# Function presolve: Reduces a script before it is sent to a solver
+def presolve(_script: str, _values: dict | None = None) -> Presolved:
+    """
+    Reduce a script for the given parameter values:
+
+        1. Parameters are folded into the expressions as constants.
+        2. Rows with a single variable are removed: inequalities tighten the variable's bounds, which are declared
+           natively (`var X >= lower, <= upper`), and linear equalities fix the variable, which is then substituted
+           into the other rows. Substitution can leave further single-variable rows, so this repeats until none is left.
+        3. Rows left without variables are dropped if satisfied, and rows identical to an earlier one are dropped.
+
+    Rows found violated are kept, so that the solver reports the model as infeasible.
+
+    Parameters:
+        _script (str): The AMPL script (see `ModelBuilder.build()`).
+        _values (dict | None): Parameter-symbol -> value (default: the script's defaults).
+
+    Returns:
+        Presolved: The reduced script, the removed variables and parameters, and a report.
+
+    Raises:
+        ParseError: For statements outside the subset emitted by `ModelBuilder`.
+    """
+
+    model     = ScriptModel(_script)
+    constants = model.parameters(_values)
+    declared  = set(model.variables)
+    report    = PresolveReport(len(model.constraints), len(model.variables), len(constants))
+
+    # Bounds of each variable:
+    bounds = {symbol: [-math.inf, math.inf] for symbol in model.variables}
+    for symbol, limits in model.bounds.items():
+        for side, tree in enumerate(limits):
+            if  tree is not None and (value := fold(tree, constants))[0] == "num":
+                bounds[symbol][side] = value[1]
+
+    # Rows in the form `tree (relation) 0`, and the rows each variable occurs in:
+    rows   = [[name, relation, fold(("sub", lhs, rhs), constants)] for name, relation, lhs, rhs in model.constraints]
+    active = [True] * len(rows)
+    occurs = {symbol: list() for symbol in model.variables}
+    for index, (_, _, tree) in enumerate(rows):
+        for symbol in symbols(tree).intersection(declared):
+            occurs[symbol].append(index)
+
+    fixed = dict()
+    queue = deque(range(len(rows)))
+
+    while queue:
+
+        index = queue.popleft()
+        if  not active[index]:
+            continue
+
+        name, relation, tree = rows[index]
+        tree  = fold(tree, fixed)
+        found = symbols(tree)
+        rows[index][2] = tree
+
+        # Rows without variables:
+        if  not found:
+
+            if  tree[0] != "num":   continue
+            value     = tree[1]
+            satisfied = (abs(value) <= TOLERANCE if relation == "=" else
+                         value <= TOLERANCE if relation == "<=" else value >= -TOLERANCE)
+
+            if  satisfied:
+                active[index]    = False
+                report.constant += 1
+
+            else:
+                report.infeasible.append(name)
+
+            continue
+
+        # Rows with a single (declared) variable, if linear in it:
+        if  len(found) != 1 or not found <= declared:
+            continue
+
+        try:                                    coefs, const = linearize(tree, {})
+        except (NonlinearError, ParseError):    continue
+
+        if  len(coefs) != 1:
+            continue
+
+        (symbol, coef), = coefs.items()
+        if  coef == 0.0:
+            continue
+
+        value = -const / coef
+        lower, upper = bounds[symbol]
+
+        if  relation == "=":
+
+            if  not lower - TOLERANCE <= value <= upper + TOLERANCE:
+                report.infeasible.append(name)
+                continue
+
+            fixed[symbol] = value
+            queue.extend(occurs[symbol])
+            report.fixed += 1
+
+        else:
+            # coef * x + const <= 0 is an upper bound for positive coefficients, and a lower bound otherwise:
+            if  (relation == "<=") == (coef > 0):   bounds[symbol][1] = min(upper, value)
+            else:                                   bounds[symbol][0] = max(lower, value)
+            report.bounds += 1
+
+        active[index] = False
+
+    # Drop duplicates:
+    seen = set()
+    for index, (_, relation, tree) in enumerate(rows):
+
+        if  not active[index]:
+            continue
+
+        key = (relation, render(tree))
+        if  key in seen:
+            active[index]      = False
+            report.duplicates += 1
+
+        seen.add(key)
+
+    # Emit the reduced script:
+    var_section = ["# Variable(s):\n"]
+    obj_section = ["# Objective(s):\n"]
+    eqn_section = ["# Equation(s):\n"]
+
+    for symbol in model.variables:
+
+        if  symbol in fixed:
+            continue
+
+        lower, upper = bounds[symbol]
+        limits = [f">= {fmt(lower)}"] if lower > -math.inf else []
+        limits+= [f"<= {fmt(upper)}"] if upper < +math.inf else []
+        var_section.append(f"var {symbol}{' ' if limits else ''}{', '.join(limits)};\n")
+
+    substitute = constants | fixed
+    for name, sense, tree in model.objectives:
+        obj_section.append(f"{sense} {name}: {render(fold(tree, substitute))};\n")
+
+    for index, (name, relation, tree) in enumerate(rows):
+        if  active[index]:
+            eqn_section.append(f"subject to {name}: {render(tree)} {relation} 0.0;\n")
+
+    script = "\n".join(["# AMPL Optimization (presolved)\n", "".join(var_section), "".join(obj_section), "".join(eqn_section)])
+    return Presolved(script, fixed, constants, report)
+
+
+# Class PresolveSession: Presolves scripts before handing them to another session
+class PresolveSession:
+    """
+    Mirrors the interface of `AMPLSession`. Scripts are reduced by `presolve()` before they are loaded into the
+    wrapped session, and the variables and parameters removed by presolve are added back to its solutions.
+    """
+
+    # Initializer:
+    def __init__(self, _session):
+
+        self.session    = _session
+        self._presolved = None
+        self._error     = str()
+        self._timing    = dict()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Name                      Description
+    # ------------------------------------------------------------------------------------------------------------------
+    # 1. load                   Presolves a script and loads the reduced script into the wrapped session.
+    # 2. solve                  Solves the reduced script and restores the full solution.
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def start(self):    self.session.start()
+
+    def load(self, _script: str, _signature = None, _values: dict | None = None) -> bool | None:
+
+        self._error = str()
+        start       = time.perf_counter()
+
+        try:
+            self._presolved = presolve(_script, _values)
+
+        except (ValueError, ArithmeticError) as error:
+            self._error, self._presolved = str(error), None
+            return None
+
+        self._timing = {"presolve": time.perf_counter() - start}
+
+        # Reduced scripts hold no parameters, so identical reduced scripts are the only ones loaded in place:
+        script = self._presolved.script
+        return self.session.load(script, hash(script), None)
+
+    def solve(self, _initial: dict | None = None):
+
+        if  self.listener is not None:
+            self.listener(f"{self._presolved.report}\n")
+
+        solution = self.session.solve(_initial)
+        if  solution is None:
+            return None
+
+        solution = self._presolved.restore(solution)
+        solution.timing = self._timing | solution.timing
+        return solution
+
+    def interrupt(self):    self.session.interrupt()
+
+    def shutdown(self):     self.session.shutdown()
+
+    @property
+    def report(self):   return self._presolved.report if self._presolved else None
+
+    @property
+    def listener(self):     return self.session.listener
+
+    @listener.setter
+    def listener(self, _callable):  self.session.listener = _callable
+
+    @property
+    def options(self):  return {"presolve": True, **self.session.options}
+
+    @property
+    def running(self):  return self.session.running
+
+    @property
+    def result(self):   return self.session.result
+
+    @property
+    def output(self):   return self.session.output
+
+    @property
+    def error(self):    return self._error or self.session.error
@@ -0,0 +1,185 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from tabs.optima.jacobian import System
+from tabs.optima.model import ModelBuilder
+from tabs.schema.equation import ParseError
+from tabs.schema.flowgraph import FlowGraph
+
+
+# Relation-codes (see `Residual.relations`):
+RELATIONS = {"=": 0, "<=": 1, ">=": -1}
+
+# Input-matrix entries per evaluation pass (bounds the memory of large batches):
+BUDGET = 1 << 22
+
+# Compiled residuals, by model signature (see `compile_residual()`):
+CAPACITY = 8
+_compiled = OrderedDict()
+
+
+# Class Residual: Vectorized residual-function of a model
+class Residual(System):
+    """
+    Residuals `F(x, p) = lhs - rhs` of a system of equations (see `System`), evaluated for whole batches of points:
+    `x` holds one point per row (samples x variables), and each parameter is a scalar or one value per sample.
+    Large batches are evaluated in passes of at most `BUDGET` input-entries each.
+
+    Equalities hold where their residual is zero, inequalities where it has the sign of their relation; `violation()`
+    and `feasible()` check both, together with the variables' bounds.
+    """
+
+    # Initializer:
+    def __init__(self,
+                 _rows: list[tuple[tuple, tuple]],
+                 _variables: list[str],
+                 _relations: list[str],
+                 _names: list[str] | None = None,
+                 _defaults: dict | None = None):
+        """
+        Parameters:
+            _rows (list): (tree, names) of each row, where `tree` is `lhs - rhs` with slots.
+            _variables (list[str]): Variable-symbols, in column order.
+            _relations (list[str]): Relation of each row ("=", "<=" or ">=").
+            _names (list[str] | None): Name of each row (e.g. the constraint-name).
+            _defaults (dict | None): Parameter-symbol -> value, used for parameters that aren't passed explicitly.
+        """
+
+        super().__init__(_rows, _variables)
+
+        self.relations = np.asarray([RELATIONS[relation] for relation in _relations], dtype=np.int8)
+        self.names     = list(_names) if _names is not None else [f"row_{row}" for row in range(len(_rows))]
+        self.defaults  = dict(_defaults or dict())
+
+        # Variable bounds (unbounded by default):
+        self.lower = np.full(len(self.variables), -np.inf)
+        self.upper = np.full(len(self.variables), +np.inf)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Name                      Description
+    # ------------------------------------------------------------------------------------------------------------------
+    # 1. from_graph             Compiles the equations of a flow-graph, as declared by a model-builder.
+    # 2. __call__               Evaluates the residuals for a batch of points.
+    # 3. violation              Amount by which each row is violated.
+    # 4. feasible               Whether each point satisfies all rows and bounds.
+    # ------------------------------------------------------------------------------------------------------------------
+
+    @classmethod
+    def from_graph(cls, _graph: FlowGraph, _builder: ModelBuilder) -> "Residual":
+        """
+        Compile the node-equations of a flow-graph, with handle- and parameter-symbols bound to model symbols (see
+        `FlowGraph.compiled()`). Variables, parameter values and bounds are taken from the last build of `_builder`,
+        so rows and columns match the generated script (rows are named `equation_<node-uid>_<index>`).
+
+        Raises:
+            ParseError: If an equation can't be parsed.
+        """
+
+        rows, relations, names = list(), list(), list()
+        for nid in _graph.nodes(FlowGraph.Role.NODE):
+            for index, (template, bound) in enumerate(_graph.compiled(nid)):
+
+                name = f"equation_{_graph.node_uid[nid]}_{index}"
+                if  template.relation is None:
+                    raise ParseError(f"{name}: {template.error}")
+
+                rows.append((("sub", template.lhs, template.rhs), bound))
+                relations.append(template.relation)
+                names.append(name)
+
+        variables = [symbol for symbol in _builder.entity_map if symbol not in _builder.parameters]
+        residual  = cls(rows, variables, relations, names, _builder.parameters)
+
+        eids = np.asarray([_builder.entity_map[symbol] for symbol in variables], dtype=np.int64)
+        residual.lower[:] = np.nan_to_num(_graph.ent_float["minimum"].view[eids], nan=-np.inf)
+        residual.upper[:] = np.nan_to_num(_graph.ent_float["maximum"].view[eids], nan=+np.inf)
+
+        return residual
+
+    def __call__(self, _x, _parameters: dict | None = None) -> np.ndarray:
+        """
+        Evaluate the residuals.
+
+        Parameters:
+            _x (array-like): Variable-values of shape (variables,) or (samples, variables).
+            _parameters (dict | None): Parameter-symbol -> value or array of shape (samples,), overriding `defaults`.
+
+        Returns:
+            np.ndarray: Shape (rows,) for a single point, otherwise (samples, rows).
+        """
+
+        parameters = self.defaults | (_parameters or dict())
+        missing    = [name for name in self.parameters if name not in parameters]
+        if  missing:
+            raise KeyError(f"No value for parameter(s): {', '.join(missing[:10])}")
+
+        x       = np.atleast_2d(np.asarray(_x, dtype=np.float64))
+        columns = len(self.variables) + len(self.parameters)
+        samples = max([len(x), *(np.size(parameters[name]) for name in self.parameters)])
+        step    = max(1, BUDGET // max(columns, 1))
+
+        # Inputs and residuals are laid out as (columns, samples), so that each slot gathers whole rows:
+        out = np.empty((self.shape[0], samples))
+        with np.errstate(all="ignore"):
+            for start in range(0, samples, step):
+
+                stop = min(start + step, samples)
+                Z    = np.empty((columns, stop - start))
+
+                Z[:len(self.variables)] = (x[start:stop] if len(x) > 1 else x).T
+                for index, name in enumerate(self.parameters):
+                    value = parameters[name]
+                    Z[len(self.variables) + index] = value[start:stop] if np.ndim(value) else value
+
+                for group in self._groups:
+                    inputs    = [Z[group.inputs[:, slot]] for slot in range(group.tape.slots)]
+                    values, _ = group.tape.forward(inputs, group.constants[:, None, :])
+                    out[group.rows, start:stop] = values[-1]
+
+        return out[:, 0] if np.ndim(_x) == 1 and samples == 1 else out.T
+
+    def violation(self, _x, _parameters: dict | None = None) -> np.ndarray:
+        """
+        Return the violation of each row: |F| for equalities, max(F, 0) for "<=" and max(-F, 0) for ">=" rows.
+        """
+
+        F = self(_x, _parameters)
+        return np.where(self.relations == 0, np.abs(F), np.maximum(F * self.relations, 0.0))
+
+    def feasible(self, _x, _parameters: dict | None = None, _tolerance: float = 1e-6) -> np.ndarray:
+        """
+        Return whether each point satisfies all rows and variable-bounds within `_tolerance` (NaN counts as violated).
+        """
+
+        x = np.asarray(_x, dtype=np.float64)
+        V = np.atleast_2d(self.violation(x, _parameters))
+        X = np.atleast_2d(x)
+
+        ok = ~(V > _tolerance).any(axis=1) & ~np.isnan(V).any(axis=1)
+        ok = ok & ((X >= self.lower - _tolerance) & (X <= self.upper + _tolerance)).all(axis=1)
+        return ok[0] if x.ndim == 1 and len(ok) == 1 else ok
+
+
+# Function compile_residual: Residual-function of the last model built from a flow-graph
+def compile_residual(_graph: FlowGraph, _builder: ModelBuilder) -> Residual:
+    """
+    Return the `Residual` of the model last built by `_builder`, compiling it only if no model with the same signature
+    (i.e. structure, see `ModelBuilder.signature`) has been compiled recently. The parameter defaults are refreshed
+    from the builder on every call, since value edits don't change the signature.
+    """
+
+    key = _builder.signature
+    if  key is not None and key in _compiled:
+        _compiled.move_to_end(key)
+        residual = _compiled[key]
+
+    else:
+        residual = Residual.from_graph(_graph, _builder)
+        if  key is not None:
+            _compiled[key] = residual
+            while len(_compiled) > CAPACITY:
+                _compiled.popitem(last=False)
+
+    residual.defaults = dict(_builder.parameters)
+    return residual
@@ -0,0 +1,269 @@
+import csv
+import time
+import threading
+import multiprocessing
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from tabs.optima.session import create_session, OBJ_DECL
+
+
+# Class Scenario: Named set of parameter overrides
+@dataclass
+class Scenario:
+    name     : str
+    overrides: dict = field(default_factory=dict)     # Parameter-symbol -> value
+
+
+# Function read_scenarios: Reads scenarios from a CSV-file
+def read_scenarios(_path: str) -> list[Scenario]:
+    """
+    Read scenarios from a CSV-file. The header holds the parameter-symbols (the first column is the scenario's name),
+    and each row one scenario. Empty cells keep the parameter's value from the model.
+
+    Parameters:
+        _path (str): Path to the CSV-file.
+
+    Returns:
+        list[Scenario]: One scenario per row.
+    """
+
+    with open(_path, newline="") as file:
+
+        reader  = csv.reader(file)
+        header  = next(reader, [])
+        symbols = [symbol.strip() for symbol in header[1:]]
+
+        return [
+            Scenario(row[0], {
+                symbol: float(cell)
+                for symbol, cell in zip(symbols, row[1:])
+                if  cell.strip()
+            })
+            for row in reader if row
+        ]
+
+
+# Class ScenarioTable: Results of a scenario batch
+class ScenarioTable:
+    """
+    Results of a scenario batch: one row per scenario, one column per objective and variable. Values of scenarios
+    that were not solved are NaN, `status` holds the solve-result (or error) of each scenario.
+    """
+
+    # Initializer:
+    def __init__(self, _names: list[str], _columns: list[str]):
+
+        self.names   = list(_names)
+        self.columns = list(_columns)
+        self.status  = ["pending"] * len(self.names)
+        self.elapsed = np.full(len(self.names), np.nan)
+        self.values  = np.full((len(self.names), len(self.columns)), np.nan)
+
+    def __len__(self):  return len(self.names)
+
+    def column(self, _symbol: str) -> np.ndarray:
+        return self.values[:, self.columns.index(_symbol)]
+
+    def to_csv(self, _path: str):
+
+        with open(_path, "w", newline="") as file:
+
+            writer = csv.writer(file)
+            writer.writerow(["scenario", "status", "elapsed", *self.columns])
+            for index, name in enumerate(self.names):
+                writer.writerow([name, self.status[index], self.elapsed[index], *self.values[index]])
+
+
+# Function objectives: Names of the objectives declared in an AMPL script
+def objectives(_script: str) -> list[str]:
+    return OBJ_DECL.findall(_script)
+
+
+# Per-process session, script, and last solution (see `_init_worker()`):
+_session = None
+_script  = None
+_last    = dict()
+
+
+def _init_worker(_backend: str, _solver: str, _model: str, _initial: dict, _time_limit: float | None = None):
+
+    global _session, _script, _last
+    _session = create_session(_backend, _solver, _time_limit)
+    _script  = _model
+    _last    = dict(_initial)
+
+
+def _solve_scenario(_index: int,
+                    _values: dict,
+                    _columns: list[str],
+                    _timeout: float | None):
+    """
+    Solve one scenario in a worker-process. The process' session stays warm across scenarios: the script is only
+    translated once, subsequent scenarios update parameter values in place and start from the solution of the
+    previous scenario solved by the same process.
+
+    Returns:
+        tuple: (index, status, elapsed seconds, values in column-order or None)
+    """
+
+    start = time.perf_counter()
+    timed = threading.Event()
+
+    def expire():
+        timed.set()
+        _session.interrupt()
+
+    try:
+        # The script is fixed for the process' lifetime, so its id serves as the structure-signature:
+        if  _session.load(_script, id(_script), _values) is None:
+            return _index, _session.error or "error", time.perf_counter() - start, None
+
+        timer = threading.Timer(_timeout, expire) if _timeout else None
+        if timer:   timer.start()
+
+        try:        result = _session.solve(_last)
+        finally:
+            if timer:   timer.cancel()
+
+    except Exception as exception:
+        return _index, str(exception), time.perf_counter() - start, None
+
+    elapsed = time.perf_counter() - start
+
+    # Wall-clock limit reached, here or inside the solver (native backend):
+    if  timed.is_set() or _session.result == "limit":
+        return _index, "timeout", elapsed, None
+
+    if  result is None:     return _index, _session.result or "failed", elapsed, None
+
+    _last.update(result.var_dict)
+
+    values = result.obj_dict | result.var_dict | result.par_dict
+    return _index, "solved", elapsed, [values.get(column, np.nan) for column in _columns]
+
+
+# Function run_scenarios: Solves scenarios in parallel
+def run_scenarios(_script: str,
+                  _parameters: dict,
+                  _scenarios: list[Scenario],
+                  _symbols: list[str],
+                  _workers: int | None = None,
+                  _timeout: float | None = None,
+                  _backend: str = "ampl",
+                  _solver: str = "ipopt",
+                  _initial: dict | None = None,
+                  _progress = None,
+                  _cancelled = None) -> ScenarioTable:
+    """
+    Solve the same model under several sets of parameter overrides across a pool of worker-processes, each holding
+    its own warm AMPL session. Scenarios are dispatched in order of their override-values, so that each process
+    mostly moves between neighbouring scenarios and warm-starts from a nearby solution.
+
+    Parameters:
+        _script (str): The AMPL script (see `ModelBuilder.build()`).
+        _parameters (dict): Base parameter values (see `ModelBuilder.parameters`).
+        _scenarios (list[Scenario]): The scenarios.
+        _symbols (list[str]): Symbols to collect (in addition to the objectives), e.g. the keys of `entity_map`.
+        _workers (int | None): Number of worker-processes (default: CPU count).
+        _timeout (float | None): Per-scenario wall-clock limit in seconds.
+        _backend (str): "ampl", "linear" or "stub" (see `create_session()`).
+        _solver (str): Solver passed to AMPL.
+        _initial (dict | None): Variable-symbol -> initial value, seeds the first scenario of each process.
+        _progress (callable): Called with (completed, total, index, status) after each scenario.
+        _cancelled (callable): Returns True if the batch should stop; pending scenarios are then skipped.
+
+    Returns:
+        ScenarioTable: The results.
+    """
+
+    columns = objectives(_script) + list(_symbols)
+    table   = ScenarioTable([scenario.name for scenario in _scenarios], columns)
+
+    with ProcessPoolExecutor(max_workers=_workers,
+                             mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_worker,
+                             initargs=(_backend, _solver, _script, _initial or dict(), _timeout)) as executor:
+
+        values  = [_parameters | scenario.overrides for scenario in _scenarios]
+        symbols = sorted(set().union(*(scenario.overrides for scenario in _scenarios)))
+        order   = sorted(range(len(values)), key=lambda index: tuple(values[index].get(s, 0.0) for s in symbols))
+
+        futures = [
+            executor.submit(_solve_scenario, index, values[index], columns, _timeout)
+            for index in order
+        ]
+
+        for completed, future in enumerate(as_completed(futures), start=1):
+
+            index, status, elapsed, values = future.result()
+            table.status [index] = status
+            table.elapsed[index] = elapsed
+            if  values is not None:
+                table.values[index] = values
+
+            if _progress:   _progress(completed, len(futures), index, status)
+            if _cancelled and _cancelled():
+                executor.shutdown(wait=False, cancel_futures=True)
+                break
+
+    return table
+
+
+class ScenarioThread(QThread):
+
+    # Signals:
+    progress_made  = pyqtSignal(int, int, str, str)     # Completed, total, scenario-name, status
+    result_ready   = pyqtSignal(object)                 # ScenarioTable
+    error_occurred = pyqtSignal(str)
+
+    # Initializer:
+    def __init__(self,
+                 _script: str,
+                 _parameters: dict,
+                 _scenarios: list[Scenario],
+                 _symbols: list[str],
+                 **kwargs):
+        """
+        Initializes the ScenarioThread class.
+
+        Args:
+            _script (str): The AMPL script.
+            _parameters (dict): Base parameter values.
+            _scenarios (list[Scenario]): The scenarios.
+            _symbols (list[str]): Symbols to collect.
+            **kwargs: Forwarded to `run_scenarios()`.
+        """
+        super().__init__()
+
+        self.script     = _script
+        self.parameters = dict(_parameters)
+        self.scenarios  = _scenarios
+        self.symbols    = list(_symbols)
+        self.kwargs     = kwargs
+        self.cancelled  = False
+        self.table      = None
+
+    def run(self):
+
+        def progress(completed, total, index, status):
+            self.progress_made.emit(completed, total, self.scenarios[index].name, status)
+
+        try:
+            self.table = run_scenarios(self.script,
+                                       self.parameters,
+                                       self.scenarios,
+                                       self.symbols,
+                                       _progress=progress,
+                                       _cancelled=lambda: self.cancelled,
+                                       **self.kwargs)
+            self.result_ready.emit(self.table)
+
+        except Exception as exception:  self.error_occurred.emit(str(exception))
+
+    def cancel(self):   self.cancelled = True
@@ -0,0 +1,98 @@
+import re
+
+from tabs.optima.expression import linearize
+from tabs.schema.equation import ParseError, parse, compile_equation
+
+
+# Statement patterns of the AMPL subset emitted by `ModelBuilder`:
+PARAM_STMT = re.compile(r"^param\s+(\w+)(?:\s+(?:default|=)\s+(.+))?$", re.DOTALL)
+VAR_STMT   = re.compile(r"^var\s+(\w+)((?:\s*,?\s*(?:>=|<=|:=|=)[^,]+)*)$")
+BOUND      = re.compile(r"(>=|<=|:=|=)([^,]+)")
+OBJ_STMT   = re.compile(r"^(maximize|minimize)\s+(\w+)\s*:(.+)$", re.DOTALL)
+CON_STMT   = re.compile(r"^subject\s+to\s+(\w+)\s*:(.+)$", re.DOTALL)
+
+
+# Function statements: Splits an AMPL script into statements
+def statements(_script: str):
+    """
+    Yield the statements of a script with comments stripped and whitespace collapsed.
+    """
+
+    text = "\n".join(line.split("#", 1)[0] for line in _script.splitlines())
+    for statement in text.split(";"):
+
+        statement = " ".join(statement.split())
+        if  statement:
+            yield statement
+
+
+# Class ScriptModel: Parsed AMPL script
+class ScriptModel:
+    """
+    Structure of an AMPL script: parameter defaults, variables, objectives and constraints as syntax trees. The
+    source of each parameter and constraint is kept, so that parts of the script can be re-emitted unchanged.
+    Constraints are compiled through `compile_equation`, so re-parsing a script mostly hits its cache.
+
+    Raises `ParseError` for statements outside the subset emitted by `ModelBuilder`.
+    """
+
+    # Initializer:
+    def __init__(self, _script: str):
+
+        self.defaults    = dict()   # Parameter-symbol -> default value (or syntax tree)
+        self.variables   = list()   # Variable-symbols, in declaration order
+        self.objectives  = list()   # (name, sense, tree)
+        self.constraints = list()   # (name, relation, lhs, rhs)
+
+        self.bounds      = dict()   # Variable-symbol -> (lower, upper) syntax trees (None if unbounded)
+        self.sources     = dict()   # Parameter- and variable-symbol -> statement
+        self.statements  = list()   # Statement of each constraint
+        self.templates   = list()   # Compiled equation of each constraint (see `compile_equation`)
+
+        for statement in statements(_script):
+
+            if  match := PARAM_STMT.match(statement):
+                value = match.group(2)
+                self.defaults[match.group(1)] = parse(value) if value else None
+                self.sources [match.group(1)] = statement
+
+            elif match := VAR_STMT.match(statement):
+                self.variables.append(match.group(1))
+                self.sources  [match.group(1)] = statement
+
+                # Native bounds (initial values given by `:=` are ignored):
+                lower, upper = None, None
+                for relation, value in BOUND.findall(match.group(2)):
+                    if  relation in (">=", "="):    lower = parse(value)
+                    if  relation in ("<=", "="):    upper = parse(value)
+
+                if  lower is not None or upper is not None:
+                    self.bounds[match.group(1)] = (lower, upper)
+
+            elif match := OBJ_STMT.match(statement):
+                self.objectives.append((match.group(2), match.group(1), parse(match.group(3))))
+
+            elif match := CON_STMT.match(statement):
+                template = compile_equation(match.group(2))
+                self.constraints.append((match.group(1), *template.equation()))
+                self.statements .append(statement)
+                self.templates  .append(template)
+
+            else:
+                raise ParseError(f"Unsupported statement: '{statement[:60]}'")
+
+        self.index = {symbol: column for column, symbol in enumerate(self.variables)}
+
+    def parameters(self, _values: dict | None = None) -> dict:
+        """
+        Return the value of every parameter: the given values, or the declared defaults otherwise.
+        """
+
+        values = dict()
+        for symbol, default in self.defaults.items():
+
+            if  _values and symbol in _values:  values[symbol] = float(_values[symbol])
+            elif default is not None:           values[symbol] = linearize(default, values)[1]
+            else:                               raise ParseError(f"Parameter '{symbol}' has no value")
+
+        return values
@@ -0,0 +1,462 @@
+import os
+import json
+import warnings
+import hashlib
+import multiprocessing
+
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from scipy.stats import qmc
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from tabs.optima import scenario
+from tabs.optima.cache import canonical
+from tabs.optima.scenario import objectives
+from tabs.optima.uncertainty import Uncertain, PENDING, SOLVED, FAILED, DISTRIBUTIONS, transform, _solve_batch
+
+
+# Sensitivity methods:
+METHODS = ("sobol", "morris")
+
+# Measures reported by each method (see `Indices.measures`):
+MEASURES = {
+    "sobol" : ("S1", "ST"),
+    "morris": ("mu", "mu_star", "sigma")
+}
+
+# Grid-levels of Morris designs:
+LEVELS = 4
+
+# Default location of sensitivity runs (one sub-directory per model and design, see `design_key()`):
+DIRECTORY = os.path.join(os.path.expanduser("~"), ".climact", "sensitivity")
+
+
+# Function saltelli: Saltelli design in the unit hypercube
+def saltelli(_count: int, _dimension: int, _seed: int | None = None) -> np.ndarray:
+    """
+    Generate a Saltelli design: two independent matrices A and B of `_count` points each, taken from a scrambled
+    Sobol sequence of dimension 2k, followed by one matrix AB_i per parameter (A with column i taken from B).
+
+    Returns:
+        np.ndarray: Points in (0, 1), of shape (count * (k + 2), k), laid out as [A; B; AB_1; ...; AB_k].
+    """
+
+    sobol = qmc.Sobol(2 * _dimension, scramble=True, seed=_seed)
+    base  = sobol.random_base2(max(0, int(np.ceil(np.log2(_count)))))[:_count]
+    A, B  = base[:, :_dimension], base[:, _dimension:]
+
+    design = np.empty((_count * (_dimension + 2), _dimension))
+    design[:_count] = A
+    design[_count:2 * _count] = B
+    for i in range(_dimension):
+        block = design[(i + 2) * _count:(i + 3) * _count]
+        block[:]    = A
+        block[:, i] = B[:, i]
+
+    # Scrambled points can be arbitrarily close to 0 or 1, where inverse CDFs diverge:
+    eps = np.finfo(np.float64).eps
+    return np.clip(design, eps, 1.0 - eps)
+
+
+# Function morris: Morris design in the unit hypercube
+def morris(_count: int, _dimension: int, _levels: int = LEVELS, _seed: int | None = None) -> np.ndarray:
+    """
+    Generate `_count` Morris trajectories on a grid of `_levels` levels. Each trajectory starts at a random grid point
+    and moves one parameter at a time (in random order and direction) by levels / 2 grid-steps, the usual choice of
+    delta = levels / (2 * (levels - 1)) on the [0, 1] grid. Levels are mapped to the midpoints of equiprobable bins,
+    (level + 0.5) / levels, so that every point has a finite inverse CDF.
+
+    Returns:
+        np.ndarray: Points in (0, 1), of shape (count * (k + 1), k), one block of k + 1 rows per trajectory.
+    """
+
+    rng   = np.random.default_rng(_seed)
+    delta = _levels // 2
+    shape = (_count, _dimension)
+
+    # Start in the lower half of the grid, and step up or down so that every step stays on the grid:
+    base       = rng.integers(0, _levels - delta, shape)
+    direction  = rng.choice((-1, 1), shape)
+    order      = rng.permuted(np.broadcast_to(np.arange(_dimension), shape), axis=1)
+    trajectory = np.empty((_count, _dimension + 1, _dimension), dtype=np.int64)
+
+    trajectory[:, 0] = np.where(direction > 0, base, base + delta)
+    for step in range(_dimension):
+        trajectory[:, step + 1] = trajectory[:, step]
+        moved = order[:, step]
+        rows  = np.arange(_count)
+        trajectory[rows, step + 1, moved] += direction[rows, moved] * delta
+
+    return ((trajectory + 0.5) / _levels).reshape(-1, _dimension)
+
+
+# Function design_key: Cache-key of a sensitivity run
+def design_key(_script: str, _parameters: dict, _spec: dict) -> str:
+    """
+    Hash the canonical form of a script (see `canonical()`) together with the specification of a design (method,
+    sizes, seed, parameters and their sigmas, collected columns, backend), so that a run is resumed only if both are
+    unchanged.
+    """
+
+    digest = hashlib.sha256(canonical(_script, _parameters).encode())
+    digest.update(json.dumps(_spec, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+# Function sobol_indices: First-order and total Sobol indices of a Saltelli design
+def sobol_indices(_values: np.ndarray, _count: int, _dimension: int) -> dict:
+    """
+    Estimate the Sobol indices from the results of a Saltelli design (see `saltelli()`), with the estimators of
+    Saltelli (2010) for the first-order and of Jansen (1999) for the total index:
+
+        S1_i = mean(f(B) * (f(AB_i) - f(A))) / V,   ST_i = mean((f(A) - f(AB_i))^2) / (2V)
+
+    Failed points (NaN) are left out of the means of the parameters they affect.
+
+    Parameters:
+        _values (np.ndarray): Results, of shape (count * (k + 2), columns).
+
+    Returns:
+        dict: "S1" and "ST", each of shape (k, columns).
+    """
+
+    A  = _values[:_count]
+    B  = _values[_count:2 * _count]
+    AB = _values[2 * _count:].reshape(_dimension, _count, -1)
+
+    # Partial results can leave whole slices empty (NaN):
+    with np.errstate(all="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        variance = np.nanvar(np.concatenate((A, B)), axis=0, ddof=1)
+        S1 = np.nanmean(B * (AB - A), axis=1) / variance
+        ST = np.nanmean(np.square(A - AB), axis=1) / (2.0 * variance)
+
+    return {"S1": S1, "ST": ST}
+
+
+# Function morris_indices: Elementary-effect statistics of a Morris design
+def morris_indices(_design: np.ndarray, _values: np.ndarray, _count: int, _dimension: int) -> dict:
+    """
+    Compute the elementary effects of a Morris design (see `morris()`) and their statistics per parameter: the mean
+    (mu), the mean of absolute values (mu_star, a measure of overall influence) and the standard deviation (sigma,
+    a measure of non-linearity and interactions). Effects are taken per unit of the design's grid; steps with a
+    failed end-point are left out.
+
+    Returns:
+        dict: "mu", "mu_star" and "sigma", each of shape (k, columns).
+    """
+
+    X = _design.reshape(_count, _dimension + 1, _dimension)
+    Y = _values.reshape(_count, _dimension + 1, -1)
+
+    # Each step moves one parameter; recover which one and the signed step from the design:
+    step   = np.diff(X, axis=1)
+    moved  = np.abs(step).argmax(axis=2)
+    delta  = np.take_along_axis(step, moved[..., None], axis=2)
+    effect = np.diff(Y, axis=1) / delta
+
+    # Scatter the effects into (trajectories, parameters, columns):
+    EE = np.full((_count, _dimension, Y.shape[2]), np.nan)
+    EE[np.arange(_count)[:, None], moved] = effect
+
+    with np.errstate(all="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return {
+            "mu"     : np.nanmean(EE, axis=0),
+            "mu_star": np.nanmean(np.abs(EE), axis=0),
+            "sigma"  : np.nanstd(EE, axis=0, ddof=1)
+        }
+
+
+# Class Study: Design and results of a sensitivity run
+class Study:
+    """
+    Inputs and outputs of a sensitivity run, stored as .npy memory-maps in `directory`: the design in the unit
+    hypercube `design` and the parameter values `samples` (points x parameters), `values` (columns x points) and
+    `status` (points). Results are stored column-wise, so that each output can be read contiguously. A `meta.json`
+    file describes the run; when a study is opened on a directory with the same key, the files are reopened and the
+    points still pending are solved, so that interrupted runs resume where they stopped.
+    """
+
+    # Initializer:
+    def __init__(self, _directory: str, _key: str, _meta: dict, _design: np.ndarray, _samples: np.ndarray):
+
+        self.directory = _directory
+        self.key       = _key
+        self.meta      = dict(_meta)
+        self.method    = _meta["method"]
+        self.count     = _meta["count"]
+        self.symbols   = list(_meta["symbols"])     # Parameter-symbols (columns of `samples`)
+        self.columns   = list(_meta["columns"])     # Objective- and variable-symbols (rows of `values`)
+
+        os.makedirs(_directory, exist_ok=True)
+        path    = os.path.join(_directory, "meta.json")
+        resumed = False
+        if  os.path.exists(path):
+            with open(path) as file:
+                resumed = json.load(file).get("key") == _key
+
+        mmap = np.lib.format.open_memmap
+        mode = "r+" if resumed else "w+"
+        points, k = _design.shape
+        self.design  = mmap(os.path.join(_directory, "design.npy") , mode, np.float64, (points, k))
+        self.samples = mmap(os.path.join(_directory, "samples.npy"), mode, np.float64, (points, k))
+        self.values  = mmap(os.path.join(_directory, "values.npy") , mode, np.float64, (len(self.columns), points))
+        self.status  = mmap(os.path.join(_directory, "status.npy") , mode, np.int8   , (points,))
+        self.resumed = resumed
+
+        # The meta-file is written last, so that only fully initialized studies are resumed:
+        if  not resumed:
+            self.design [:] = _design
+            self.samples[:] = _samples
+            self.values [:] = np.nan
+            self.status [:] = PENDING
+            self.flush()
+            with open(path, "w") as file:
+                json.dump(self.meta | {"key": _key}, file, indent=2)
+
+    def __len__(self):  return len(self.status)
+
+    @property
+    def pending(self) -> int:
+        return int(np.count_nonzero(self.status == PENDING))
+
+    @property
+    def failed(self) -> int:
+        return int(np.count_nonzero(self.status == FAILED))
+
+    def column(self, _symbol: str) -> np.ndarray:
+        return self.values[self.columns.index(_symbol)]
+
+    def flush(self):
+
+        for array in (self.design, self.samples, self.values, self.status):
+            array.flush()
+
+    def indices(self) -> "Indices":
+        """
+        Compute the sensitivity measures from the results so far (unsolved points count as failed).
+        """
+
+        k      = len(self.symbols)
+        values = np.asarray(self.values).T
+        if  self.method == "sobol":
+            measures = sobol_indices(values, self.count, k)
+        else:
+            measures = morris_indices(np.asarray(self.design), values, self.count, k)
+
+        return Indices(self.method, self.symbols, self.columns, measures, self.directory, len(self), self.failed)
+
+
+# Class Indices: Sensitivity measures of a study
+@dataclass
+class Indices:
+    method   : str
+    symbols  : list[str]                                # Parameters (rows of each measure)
+    columns  : list[str]                                # Outputs (columns of each measure)
+    measures : dict = field(default_factory=dict)       # Name -> array (parameters x columns), see `MEASURES`
+    directory: str  = ""
+    points   : int  = 0
+    failed   : int  = 0
+
+    def ranking(self, _column: str) -> list[tuple[str, float]]:
+        """
+        Return the parameters ordered by their influence on an output (total index, or mu_star for Morris).
+        """
+
+        measure = self.measures["ST" if self.method == "sobol" else "mu_star"][:, self.columns.index(_column)]
+        order   = np.argsort(-np.nan_to_num(measure, nan=-np.inf))
+        return [(self.symbols[i], float(measure[i])) for i in order]
+
+
+# Function run_sensitivity: Global sensitivity analysis of the uncertain parameters
+def run_sensitivity(_script: str,
+                    _parameters: dict,
+                    _uncertain: list[Uncertain],
+                    _symbols: list[str],
+                    _count: int,
+                    _method: str = "sobol",
+                    _directory: str | None = None,
+                    _distribution: str = "normal",
+                    _levels: int = LEVELS,
+                    _seed: int | None = 0,
+                    _batch: int = 64,
+                    _workers: int | None = None,
+                    _timeout: float | None = None,
+                    _backend: str = "ampl",
+                    _solver: str = "ipopt",
+                    _initial: dict | None = None,
+                    _progress = None,
+                    _cancelled = None) -> Study:
+    """
+    Generate a Saltelli (method "sobol") or Morris design over the uncertain parameters, map it to parameter values
+    through the inverse CDF of the distribution (see `transform()`), and solve the model at every point across a pool
+    of worker-processes, in batches, like `run_uncertainty()`. Each batch is flushed to the study's files as it
+    completes; a run with the same model and design is found in the cache directory and only its pending points are
+    solved (with a fixed `_seed`, re-running an interrupted analysis resumes it).
+
+    Parameters:
+        _script (str): The AMPL script (see `ModelBuilder.build()`).
+        _parameters (dict): Base parameter values (see `ModelBuilder.parameters`).
+        _uncertain (list[Uncertain]): The uncertain parameters (see `uncertain_parameters()`).
+        _symbols (list[str]): Symbols to collect (in addition to the objectives), e.g. connector-symbols.
+        _count (int): Base samples (Sobol: count * (k + 2) points) or trajectories (Morris: count * (k + 1) points).
+        _method (str): One of `METHODS`.
+        _directory (str | None): Directory of the study's files (default: a sub-directory of `DIRECTORY` per key).
+        _distribution (str): One of `DISTRIBUTIONS`.
+        _levels (int): Grid-levels of Morris designs.
+        _seed (int | None): Seed of the design.
+        _batch (int): Points per task.
+        _workers (int | None): Number of worker-processes (default: CPU count).
+        _timeout (float | None): Per-point wall-clock limit in seconds.
+        _backend (str): "ampl", "linear" or "stub" (see `create_session()`).
+        _solver (str): Solver passed to AMPL.
+        _initial (dict | None): Variable-symbol -> initial value, seeds the first point of each process.
+        _progress (callable): Called with (completed, total, indices) after each batch.
+        _cancelled (callable): Returns True if the run should stop; pending batches are then skipped.
+
+    Returns:
+        Study: Design, results and files of the run (see `Study.indices()` for the measures).
+    """
+
+    if  _method not in METHODS:
+        raise ValueError(f"Unknown sensitivity method '{_method}'")
+
+    if  _distribution not in DISTRIBUTIONS:
+        raise ValueError(f"Unknown distribution '{_distribution}'")
+
+    if  not _uncertain:
+        raise ValueError("No uncertain parameters to analyze")
+
+    columns = objectives(_script) + list(_symbols)
+    symbols = [item.symbol for item in _uncertain]
+    spec    = {
+        "method"      : _method,
+        "count"       : _count,
+        "levels"      : _levels if _method == "morris" else None,
+        "seed"        : _seed,
+        "distribution": _distribution,
+        "symbols"     : symbols,
+        "sigma"       : [item.sigma for item in _uncertain],
+        "columns"     : columns,
+        "backend"     : _backend,
+        "solver"      : _solver,
+    }
+
+    key       = design_key(_script, _parameters, spec)
+    directory = _directory or os.path.join(DIRECTORY, key[:24])
+    design    = (saltelli(_count, len(symbols), _seed) if _method == "sobol" else
+                 morris(_count, len(symbols), _levels, _seed))
+
+    study = Study(directory, key, spec, design, transform(_uncertain, design, _distribution))
+
+    # Batches with pending points (all of them, unless the run is resumed):
+    total  = len(study)
+    starts = [start for start in range(0, total, _batch) if (study.status[start:start + _batch] == PENDING).any()]
+    if  not starts:
+        return study
+
+    with ProcessPoolExecutor(max_workers=_workers,
+                             mp_context=multiprocessing.get_context("spawn"),
+                             initializer=scenario._init_worker,
+                             initargs=(_backend, _solver, _script, _initial or dict(), _timeout)) as executor:
+
+        pending = {
+            executor.submit(_solve_batch,
+                            start,
+                            np.array(study.samples[start:start + _batch]),
+                            symbols,
+                            _parameters,
+                            columns,
+                            _timeout)
+            for start in starts
+        }
+
+        # Measures are recomputed from all results, so only about every 5% of the points:
+        completed = total - study.pending
+        refresh   = 0
+        indices   = None
+        while pending:
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+
+                start, values = future.result()
+                stop = start + len(values)
+
+                study.values[:, start:stop] = values.T
+                study.status[start:stop]    = np.where(np.isnan(values).all(axis=1), FAILED, SOLVED)
+                completed += len(values)
+
+            # Flush after every batch, so that an interruption loses at most the running batches:
+            study.flush()
+
+            if  indices is None or completed >= refresh or not pending:
+                indices = study.indices()
+                refresh = completed + max(_batch, total // 20)
+
+            if _progress:   _progress(completed, total, indices)
+            if _cancelled and _cancelled():
+                executor.shutdown(wait=False, cancel_futures=True)
+                break
+
+    study.flush()
+    return study
+
+
+class SensitivityThread(QThread):
+
+    # Signals:
+    progress_made  = pyqtSignal(int, int, object)   # Completed, total, Indices
+    result_ready   = pyqtSignal(object)             # Study
+    error_occurred = pyqtSignal(str)
+
+    # Initializer:
+    def __init__(self,
+                 _script: str,
+                 _parameters: dict,
+                 _uncertain: list[Uncertain],
+                 _symbols: list[str],
+                 _count: int,
+                 **kwargs):
+        """
+        Initializes the SensitivityThread class.
+
+        Args:
+            _script (str): The AMPL script.
+            _parameters (dict): Base parameter values.
+            _uncertain (list[Uncertain]): The uncertain parameters.
+            _symbols (list[str]): Symbols to collect.
+            _count (int): Base samples or trajectories.
+            **kwargs: Forwarded to `run_sensitivity()`.
+        """
+        super().__init__()
+
+        self.script     = _script
+        self.parameters = dict(_parameters)
+        self.uncertain  = list(_uncertain)
+        self.symbols    = list(_symbols)
+        self.count      = _count
+        self.kwargs     = kwargs
+        self.cancelled  = False
+        self.study      = None
+
+    def run(self):
+
+        try:
+            self.study = run_sensitivity(self.script,
+                                         self.parameters,
+                                         self.uncertain,
+                                         self.symbols,
+                                         self.count,
+                                         _progress=self.progress_made.emit,
+                                         _cancelled=lambda: self.cancelled,
+                                         **self.kwargs)
+            self.result_ready.emit(self.study)
+
+        except Exception as exception:  self.error_occurred.emit(str(exception))
+
+    def cancel(self):   self.cancelled = True
@@ -0,0 +1,358 @@
+import re
+import math
+import time
+import logging
+import threading
+
+from amplpy import AMPL, AMPLException
+
+from tabs.optima.ampl import AMPLOutput, AMPLErrors, Solution, extract
+from tabs.optima.model import fmt
+from tabs.optima.linear import LinearSession
+
+# Patterns for declarations emitted by `ModelBuilder`:
+PARAM_DECL = re.compile(r"^param\s+(\w+)\s+default\s+(\S+);", re.MULTILINE)
+VAR_DECL   = re.compile(r"^var\s+(\w+)\b", re.MULTILINE)
+OBJ_DECL   = re.compile(r"^(?:maximize|minimize)\s+(\w+)\s*:", re.MULTILINE)
+
+
+# Function declared_parameters: Parameters declared with numeric defaults in a script
+def declared_parameters(_script: str) -> dict:
+
+    values = dict()
+    for symbol, value in PARAM_DECL.findall(_script):
+        try:                values[symbol] = float(value)
+        except ValueError:  continue
+
+    return values
+
+
+# Class AMPLSession: Warm AMPL instance
+class AMPLSession:
+    """
+    Keeps a single AMPL translator alive across runs. Scripts with the same structure as the last one loaded only
+    update the changed parameter values, so repeated what-if solves skip process startup and model translation. Any
+    structural change resets the instance and re-evaluates the script.
+    """
+
+    # Default options:
+    OPTIONS = {
+        "objective_precision": 3,
+        "solution_precision" : 3,
+        "display_precision"  : 3
+    }
+
+    # Initializer:
+    def __init__(self, _solver: str = "ipopt"):
+
+        self.solver = _solver
+
+        self.__ampl   = None
+        self.__output = AMPLOutput()
+        self.__errors = AMPLErrors()
+
+        # State of the loaded model:
+        self._signature = None
+        self._values    = dict()
+        self._variables = set()     # Declared variables, used to filter initial values
+        self._timing    = dict()    # Stage -> seconds, for the current run
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Name                      Description
+    # ------------------------------------------------------------------------------------------------------------------
+    # 1. start                  Starts the AMPL instance (if not already running).
+    # 2. load                   Loads a script, updating parameter values in place where possible.
+    # 3. solve                  Solves the loaded model and returns its results.
+    # 4. interrupt              Interrupts a running solve (thread-safe).
+    # 5. shutdown               Closes the AMPL instance.
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def start(self):
+
+        if  self.__ampl is not None:
+            return
+
+        self.__ampl = AMPL()
+        self.__ampl.setOutputHandler(self.__output)
+        self.__ampl.setErrorHandler (self.__errors)
+
+        for option, value in AMPLSession.OPTIONS.items():
+            self.__ampl.set_option(option, value)
+
+    def load(self, _script: str, _signature = None, _values: dict | None = None) -> bool | None:
+        """
+        Load a script into the session.
+
+        Parameters:
+            _script (str): The AMPL script.
+            _signature (hashable): Structure of the script (see `ModelBuilder.signature`), or None if unknown.
+            _values (dict): Parameter-symbol -> value, used for in-place updates.
+
+        Returns:
+            bool | None: True if the model was updated in place, False if it was re-translated, None on error.
+        """
+
+        self.start()
+        self.__output.clear()
+        self.__errors.clear()
+
+        _values = _values or dict()
+        _start  = time.perf_counter()
+
+        # Same structure as the loaded model: send the changed parameters only, as a single data-statement:
+        if  _signature is not None and _signature == self._signature:
+
+            changed = {symbol: value for symbol, value in _values.items() if self._values.get(symbol) != value}
+            if  changed:
+                try:
+                    self.__ampl.eval("".join(f"let {symbol} := {fmt(value)};" for symbol, value in changed.items()))
+
+                except AMPLException as ampl_exception:
+                    self.__errors.error(str(ampl_exception))
+                    self._signature = None
+                    return None
+
+            self._values.update(changed)
+            self._timing = {"eval": time.perf_counter() - _start}
+            return True
+
+        # Otherwise, drop the old model and translate the new one:
+        self.__ampl.reset()
+        for option, value in AMPLSession.OPTIONS.items():
+            self.__ampl.set_option(option, value)
+
+        try:
+            self.__ampl.eval(_script)
+
+        except AMPLException as ampl_exception:
+            self.__errors.error(str(ampl_exception))
+            self._signature = None
+            return None
+
+        self._signature = _signature
+        self._values    = declared_parameters(_script) | _values
+        self._variables = set(VAR_DECL.findall(_script))
+        self._timing    = {"eval": time.perf_counter() - _start}
+        return False
+
+    def solve(self, _initial: dict | None = None):
+        """
+        Solve the loaded model.
+
+        Parameters:
+            _initial (dict | None): Variable-symbol -> initial value (e.g. the previous solution). Symbols that are not
+                declared in the loaded model are ignored.
+
+        Returns:
+            Solution | None: Variable-, parameter-, and objective-values with a timing breakdown, or None if the model
+                was not solved.
+        """
+
+        try:
+            start = time.perf_counter()
+
+            # Warm-start: set all initial values with a single statement:
+            if  _initial:
+                statement = "".join(
+                    f"let {symbol} := {fmt(value)};"
+                    for symbol, value in _initial.items()
+                    if  symbol in self._variables and math.isfinite(value)
+                )
+                if statement:   self.__ampl.eval(statement)
+
+            self._timing["eval"] = self._timing.get("eval", 0.0) + time.perf_counter() - start
+
+            start = time.perf_counter()
+            self.__ampl.solve(solver=self.solver, verbose=True)
+            self._timing["solve"] = time.perf_counter() - start
+
+            if self.__ampl.solve_result != 'solved':
+                return None
+
+            start    = time.perf_counter()
+            solution = extract(self.__ampl, self._values)
+            self._timing["extract"] = time.perf_counter() - start
+
+            solution.timing = dict(self._timing)
+            return solution
+
+        except AMPLException as ampl_exception:
+            self.__errors.error(str(ampl_exception))
+            logging.exception(f"{ampl_exception}")
+
+    def interrupt(self):
+
+        if  self.__ampl is not None:
+            self.__ampl.interrupt()
+
+    def shutdown(self):
+
+        if  self.__ampl is not None:
+            self.__ampl.interrupt()
+            self.__ampl.close()
+
+        self.__ampl     = None
+        self._signature = None
+        self._values    = dict()
+        self._variables = set()
+
+    @property
+    def listener(self):
+        return self.__output.listener
+
+    @listener.setter
+    def listener(self, _callable):
+        self.__output.listener = _callable
+
+    @property
+    def options(self):  return {"backend": "ampl", "solver": self.solver, **AMPLSession.OPTIONS}
+
+    @property
+    def running(self):
+        return self.__ampl is not None
+
+    @property
+    def result(self):
+        return self.__ampl.solve_result if self.__ampl else None
+
+    @property
+    def output(self):
+        return self.__output.get_history()
+
+    @property
+    def error(self):
+        return self.__errors.get_error()
+
+
+# Class StubSession: Stand-in for `AMPLSession` that needs no AMPL installation
+class StubSession:
+    """
+    Mirrors the interface of `AMPLSession` without running AMPL. `solve()` reports every declared variable at its
+    initial value (0.0 by default), every objective as 0.0 and every parameter at its current value, after an optional
+    delay. Used to exercise the solve
+    pipelines (worker-threads, scenario batches) without a licensed AMPL.
+    """
+
+    # Initializer:
+    def __init__(self, _delay: float = 0.0):
+
+        self.delay    = _delay
+        self.listener = None
+
+        self._script    = None
+        self._signature = None
+        self._values    = dict()
+        self._result    = None
+        self._error     = str()
+        self._interrupt = threading.Event()
+
+    def start(self):    pass
+
+    def load(self, _script: str, _signature = None, _values: dict | None = None) -> bool | None:
+
+        self._error = str()
+        _values     = _values or dict()
+        in_place    = _signature is not None and _signature == self._signature
+
+        if  not in_place:
+            self._script = _script
+            self._values = declared_parameters(_script)
+
+        unknown = set(_values) - set(self._values)
+        if  unknown:
+            self._error     = f"Unknown parameter(s): {', '.join(sorted(unknown))}"
+            self._signature = None
+            return None
+
+        self._values.update(_values)
+        self._signature = _signature
+        return in_place
+
+    def solve(self, _initial: dict | None = None):
+
+        _initial = _initial or dict()
+        self._interrupt.clear()
+        if  self._interrupt.wait(self.delay):
+            self._result = "interrupted"
+            return None
+
+        if self.listener is not None:
+            self.listener("Stub solver: solved\n")
+
+        self._result = "solved"
+        return Solution.from_dicts(
+            {symbol: float(_initial.get(symbol, 0.0)) for symbol in VAR_DECL.findall(self._script)},
+            dict(self._values),
+            {symbol: 0.0 for symbol in OBJ_DECL.findall(self._script)}
+        )
+
+    def interrupt(self):    self._interrupt.set()
+
+    def shutdown(self):     self._interrupt.set()
+
+    @property
+    def options(self):  return {"backend": "stub"}
+
+    @property
+    def running(self):  return self._script is not None
+
+    @property
+    def result(self):   return self._result
+
+    @property
+    def output(self):   return str()
+
+    @property
+    def error(self):    return self._error
+
+
+# Function create_session: Instantiates a session for a backend
+def create_session(_backend: str = "ampl", _solver: str = "ipopt", _time_limit: float | None = None):
+    """
+    Create a session for the given backend: "ampl" (`AMPLSession`), "linear" (`LinearSession`, see linear.py) or
+    "stub" (`StubSession`). All sessions share the same interface; `_solver` only applies to AMPL, `_time_limit`
+    (seconds) to the native linear backend, which enforces it inside HiGHS. Other backends are stopped by the
+    caller's `interrupt()`.
+    """
+
+    if  _backend == "ampl":     return AMPLSession(_solver)
+    if  _backend == "linear":   return LinearSession(_time_limit)
+    if  _backend == "stub":     return StubSession()
+
+    raise ValueError(f"Unknown backend '{_backend}'")
+
+
+# Class SessionManager: One warm session per canvas and backend
+class SessionManager:
+
+    # Initializer:
+    def __init__(self):
+        self._sessions = dict()     # (Canvas-UID, backend) -> session
+
+    def session(self, _uid: str, _backend: str = "ampl", _time_limit: float | None = None):
+        """
+        Return the session of a canvas for the given backend, creating it on first use. The time limit of the native
+        linear backend is updated to `_time_limit`, if given (see `create_session()`).
+        """
+
+        if  (_uid, _backend) not in self._sessions:
+            self._sessions[(_uid, _backend)] = create_session(_backend, _time_limit=_time_limit)
+
+        session = self._sessions[(_uid, _backend)]
+        if  isinstance(session, LinearSession) and _time_limit is not None:
+            session.time_limit = _time_limit
+
+        return session
+
+    def shutdown(self, _uid: str | None = None):
+        """
+        Shut down the sessions of a canvas, or all sessions if `_uid` is None.
+        """
+
+        keys = [key for key in self._sessions if _uid is None or key[0] == _uid]
+        for key in keys:
+            self._sessions.pop(key).shutdown()
+
+
+# Global session-manager:
+sessions = SessionManager()
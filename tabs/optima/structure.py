@@ -0,0 +1,382 @@
+from dataclasses import dataclass, field
+
+import numpy as np
+import scipy.sparse as sp
+
+from scipy.sparse.csgraph import maximum_bipartite_matching, connected_components, breadth_first_order
+
+from tabs.schema.flowgraph import FlowGraph
+
+
+# Class NodeIncidence: Cached incidence of a single node's equations
+@dataclass
+class NodeIncidence:
+
+    revision: int                                   # Node-revision the incidence was computed for
+    indices : np.ndarray = None                     # Position of each equality in `FlowGraph.compiled()`
+    rows    : np.ndarray = None                     # Row (0-based, within the node) of each incidence-entry
+    cols    : np.ndarray = None                     # Column (see `StructureAnalyzer.columns`) of each entry
+
+
+# Class Stack: Stacked incidences of all nodes
+@dataclass
+class Stack:
+
+    nodes    : np.ndarray   # Node-ids
+    revisions: np.ndarray   # Node-revisions the incidences were read at
+    counts   : np.ndarray   # Equalities per node
+    sizes    : np.ndarray   # Incidence-entries per node
+    rows     : np.ndarray   # Row of each entry, within its node
+    cols     : np.ndarray   # Column of each entry
+    local    : np.ndarray   # Position of each equality among its node's equations
+    uids     : list         # Node-UIDs
+
+
+# Function splice: Replaces segments of an array
+def splice(_array: np.ndarray, _starts: np.ndarray, _ends: np.ndarray, _pieces: list) -> np.ndarray:
+    """
+    Replace the segments `[_starts[i], _ends[i])` of an array (given in ascending order) with `_pieces[i]`.
+    """
+
+    parts, last = list(), 0
+    for start, end, piece in zip(_starts, _ends, _pieces):
+        parts += [_array[last:start], piece]
+        last = end
+
+    parts.append(_array[last:])
+    return np.concatenate(parts)
+
+
+# Class StructureReport: Result of a structural analysis
+@dataclass
+class StructureReport:
+    """
+    Dulmage-Mendelsohn decomposition of the equality-constraints of a model:
+
+        - The over-determined part holds more equations than variables. Its equations can't all hold for generic
+          parameter values; `redundant` of them have to be removed (or turned into inequalities).
+        - The under-determined part holds more variables than equations. `dof` of its variables are left for the
+          optimizer (or have to be specified to get a square system).
+        - The well-determined (square) part is split into irreducible blocks that can be solved one after another;
+          blocks with more than one equation are algebraic loops.
+    """
+
+    equations     : int  = 0        # Equality-constraints analyzed
+    variables     : int  = 0        # Variables occurring in them
+    matched       : int  = 0        # Size of a maximum matching (structural rank)
+    overdetermined: list = field(default_factory=list)  # Equation names in the over-determined part
+    undetermined  : list = field(default_factory=list)  # Variables in the under-determined part
+    blocks        : list = field(default_factory=list)  # Equation names of each square block with a loop (> 1)
+    nodes         : dict = field(default_factory=dict)  # Node-UID -> (over-determined equations, undetermined vars)
+    unused        : list = field(default_factory=list)  # Declared variables that no equality refers to
+
+    @property
+    def redundant(self) -> int:     return self.equations - self.matched
+
+    @property
+    def dof(self) -> int:           return self.variables - self.matched
+
+    @property
+    def singular(self) -> bool:     return self.redundant > 0
+
+    def __str__(self):
+
+        text = (f"Structure: {self.equations} equation(s), {self.variables} variable(s), structural rank "
+                f"{self.matched}; {self.dof} degree(s) of freedom, {self.redundant} redundant equation(s), "
+                f"{len(self.blocks)} algebraic loop(s)")
+
+        if  self.overdetermined:
+            text += f"\nOver-determined: {', '.join(self.overdetermined[:20])}" + (" ..." if len(self.overdetermined) > 20 else "")
+
+        if  self.undetermined:
+            text += f"\nUndetermined: {', '.join(self.undetermined[:20])}" + (" ..." if len(self.undetermined) > 20 else "")
+
+        return text
+
+
+# Function reachable: Vertices reachable from a set of sources
+def reachable(_graph: sp.csr_matrix, _sources: np.ndarray) -> np.ndarray:
+    """
+    Return a boolean mask of the vertices reachable (along directed edges) from any of the sources, including them.
+    """
+
+    count = _graph.shape[0]
+    mask  = np.zeros(count, dtype=bool)
+    if  not len(_sources):
+        return mask
+
+    # Search from a virtual vertex connected to all sources:
+    root  = sp.csr_matrix((np.ones(len(_sources)), (np.zeros(len(_sources), dtype=np.int64), _sources)), shape=(1, count + 1))
+    graph = sp.vstack([sp.hstack([_graph, sp.csr_matrix((count, 1))]), root], format="csr")
+
+    order = breadth_first_order(graph, count, directed=True, return_predecessors=False)
+    mask[order[order < count]] = True
+    return mask
+
+
+# Function dulmage_mendelsohn: Dulmage-Mendelsohn decomposition of an incidence matrix
+def dulmage_mendelsohn(_incidence: sp.csr_matrix) -> tuple:
+    """
+    Decompose an incidence matrix (equations x variables).
+
+    Returns:
+        tuple: (match, over_rows, over_cols, under_rows, under_cols, labels), where `match` holds the matched column
+            of each row (-1 if unmatched), the masks mark the rows and columns of the over- and under-determined parts,
+            and `labels` holds the square block of each column (-1 outside the square part).
+    """
+
+    n_rows, n_cols = _incidence.shape
+    match = maximum_bipartite_matching(_incidence, perm_type="column") if n_rows and n_cols else np.full(n_rows, -1)
+    match = np.asarray(match, dtype=np.int64)
+
+    matched    = np.flatnonzero(match >= 0)
+    row_of_col = np.full(n_cols, -1, dtype=np.int64)
+    row_of_col[match[matched]] = matched
+
+    # Matching as sparse maps (column -> matched row, row -> matched column):
+    col_to_row = sp.csr_matrix((np.ones(len(matched)), (match[matched], matched)), shape=(n_cols, n_rows))
+    row_to_col = col_to_row.T.tocsr()
+
+    # Over-determined part: rows reachable from unmatched rows along alternating paths (any edge to a column, then
+    # the matching back to a row):
+    over_rows = reachable((_incidence @ col_to_row).tocsr(), np.flatnonzero(match < 0))
+    over_cols = np.zeros(n_cols, dtype=bool)
+    over_cols[_incidence[over_rows].indices] = True
+
+    # Under-determined part: columns reachable from unmatched columns (any edge to a row, then the matching back):
+    under_cols = reachable((_incidence.T @ row_to_col).tocsr(), np.flatnonzero(row_of_col < 0))
+    under_rows = np.zeros(n_rows, dtype=bool)
+    under_rows[row_of_col[under_cols & (row_of_col >= 0)]] = True
+
+    # Square part, split into strongly connected blocks of the column-graph (column -> matched row -> its columns):
+    square = ~(over_cols | under_cols)
+    labels = np.full(n_cols, -1, dtype=np.int64)
+    if  square.any():
+        index  = np.flatnonzero(square)
+        graph  = (col_to_row @ _incidence).tocsr()[index][:, index]
+        _, labels[index] = connected_components(graph, directed=True, connection="strong")
+
+    return match, over_rows, over_cols, under_rows, under_cols, labels
+
+
+# Function declared_variables: Variables of the model generated from a flow-graph
+def declared_variables(_graph: FlowGraph) -> list:
+    """
+    Return the symbols that `ModelBuilder` declares as variables, without building the script: connector-symbols whose
+    claiming handle (the one on the node with the lowest id, terminals excluded) has no value, the totals of connected
+    and labelled terminals without a value, and node-parameters without a value.
+    """
+
+    values = _graph.ent_float["value"].view
+    roles  = _graph.node_role.view
+    owner  = _graph.ent_node.view
+
+    # Connector-symbols:
+    cids   = np.flatnonzero(_graph.connector_mask())
+    origin = _graph.conn_origin.view[cids]
+    target = _graph.conn_target.view[cids]
+
+    o_node, t_node = owner[origin], owner[target]
+    o_ok  , t_ok   = roles[o_node] == FlowGraph.Role.NODE, roles[t_node] == FlowGraph.Role.NODE
+    claim  = np.where(o_ok & (~t_ok | (o_node < t_node)), origin, target)
+    free   = (o_ok | t_ok) & np.isnan(values[claim])
+
+    symbols = [_graph.conn_symbol[cid] for cid in cids[free]]
+
+    # Totals of terminals:
+    for nid in _graph.nodes(FlowGraph.Role.TERMINAL):
+        handles = _graph.handles(nid)
+        if  handles and _graph.ent_text["label"][handles[0]] and _graph.symbol_of(handles[0]) is not None \
+                    and np.isnan(values[handles[0]]):
+            symbols.append(f"TOTAL_{_graph.ent_text['label'][handles[0]]}")
+
+    # Node-parameters without a value:
+    params = np.flatnonzero(_graph.entity_mask() & (_graph.ent_kind.view == FlowGraph.Kind.PAR) & np.isnan(values))
+    for eid in params:
+        if  roles[owner[eid]] == FlowGraph.Role.NODE:
+            symbols.append(f"{_graph.node_uid[owner[eid]]}_{_graph.ent_text['symbol'][eid]}")
+
+    return list(dict.fromkeys(symbols))
+
+
+# Class StructureAnalyzer: Degrees-of-freedom and structural singularity analysis of a flow-graph
+class StructureAnalyzer:
+    """
+    Builds the incidence matrix of the equality-constraints of a `FlowGraph` (from the slots of `FlowGraph.compiled()`) and
+    runs a maximum matching and a Dulmage-Mendelsohn decomposition on it. The incidence of each node is cached against
+    the node's revision, the stacked matrix against the revisions of all nodes, and symbols keep their column across
+    runs, so re-analyzing after an edit only re-reads the edited nodes.
+
+    Equations are named as in the scripts generated by `ModelBuilder` (`equation_<node-uid>_<index>`).
+    """
+
+    # Initializer:
+    def __init__(self, _graph: FlowGraph):
+
+        self._graph   = _graph
+        self._cache   = dict()      # Node-id -> NodeIncidence
+        self._stack   = None        # Stacked incidences of the last analysis
+        self._compact = (None, None)    # (variables, their columns) of the last analysis
+        self.columns  = dict()      # Symbol -> column (grows, columns are never reassigned)
+        self.symbols  = list()      # Column -> symbol
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Name                      Description
+    # ------------------------------------------------------------------------------------------------------------------
+    # 1. incidence              Returns the (cached) incidence of a node's equalities.
+    # 2. stack                  Stacks the incidences of all nodes (cached until a node changes).
+    # 3. analyze                Decomposes the stacked incidence matrix.
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def column(self, _symbol: str) -> int:
+
+        column = self.columns.get(_symbol)
+        if  column is None:
+            column = self.columns[_symbol] = len(self.symbols)
+            self.symbols.append(_symbol)
+
+        return column
+
+    def incidence(self, _nid: int) -> NodeIncidence:
+        """
+        Return the incidence of a node's equalities (inequalities don't constrain the degrees of freedom), recomputing
+        it only if the node's revision has changed.
+        """
+
+        revision = int(self._graph.node_rev[_nid])
+        cached   = self._cache.get(_nid)
+        if  cached is not None and cached.revision == revision:
+            return cached
+
+        entry = NodeIncidence(revision)
+        rows, cols, indices = list(), list(), list()
+        for index, (template, names) in enumerate(self._graph.compiled(_nid)):
+
+            if  template.relation in ("<=", ">="):
+                continue
+
+            row = len(indices)
+            indices.append(index)
+            for symbol in set(names):
+                rows.append(row)
+                cols.append(self.column(symbol))
+
+        entry.indices = np.asarray(indices, dtype=np.int64)
+        entry.rows = np.asarray(rows, dtype=np.int64)
+        entry.cols = np.asarray(cols, dtype=np.int64)
+
+        self._cache[_nid] = entry
+        return entry
+
+    def stack(self) -> Stack:
+        """
+        Stack the incidences of all active nodes. If the nodes are the same as in the last stack, the segments of the
+        nodes whose revision has changed are spliced into it, instead of stacking all nodes again.
+        """
+
+        graph     = self._graph
+        nodes     = graph.nodes(FlowGraph.Role.NODE)
+        revisions = graph.node_rev.view[nodes]
+        stack     = self._stack
+
+        if  stack is not None and np.array_equal(stack.nodes, nodes):
+
+            changed = np.flatnonzero(stack.revisions != revisions)
+            if  not len(changed):
+                return stack
+
+            entries  = [self.incidence(int(nodes[position])) for position in changed]
+            row_ends = np.cumsum(stack.counts)
+            nnz_ends = np.cumsum(stack.sizes)
+            row_starts, nnz_starts = row_ends - stack.counts, nnz_ends - stack.sizes
+
+            stack.rows  = splice(stack.rows , nnz_starts[changed], nnz_ends[changed], [entry.rows    for entry in entries])
+            stack.cols  = splice(stack.cols , nnz_starts[changed], nnz_ends[changed], [entry.cols    for entry in entries])
+            stack.local = splice(stack.local, row_starts[changed], row_ends[changed], [entry.indices for entry in entries])
+
+            stack.counts[changed] = [len(entry.indices) for entry in entries]
+            stack.sizes [changed] = [len(entry.rows)    for entry in entries]
+            stack.revisions = revisions.copy()
+
+            # A node's UID can change with its revision (see `FlowGraph.update_node()`):
+            for position in changed:
+                stack.uids[position] = graph.node_uid[int(nodes[position])]
+
+            return stack
+
+        entries = [self.incidence(int(nid)) for nid in nodes]
+        empty   = np.empty(0, np.int64)
+
+        self._stack = Stack(nodes,
+                            revisions.copy(),
+                            np.fromiter((len(entry.indices) for entry in entries), np.int64, len(entries)),
+                            np.fromiter((len(entry.rows)    for entry in entries), np.int64, len(entries)),
+                            np.concatenate([entry.rows    for entry in entries] or [empty]),
+                            np.concatenate([entry.cols    for entry in entries] or [empty]),
+                            np.concatenate([entry.indices for entry in entries] or [empty]),
+                            [graph.node_uid[nid] for nid in nodes])
+
+        return self._stack
+
+    def analyze(self, _variables = None) -> StructureReport:
+        """
+        Analyze the structure of the graph's equalities.
+
+        Parameters:
+            _variables (Iterable[str] | None): The model's variables (e.g. the symbols of `ModelBuilder.entity_map` that
+                are not in `ModelBuilder.parameters`), or None to derive them from the graph (see
+                `declared_variables()`). All other symbols are treated as constants.
+
+        Returns:
+            StructureReport: The decomposition, per model and per node.
+        """
+
+        stack = self.stack()
+        uids, local, cols = stack.uids, stack.local, stack.cols
+        owner = np.repeat(np.arange(len(stack.nodes)), stack.counts)
+        rows  = stack.rows + np.repeat(np.cumsum(stack.counts) - stack.counts, stack.sizes)
+
+        # Columns of the variables (declared variables that occur in no equality are empty columns, i.e. free):
+        variables = list(_variables) if _variables is not None else declared_variables(self._graph)
+        if  variables != self._compact[0]:
+            indices = np.asarray([self.column(symbol) for symbol in variables], dtype=np.int64)
+            self._compact = (variables, indices)
+
+        # Symbols first seen after the mapping was computed are not variables:
+        compact = np.full(len(self.symbols), -1, dtype=np.int64)
+        compact[self._compact[1]] = np.arange(len(variables))
+
+        keep = compact[cols] >= 0
+        incidence = sp.csr_matrix((np.ones(np.count_nonzero(keep)), (rows[keep], compact[cols[keep]])),
+                                  shape=(len(owner), len(variables)))
+
+        match, over_rows, over_cols, under_rows, under_cols, labels = dulmage_mendelsohn(incidence)
+
+        # Equation names:
+        def names(_rows: np.ndarray) -> list:
+            return [f"equation_{uids[owner[row]]}_{local[row]}" for row in _rows]
+
+        report = StructureReport(len(owner), len(variables), int(np.count_nonzero(match >= 0)))
+        report.overdetermined = names(np.flatnonzero(over_rows))
+        report.undetermined   = [variables[col] for col in np.flatnonzero(under_cols)]
+        report.unused         = [variables[col] for col in np.flatnonzero(np.diff(incidence.tocsc().indptr) == 0)]
+
+        # Square blocks with more than one equation (algebraic loops):
+        square = labels >= 0
+        if  square.any():
+            sizes = np.bincount(labels[square])
+            for label in np.flatnonzero(sizes > 1):
+                report.blocks.append(names(np.flatnonzero(np.isin(match, np.flatnonzero(labels == label)))))
+
+        # Per node (variables are reported with every node whose equalities refer to them):
+        for row, name in zip(np.flatnonzero(over_rows), report.overdetermined):
+            report.nodes.setdefault(uids[owner[row]], (list(), set()))[0].append(name)
+
+        if  under_cols.any():
+            under = incidence[:, under_cols].tocsr()
+            found = np.flatnonzero(under_cols)
+            for row in np.flatnonzero(np.diff(under.indptr)):
+                symbols = {variables[found[col]] for col in under.indices[under.indptr[row]:under.indptr[row + 1]]}
+                report.nodes.setdefault(uids[owner[row]], (list(), set()))[1].update(symbols)
+
+        return report
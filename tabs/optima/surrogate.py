@@ -0,0 +1,476 @@
+import math
+import threading
+import itertools
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from scipy.linalg import cho_factor, cho_solve, lu_factor, lu_solve
+from scipy.optimize import minimize
+
+from tabs.optima.session import create_session
+from tabs.optima.uncertainty import Uncertain, SOLVED, run_uncertainty
+
+
+# Surrogate kinds (see `fit_surrogate()`):
+KINDS = ("pce", "rbf", "gp")
+
+# Relative tolerance of the domain-check (see `Surrogate.contains()`):
+TOLERANCE = 1e-9
+
+
+# Class Surrogate: Fast approximation of selected model outputs
+class Surrogate:
+    """
+    Approximation of selected outputs (objectives, connector flows) as functions of selected parameters, fitted to
+    solved samples. Inputs are scaled to [-1, 1] over the training domain, the bounding box of the samples; queries
+    outside of it are not answered reliably (see `contains()` and `WhatIf`).
+
+    Subclasses implement `_fit()` and `_predict()` on the scaled inputs of the parameters that vary across the
+    samples (constant parameters carry no information); `predict()` returns the approximation together with an error
+    estimate (one standard deviation) per output.
+    """
+
+    # Kind of the surrogate (see `KINDS`):
+    kind = None
+
+    # Initializer:
+    def __init__(self, _symbols: list[str], _columns: list[str]):
+
+        self.symbols = list(_symbols)   # Parameter-symbols (inputs)
+        self.columns = list(_columns)   # Output-symbols
+        self.samples = 0                # Number of training samples
+        self.lower   = np.zeros(len(self.symbols))
+        self.upper   = np.zeros(len(self.symbols))
+        self.rmse    = np.full(len(self.columns), np.nan)     # Leave-one-out error of each output
+
+        self._offset = np.zeros(len(self.symbols))
+        self._scale  = np.ones (len(self.symbols))
+        self._active = np.arange(len(self.symbols))
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Name                      Description
+    # ------------------------------------------------------------------------------------------------------------------
+    # 1. fit                    Fits the surrogate to samples.
+    # 2. contains               Whether points lie in the training domain.
+    # 3. predict                Approximates the outputs, with error estimates.
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def fit(self, _X: np.ndarray, _Y: np.ndarray) -> "Surrogate":
+        """
+        Fit the surrogate.
+
+        Parameters:
+            _X (np.ndarray): Parameter values (samples x parameters).
+            _Y (np.ndarray): Output values (samples x outputs); samples with NaN values are left out.
+
+        Returns:
+            Surrogate: self
+        """
+
+        X, Y  = np.asarray(_X, dtype=np.float64), np.asarray(_Y, dtype=np.float64)
+        valid = ~np.isnan(X).any(axis=1) & ~np.isnan(Y).any(axis=1)
+        X, Y  = X[valid], Y[valid]
+
+        # Repeated points would make interpolation systems singular, only the first one is kept:
+        _, first = np.unique(X, axis=0, return_index=True)
+        X, Y     = X[np.sort(first)], Y[np.sort(first)]
+        if  len(X) < 2:
+            raise ValueError("Too few solved samples to fit a surrogate")
+
+        self.samples = len(X)
+        self.lower   = X.min(axis=0)
+        self.upper   = X.max(axis=0)
+        span         = self.upper - self.lower
+        self._active = np.flatnonzero(span > 0.0)
+        self._scale  = 2.0 / span[self._active]
+        self._offset = (self.lower + self.upper)[self._active] / 2.0
+
+        self._fit(self.scaled(X), Y)
+        return self
+
+    def scaled(self, _X: np.ndarray) -> np.ndarray:
+        return (_X[..., self._active] - self._offset) * self._scale
+
+    def contains(self, _X) -> np.ndarray | bool:
+        """
+        Return whether points lie in the training domain (within a relative tolerance of its bounds).
+        """
+
+        X   = np.asarray(_X, dtype=np.float64)
+        tol = TOLERANCE * np.maximum(np.abs(self.lower), np.abs(self.upper)) + TOLERANCE
+        return ((X >= self.lower - tol) & (X <= self.upper + tol)).all(axis=-1)
+
+    def predict(self, _X) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Approximate the outputs.
+
+        Parameters:
+            _X (array-like): Parameter values of shape (parameters,) or (points, parameters).
+
+        Returns:
+            tuple: (values, errors), each of shape (outputs,) for a single point, otherwise (points, outputs).
+        """
+
+        X = np.asarray(_X, dtype=np.float64)
+        values, errors = self._predict(self.scaled(np.atleast_2d(X)))
+        return (values[0], errors[0]) if X.ndim == 1 else (values, errors)
+
+    def _fit(self, _Z: np.ndarray, _Y: np.ndarray):
+        raise NotImplementedError
+
+    def _predict(self, _Z: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        raise NotImplementedError
+
+
+# Function legendre: Legendre polynomials up to a degree
+def legendre(_Z: np.ndarray, _degree: int) -> np.ndarray:
+    """
+    Evaluate the Legendre polynomials P_0, ..., P_degree, normalized to unit variance on [-1, 1].
+
+    Returns:
+        np.ndarray: Shape (*_Z.shape, degree + 1).
+    """
+
+    P = np.empty((*_Z.shape, _degree + 1))
+    P[..., 0] = 1.0
+    if  _degree > 0:
+        P[..., 1] = _Z
+
+    for k in range(1, _degree):
+        P[..., k + 1] = ((2 * k + 1) * _Z * P[..., k] - k * P[..., k - 1]) / (k + 1)
+
+    return P * np.sqrt(2 * np.arange(_degree + 1) + 1)
+
+
+# Class PolynomialChaos: Polynomial-chaos expansion
+class PolynomialChaos(Surrogate):
+    """
+    Expansion in products of Legendre polynomials (orthonormal for uniformly distributed inputs) of total degree up to
+    `degree`, fitted by least squares. The degree is lowered until there are at least twice as many samples as terms.
+    The error estimate is the leave-one-out RMSE of each output, computed in closed form from the hat-matrix.
+    """
+
+    kind = "pce"
+
+    # Initializer:
+    def __init__(self, _symbols: list[str], _columns: list[str], _degree: int = 3):
+
+        super().__init__(_symbols, _columns)
+
+        self.degree = _degree
+        self.terms  = np.zeros((1, 0), dtype=np.int64)  # Multi-index of each term (over the varying parameters)
+        self.coef   = np.zeros((1, len(self.columns)))
+
+    def basis(self, _Z: np.ndarray) -> np.ndarray:
+
+        P = legendre(_Z, self.degree)
+        return P[:, np.arange(_Z.shape[1]), self.terms].prod(axis=2)
+
+    def _fit(self, _Z: np.ndarray, _Y: np.ndarray):
+
+        d = _Z.shape[1]
+        while self.degree > 0 and math.comb(d + self.degree, d) * 2 > len(_Z):
+            self.degree -= 1
+
+        # Multi-indices of total degree up to `degree`, as counts of the parameters in each product:
+        self.terms = np.array([
+            np.bincount(np.asarray(product, dtype=np.int64), minlength=d)
+            for total in range(self.degree + 1)
+            for product in itertools.combinations_with_replacement(range(d), total)
+        ], dtype=np.int64).reshape(-1, d)
+
+        Phi       = self.basis(_Z)
+        Q, R      = np.linalg.qr(Phi)
+        self.coef = np.linalg.lstsq(R, Q.T @ _Y, rcond=None)[0]
+
+        # Leave-one-out residuals are r_i / (1 - h_ii), with the leverages h_ii = |Q_i|^2:
+        leverage  = np.minimum(np.square(Q).sum(axis=1), 1.0 - 1e-12)
+        loo       = (_Y - Phi @ self.coef) / (1.0 - leverage)[:, None]
+        self.rmse = np.sqrt(np.mean(np.square(loo), axis=0))
+
+    def _predict(self, _Z: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        return self.basis(_Z) @ self.coef, np.broadcast_to(self.rmse, (len(_Z), len(self.columns)))
+
+
+# Class RadialBasis: Radial-basis-function interpolant
+class RadialBasis(Surrogate):
+    """
+    Interpolant with a cubic kernel |r|^3 and a linear polynomial tail, optionally smoothed. The error estimate is
+    the leave-one-out RMSE of each output, from Rippa's closed form e_i = c_i / (A^-1)_ii.
+    """
+
+    kind = "rbf"
+
+    # Initializer:
+    def __init__(self, _symbols: list[str], _columns: list[str], _smoothing: float = 0.0):
+
+        super().__init__(_symbols, _columns)
+
+        self.smoothing = _smoothing
+        self.centers   = np.zeros((0, 0))
+        self.weights   = np.zeros((0, len(self.columns)))
+        self.tail      = np.zeros((1, len(self.columns)))
+
+    def kernel(self, _Z: np.ndarray) -> np.ndarray:
+
+        distance = np.sqrt(np.maximum(
+            np.square(_Z).sum(axis=1)[:, None] + np.square(self.centers).sum(axis=1) - 2.0 * _Z @ self.centers.T,
+            0.0
+        ))
+        return distance ** 3
+
+    def _fit(self, _Z: np.ndarray, _Y: np.ndarray):
+
+        n, d = _Z.shape
+        self.centers = _Z
+
+        # Saddle-point system [[K + s I, P], [P^T, 0]] [w; a] = [Y; 0]:
+        A = np.zeros((n + d + 1, n + d + 1))
+        A[:n, :n] = self.kernel(_Z) + self.smoothing * np.eye(n)
+        A[:n, n]  = A[n, :n] = 1.0
+        A[:n, n + 1:] = _Z
+        A[n + 1:, :n] = _Z.T
+
+        factor       = lu_factor(A)
+        solution     = lu_solve(factor, np.vstack((_Y, np.zeros((d + 1, _Y.shape[1])))))
+        inverse      = lu_solve(factor, np.eye(n + d + 1))
+        self.weights = solution[:n]
+        self.tail    = solution[n:]
+
+        loo       = self.weights / np.diag(inverse)[:n, None]
+        self.rmse = np.sqrt(np.mean(np.square(loo), axis=0))
+
+    def _predict(self, _Z: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+
+        values = self.kernel(_Z) @ self.weights + self.tail[0] + _Z @ self.tail[1:]
+        return values, np.broadcast_to(self.rmse, values.shape)
+
+
+# Class GaussianProcess: Gaussian-process regression
+class GaussianProcess(Surrogate):
+    """
+    Gaussian process with a squared-exponential kernel with one length-scale per parameter, an amplitude and a noise
+    level shared by all (standardized) outputs, chosen by maximizing the marginal likelihood. The error estimate is
+    the pointwise posterior standard deviation, so it grows away from the training samples. Fitting costs O(n^3)
+    and each prediction O(n^2) in the number of samples n, so the process suits up to a few thousand samples.
+    """
+
+    kind = "gp"
+
+    # Initializer:
+    def __init__(self, _symbols: list[str], _columns: list[str]):
+
+        super().__init__(_symbols, _columns)
+
+        self.centers   = np.zeros((0, 0))
+        self.lengths   = np.ones(0)
+        self.amplitude = 1.0
+        self.noise     = 1e-6
+
+        self._mean     = np.zeros(len(self.columns))
+        self._std      = np.ones (len(self.columns))
+        self._alpha    = np.zeros((0, len(self.columns)))
+        self._inverse  = np.zeros((0, 0))
+
+    def kernel(self, _A: np.ndarray, _B: np.ndarray, _lengths: np.ndarray, _amplitude: float) -> np.ndarray:
+
+        A, B = _A / _lengths, _B / _lengths
+        d2   = np.square(A).sum(axis=1)[:, None] + np.square(B).sum(axis=1) - 2.0 * A @ B.T
+        return _amplitude * np.exp(-0.5 * np.maximum(d2, 0.0))
+
+    def _fit(self, _Z: np.ndarray, _Y: np.ndarray):
+
+        n, d = _Z.shape
+        self.centers = _Z
+        self._mean   = _Y.mean(axis=0)
+        self._std    = np.where(_Y.std(axis=0) > 0.0, _Y.std(axis=0), 1.0)
+        Y            = (_Y - self._mean) / self._std
+
+        # Negative log marginal likelihood, summed over the outputs, of log-hyperparameters (lengths, amplitude, noise):
+        def objective(theta):
+
+            K = self.kernel(_Z, _Z, np.exp(theta[:d]), np.exp(theta[d])) + (np.exp(theta[d + 1]) + 1e-10) * np.eye(n)
+            try:                                factor = cho_factor(K, lower=True)
+            except np.linalg.LinAlgError:       return 1e25
+
+            alpha = cho_solve(factor, Y)
+            return 0.5 * np.sum(Y * alpha) + Y.shape[1] * np.log(np.diag(factor[0])).sum()
+
+        start  = np.concatenate((np.zeros(d), [0.0, np.log(1e-4)]))
+        bounds = [(np.log(1e-2), np.log(1e2))] * d + [(np.log(1e-2), np.log(1e2)), (np.log(1e-10), np.log(1.0))]
+        theta  = minimize(objective, start, method="L-BFGS-B", bounds=bounds).x
+
+        self.lengths   = np.exp(theta[:d])
+        self.amplitude = float(np.exp(theta[d]))
+        self.noise     = float(np.exp(theta[d + 1]))
+
+        K = self.kernel(_Z, _Z, self.lengths, self.amplitude) + (self.noise + 1e-10) * np.eye(n)
+        factor        = cho_factor(K, lower=True)
+        self._alpha   = cho_solve(factor, Y)
+        self._inverse = cho_solve(factor, np.eye(n))
+
+        # Leave-one-out residuals are alpha_i / (K^-1)_ii (reported for comparison with the other kinds):
+        loo       = self._alpha / np.diag(self._inverse)[:, None] * self._std
+        self.rmse = np.sqrt(np.mean(np.square(loo), axis=0))
+
+    def _predict(self, _Z: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+
+        k        = self.kernel(_Z, self.centers, self.lengths, self.amplitude)
+        variance = np.maximum(self.amplitude - ((k @ self._inverse) * k).sum(axis=1), 0.0)
+        return (k @ self._alpha) * self._std + self._mean, np.sqrt(variance)[:, None] * self._std
+
+
+# Function fit_surrogate: Fits a surrogate to solved samples
+def fit_surrogate(_kind: str,
+                  _samples,
+                  _symbols: list[str] | None = None,
+                  _columns: list[str] | None = None,
+                  **kwargs) -> Surrogate:
+    """
+    Fit a surrogate to the solved samples of an uncertainty run or sensitivity study (see `Ensemble` and `Study`).
+
+    Parameters:
+        _kind (str): One of `KINDS`.
+        _samples (Ensemble | Study): The samples and results.
+        _symbols (list[str] | None): Parameters to use as inputs (default: all sampled parameters).
+        _columns (list[str] | None): Outputs to approximate (default: all columns).
+        **kwargs: Forwarded to the surrogate (e.g. `_degree` for "pce", `_smoothing` for "rbf").
+
+    Returns:
+        Surrogate: The fitted surrogate.
+    """
+
+    classes = {"pce": PolynomialChaos, "rbf": RadialBasis, "gp": GaussianProcess}
+    if  _kind not in classes:
+        raise ValueError(f"Unknown surrogate '{_kind}'")
+
+    symbols = list(_symbols or _samples.symbols)
+    columns = list(_columns or _samples.columns)
+    solved  = np.asarray(_samples.status) == SOLVED
+
+    X = np.asarray(_samples.samples)[solved][:, [_samples.symbols.index(symbol) for symbol in symbols]]
+    Y = np.stack([np.asarray(_samples.column(column))[solved] for column in columns], axis=1)
+    return classes[_kind](symbols, columns, **kwargs).fit(X, Y)
+
+
+# Function train_surrogate: Fits a surrogate to a batch of solves
+def train_surrogate(_kind: str,
+                    _script: str,
+                    _parameters: dict,
+                    _uncertain: list[Uncertain],
+                    _symbols: list[str],
+                    _count: int,
+                    _options: dict | None = None,
+                    **kwargs) -> Surrogate:
+    """
+    Solve a Latin hypercube of uniformly distributed samples, mean +/- sqrt(3) sigma of each uncertain parameter (see
+    `run_uncertainty()`), and fit a surrogate of the objectives and `_symbols` to the results.
+
+    Parameters:
+        _kind (str): One of `KINDS`.
+        _options (dict | None): Forwarded to the surrogate (see `fit_surrogate()`).
+        **kwargs: Forwarded to `run_uncertainty()` (e.g. `_backend`, `_workers`, `_timeout`).
+    """
+
+    ensemble = run_uncertainty(_script, _parameters, _uncertain, _symbols, _count,
+                               _distribution="uniform", _latin=True, **kwargs)
+    return fit_surrogate(_kind, ensemble, **(_options or dict()))
+
+
+# Class Prediction: Answer to a what-if query
+@dataclass
+class Prediction:
+    values: np.ndarray      # Output values, in the surrogate's column-order
+    errors: np.ndarray      # Error estimates (zero for solves)
+    solved: bool = False    # Whether the answer comes from a solve (query outside the trained domain)
+
+
+# Class WhatIf: What-if queries answered by a surrogate or a solve
+class WhatIf:
+    """
+    Answers what-if queries (parameter overrides) from a surrogate while they lie in its training domain and only
+    override its input parameters; other queries are solved on a warm session of the model, created on first use.
+    """
+
+    # Initializer:
+    def __init__(self,
+                 _surrogate: Surrogate,
+                 _script: str,
+                 _parameters: dict,
+                 _backend: str = "ampl",
+                 _solver: str = "ipopt",
+                 _initial: dict | None = None,
+                 _timeout: float | None = None):
+
+        self.surrogate  = _surrogate
+        self.script     = _script
+        self.parameters = dict(_parameters)
+        self.backend    = _backend
+        self.solver     = _solver
+        self.timeout    = _timeout
+
+        self._inputs  = frozenset(_surrogate.symbols)
+        self._base    = np.array([_parameters[symbol] for symbol in _surrogate.symbols], dtype=np.float64)
+        self._index   = {symbol: column for column, symbol in enumerate(_surrogate.symbols)}
+        self._session = None
+        self._last    = dict(_initial or dict())
+
+    def query(self, _overrides: dict) -> Prediction:
+        """
+        Answer a query.
+
+        Parameters:
+            _overrides (dict): Parameter-symbol -> value; other parameters keep their base value.
+
+        Returns:
+            Prediction: The outputs and their error estimates.
+        """
+
+        if  self._inputs.issuperset(_overrides):
+
+            x = self._base.copy()
+            for symbol, value in _overrides.items():
+                x[self._index[symbol]] = value
+
+            if  self.surrogate.contains(x):
+                return Prediction(*self.surrogate.predict(x))
+
+        return self.solve(_overrides)
+
+    def solve(self, _overrides: dict) -> Prediction:
+        """
+        Solve the model for a query (see `query()`); outputs are NaN if the solve fails.
+        """
+
+        columns = self.surrogate.columns
+        failed  = Prediction(np.full(len(columns), np.nan), np.full(len(columns), np.nan), True)
+
+        if  self._session is None:
+            self._session = create_session(self.backend, self.solver, self.timeout)
+
+        # The script is fixed for the object's lifetime, so its id serves as the structure-signature:
+        if  self._session.load(self.script, id(self.script), self.parameters | _overrides) is None:
+            return failed
+
+        timer = threading.Timer(self.timeout, self._session.interrupt) if self.timeout else None
+        if timer:   timer.start()
+
+        try:        result = self._session.solve(self._last)
+        finally:
+            if timer:   timer.cancel()
+
+        if  result is None:
+            return failed
+
+        self._last.update(result.var_dict)
+
+        values = result.obj_dict | result.var_dict | result.par_dict
+        return Prediction(np.array([values.get(column, np.nan) for column in columns]), np.zeros(len(columns)), True)
+
+    def shutdown(self):
+
+        if  self._session is not None:
+            self._session.shutdown()
+            self._session = None
@@ -0,0 +1,394 @@
+import os
+import math
+import tempfile
+import multiprocessing
+
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass
+
+import numpy as np
+
+from scipy.special import ndtri
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from tabs.optima import scenario
+from tabs.optima.scenario import objectives
+from tabs.schema.flowgraph import FlowGraph
+
+
+# Sampling distributions:
+DISTRIBUTIONS = ("normal", "lognormal", "uniform")
+
+# Percentiles reported by `Statistics`:
+PERCENTILES = (5.0, 50.0, 95.0)
+
+# Sample-status codes (see `Ensemble.status`):
+PENDING, SOLVED, FAILED = 0, 1, 2
+
+
+# Class Uncertain: Parameter with an uncertainty
+@dataclass
+class Uncertain:
+    symbol: str
+    mean  : float
+    sigma : float
+
+
+# Function uncertain_parameters: Parameters of a model with a sigma
+def uncertain_parameters(_graph: FlowGraph, _parameters: dict, _entity_map: dict) -> list[Uncertain]:
+    """
+    Collect the parameters of a generated model whose entity has a positive, finite sigma.
+
+    Parameters:
+        _graph (FlowGraph): The canvas' flow-graph.
+        _parameters (dict): Parameter-symbol -> value (see `ModelBuilder.parameters`).
+        _entity_map (dict): Symbol -> entity-id (see `ModelBuilder.entity_map`).
+
+    Returns:
+        list[Uncertain]: The uncertain parameters, in declaration order.
+    """
+
+    sigma = _graph.ent_float["sigma"].view
+    return [
+        Uncertain(symbol, value, float(sigma[_entity_map[symbol]]))
+        for symbol, value in _parameters.items()
+        if  math.isfinite(sigma[_entity_map[symbol]]) and sigma[_entity_map[symbol]] > 0.0
+    ]
+
+
+# Function sample: Draws parameter samples
+def sample(_uncertain: list[Uncertain],
+           _count: int,
+           _distribution: str = "normal",
+           _latin: bool = False,
+           _seed: int | None = None,
+           _out: np.ndarray | None = None) -> np.ndarray:
+    """
+    Draw samples of the uncertain parameters. Uniform variates are drawn for all parameters at once (stratified per
+    column if `_latin` is set) and mapped through the inverse CDF of the distribution, parametrized so that each
+    parameter keeps its mean and standard deviation:
+
+        normal:     mean + sigma * z
+        lognormal:  exp(mu + s * z), with s^2 = log(1 + sigma^2 / mean^2) and mu = log(mean) - s^2 / 2
+        uniform:    mean + sigma * sqrt(3) * (2u - 1)
+
+    Parameters:
+        _uncertain (list[Uncertain]): The parameters.
+        _count (int): Number of samples.
+        _distribution (str): One of `DISTRIBUTIONS`.
+        _latin (bool): Latin hypercube sampling.
+        _seed (int | None): Seed of the random generator.
+        _out (np.ndarray | None): Array (count x parameters) to write the samples to, e.g. a memory-map.
+
+    Returns:
+        np.ndarray: Samples, one row per sample and one column per parameter.
+    """
+
+    if  _distribution not in DISTRIBUTIONS:
+        raise ValueError(f"Unknown distribution '{_distribution}'")
+
+    rng   = np.random.default_rng(_seed)
+    shape = (_count, len(_uncertain))
+
+    # Uniform variates in (0, 1), one stratum per sample and column for Latin hypercubes:
+    u = rng.random(shape)
+    if  _latin:
+        strata = rng.permuted(np.broadcast_to(np.arange(_count)[:, None], shape), axis=0)
+        u      = (strata + u) / _count
+
+    return transform(_uncertain, u, _distribution, _out)
+
+
+# Function transform: Maps uniform variates to parameter values
+def transform(_uncertain: list[Uncertain],
+              _u: np.ndarray,
+              _distribution: str = "normal",
+              _out: np.ndarray | None = None) -> np.ndarray:
+    """
+    Map uniform variates in (0, 1) (one column per parameter) through the inverse CDF of the distribution (see
+    `sample()`), e.g. to turn a design in the unit hypercube into parameter values.
+    """
+
+    if  _distribution not in DISTRIBUTIONS:
+        raise ValueError(f"Unknown distribution '{_distribution}'")
+
+    mean  = np.array([item.mean  for item in _uncertain], dtype=np.float64)
+    sigma = np.array([item.sigma for item in _uncertain], dtype=np.float64)
+    u     = _u
+    out   = np.empty(np.shape(u)) if _out is None else _out
+
+    if  _distribution == "normal":
+        out[:] = mean + sigma * ndtri(u)
+
+    elif _distribution == "lognormal":
+
+        if  np.any(mean <= 0.0):
+            raise ValueError("Lognormal samples require positive parameter values")
+
+        s2     = np.log1p((sigma / mean) ** 2)
+        out[:] = np.exp(np.log(mean) - s2 / 2 + np.sqrt(s2) * ndtri(u))
+
+    else:
+        out[:] = mean + sigma * math.sqrt(3.0) * (2.0 * u - 1.0)
+
+    return out
+
+
+# Class Statistics: Running summary of sample results
+class Statistics:
+    """
+    Summary statistics of the solved samples, one entry per column. Means and standard deviations are accumulated
+    batch by batch; percentiles are recomputed from the (memory-mapped) results on request.
+    """
+
+    # Initializer:
+    def __init__(self, _columns: list[str]):
+
+        self.columns = list(_columns)
+        self.count   = np.zeros(len(self.columns), dtype=np.int64)
+        self._sum    = np.zeros(len(self.columns))
+        self._sumsq  = np.zeros(len(self.columns))
+        self.percentiles = {q: np.full(len(self.columns), np.nan) for q in PERCENTILES}
+
+    def update(self, _values: np.ndarray):
+        """
+        Add a batch of results (rows of NaN for failed samples are ignored).
+        """
+
+        valid  = ~np.isnan(_values)
+        values = np.where(valid, _values, 0.0)
+        self.count  += valid.sum(axis=0)
+        self._sum   += values.sum(axis=0)
+        self._sumsq += np.square(values).sum(axis=0)
+
+    def refresh(self, _values: np.ndarray):
+        """
+        Recompute the percentiles from all results so far (unsolved rows must be NaN).
+        """
+
+        if  self.count.any():
+            with np.errstate(all="ignore"):
+                for q in PERCENTILES:
+                    self.percentiles[q] = np.nanpercentile(_values, q, axis=0)
+
+    @property
+    def mean(self) -> np.ndarray:
+
+        with np.errstate(all="ignore"):
+            return self._sum / self.count
+
+    @property
+    def std(self) -> np.ndarray:
+
+        with np.errstate(all="ignore"):
+            variance = (self._sumsq - self._sum ** 2 / self.count) / (self.count - 1)
+            return np.sqrt(np.maximum(variance, 0.0))
+
+
+# Class Ensemble: Samples and results of an uncertainty run
+class Ensemble:
+    """
+    Inputs and outputs of an uncertainty run, stored as .npy memory-maps in `directory`, so that large runs are not
+    held in memory: `samples` (count x parameters), `values` (count x columns) and `status` (count).
+    """
+
+    # Initializer:
+    def __init__(self, _directory: str, _symbols: list[str], _columns: list[str], _count: int):
+
+        self.directory  = _directory
+        self.symbols    = list(_symbols)     # Parameter-symbols (columns of `samples`)
+        self.columns    = list(_columns)     # Objective- and variable-symbols (columns of `values`)
+        self.statistics = Statistics(self.columns)
+
+        mmap = np.lib.format.open_memmap
+        self.samples = mmap(os.path.join(_directory, "samples.npy"), "w+", np.float64, (_count, len(self.symbols)))
+        self.values  = mmap(os.path.join(_directory, "values.npy") , "w+", np.float64, (_count, len(self.columns)))
+        self.status  = mmap(os.path.join(_directory, "status.npy") , "w+", np.int8   , (_count,))
+        self.values[:] = np.nan
+
+    def __len__(self):  return len(self.status)
+
+    def column(self, _symbol: str) -> np.ndarray:
+        return self.values[:, self.columns.index(_symbol)]
+
+    def flush(self):
+
+        for array in (self.samples, self.values, self.status):
+            array.flush()
+
+
+def _solve_batch(_start: int,
+                 _samples: np.ndarray,
+                 _symbols: list[str],
+                 _base: dict,
+                 _columns: list[str],
+                 _timeout: float | None):
+    """
+    Solve a batch of samples in a worker-process, with the warm session of the scenario-runner (see scenario.py).
+
+    Returns:
+        tuple: (first row, results of the batch with NaN-rows for failed samples)
+    """
+
+    values = np.full((len(_samples), len(_columns)), np.nan)
+    for row, sampled in enumerate(_samples):
+
+        overrides = dict(zip(_symbols, sampled.tolist()))
+        result    = scenario._solve_scenario(row, _base | overrides, _columns, _timeout)[3]
+        if  result is not None:
+            values[row] = result
+
+    return _start, values
+
+
+# Function run_uncertainty: Propagates parameter uncertainty by Monte Carlo sampling
+def run_uncertainty(_script: str,
+                    _parameters: dict,
+                    _uncertain: list[Uncertain],
+                    _symbols: list[str],
+                    _count: int,
+                    _directory: str | None = None,
+                    _distribution: str = "normal",
+                    _latin: bool = False,
+                    _seed: int | None = None,
+                    _batch: int = 64,
+                    _workers: int | None = None,
+                    _timeout: float | None = None,
+                    _backend: str = "ampl",
+                    _solver: str = "ipopt",
+                    _initial: dict | None = None,
+                    _progress = None,
+                    _cancelled = None) -> Ensemble:
+    """
+    Sample the uncertain parameters and solve the model for each sample across a pool of worker-processes. Samples
+    are sent in batches, and each process keeps its session warm across batches. Results are written to a memory-
+    mapped `Ensemble` as batches complete, and the running statistics are passed to `_progress`.
+
+    Parameters:
+        _script (str): The AMPL script (see `ModelBuilder.build()`).
+        _parameters (dict): Base parameter values (see `ModelBuilder.parameters`).
+        _uncertain (list[Uncertain]): The uncertain parameters (see `uncertain_parameters()`).
+        _symbols (list[str]): Symbols to collect (in addition to the objectives), e.g. connector-symbols.
+        _count (int): Number of samples.
+        _directory (str | None): Directory of the ensemble's files (default: a new temporary directory).
+        _distribution (str): One of `DISTRIBUTIONS`.
+        _latin (bool): Latin hypercube sampling.
+        _seed (int | None): Seed of the random generator.
+        _batch (int): Samples per task.
+        _workers (int | None): Number of worker-processes (default: CPU count).
+        _timeout (float | None): Per-sample wall-clock limit in seconds.
+        _backend (str): "ampl", "linear" or "stub" (see `create_session()`).
+        _solver (str): Solver passed to AMPL.
+        _initial (dict | None): Variable-symbol -> initial value, seeds the first sample of each process.
+        _progress (callable): Called with (completed, total, statistics) after each batch.
+        _cancelled (callable): Returns True if the run should stop; pending batches are then skipped.
+
+    Returns:
+        Ensemble: Samples, results and statistics.
+    """
+
+    directory = _directory or tempfile.mkdtemp(prefix="climact-mc-")
+    columns   = objectives(_script) + list(_symbols)
+    symbols   = [item.symbol for item in _uncertain]
+    ensemble  = Ensemble(directory, symbols, columns, _count)
+
+    sample(_uncertain, _count, _distribution, _latin, _seed, _out=ensemble.samples)
+
+    with ProcessPoolExecutor(max_workers=_workers,
+                             mp_context=multiprocessing.get_context("spawn"),
+                             initializer=scenario._init_worker,
+                             initargs=(_backend, _solver, _script, _initial or dict(), _timeout)) as executor:
+
+        pending = {
+            executor.submit(_solve_batch,
+                            start,
+                            np.array(ensemble.samples[start:start + _batch]),
+                            symbols,
+                            _parameters,
+                            columns,
+                            _timeout)
+            for start in range(0, _count, _batch)
+        }
+
+        # Percentiles are recomputed from the whole ensemble, so only about every 5% of the samples:
+        completed = 0
+        refresh   = 0
+        while pending:
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+
+                start, values = future.result()
+                stop = start + len(values)
+
+                ensemble.values[start:stop] = values
+                ensemble.status[start:stop] = np.where(np.isnan(values).all(axis=1), FAILED, SOLVED)
+                ensemble.statistics.update(values)
+                completed += len(values)
+
+            if  completed >= refresh or not pending:
+                ensemble.statistics.refresh(ensemble.values)
+                refresh = completed + max(_batch, _count // 20)
+
+            if _progress:   _progress(completed, _count, ensemble.statistics)
+            if _cancelled and _cancelled():
+                executor.shutdown(wait=False, cancel_futures=True)
+                break
+
+    ensemble.flush()
+    return ensemble
+
+
+class UncertaintyThread(QThread):
+
+    # Signals:
+    progress_made  = pyqtSignal(int, int, object)   # Completed, total, Statistics
+    result_ready   = pyqtSignal(object)             # Ensemble
+    error_occurred = pyqtSignal(str)
+
+    # Initializer:
+    def __init__(self,
+                 _script: str,
+                 _parameters: dict,
+                 _uncertain: list[Uncertain],
+                 _symbols: list[str],
+                 _count: int,
+                 **kwargs):
+        """
+        Initializes the UncertaintyThread class.
+
+        Args:
+            _script (str): The AMPL script.
+            _parameters (dict): Base parameter values.
+            _uncertain (list[Uncertain]): The uncertain parameters.
+            _symbols (list[str]): Symbols to collect.
+            _count (int): Number of samples.
+            **kwargs: Forwarded to `run_uncertainty()`.
+        """
+        super().__init__()
+
+        self.script     = _script
+        self.parameters = dict(_parameters)
+        self.uncertain  = list(_uncertain)
+        self.symbols    = list(_symbols)
+        self.count      = _count
+        self.kwargs     = kwargs
+        self.cancelled  = False
+        self.ensemble   = None
+
+    def run(self):
+
+        try:
+            self.ensemble = run_uncertainty(self.script,
+                                            self.parameters,
+                                            self.uncertain,
+                                            self.symbols,
+                                            self.count,
+                                            _progress=self.progress_made.emit,
+                                            _cancelled=lambda: self.cancelled,
+                                            **self.kwargs)
+            self.result_ready.emit(self.ensemble)
+
+        except Exception as exception:  self.error_occurred.emit(str(exception))
+
+    def cancel(self):   self.cancelled = True
@@ -0,0 +1,70 @@
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from tabs.optima.session import AMPLSession
+
+
+class SolveThread(QThread):
+
+    # Signals:
+    output_ready   = pyqtSignal(str)        # Emitted for each line of solver output
+    result_ready   = pyqtSignal(object)     # Emitted with the `Solution` (or None) when the solve finishes
+    error_occurred = pyqtSignal(str)
+
+    # Initializer:
+    def __init__(self,
+                 _session: AMPLSession,
+                 _script: str,
+                 _signature = None,
+                 _values: dict | None = None,
+                 _initial: dict | None = None):
+        """
+        Initializes the SolveThread class.
+
+        Args:
+            _session (AMPLSession): The canvas' warm AMPL session (see session.py).
+            _script (str): The AMPL script.
+            _signature (hashable): Structure of the script, or None if unknown (see `AMPLSession.load()`).
+            _values (dict | None): Parameter-symbol -> value.
+            _initial (dict | None): Variable-symbol -> initial value (warm-start).
+        """
+        super().__init__()
+
+        self.session   = _session
+        self.script    = _script
+        self.signature = _signature
+        self.values    = _values
+        self.initial   = _initial
+        self.cancelled = False
+
+    def run(self):
+        """
+        Load the script into the session and solve it, streaming the solver's output.
+
+        Parameters: None
+        Returns: None
+        """
+
+        self.session.listener = self.output_ready.emit
+        try:
+            loaded = self.session.load(self.script, self.signature, self.values)
+            if  loaded:
+                self.output_ready.emit("Model unchanged, parameter values updated in place.\n")
+
+            # Solves cancelled while the script was loading are skipped:
+            result = self.session.solve(self.initial) if loaded is not None and not self.cancelled else None
+
+            # Results of cancelled solves are discarded:
+            self.result_ready.emit(None if self.cancelled else result)
+
+        except Exception as exception:  self.error_occurred.emit(str(exception))
+
+        finally:
+            self.session.listener = None
+
+    def cancel(self):
+        """
+        Interrupt the solve. Called from the GUI-thread.
+        """
+
+        self.cancelled = True
+        self.session.interrupt()
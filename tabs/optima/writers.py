@@ -0,0 +1,418 @@
+import os
+import math
+
+from tabs.optima.expression import NonlinearError, fold, linearize
+from tabs.optima.linear import LinearModel
+from tabs.optima.model import dat
+from tabs.optima.script import PARAM_STMT, ScriptModel, statements
+from tabs.schema.equation import ParseError, symbols
+
+
+# Opcodes of the .nl-format (see "Writing .nl Files", D. M. Gay):
+NL_BINARY = {"add": 0, "sub": 1, "mul": 2, "div": 3, "pow": 5}
+NL_UNARY  = {"abs": 15, "tan": 38, "sqrt": 39, "sin": 41, "log10": 42, "log": 43, "exp": 44, "cos": 46}
+NL_LIST   = {"min": 11, "max": 12}
+NL_NEG    = 16
+
+# Codes of the constraint-bounds segment, for rows in the form `body (relation) value`:
+NL_RELATIONS = {"<=": 1, ">=": 2, "=": 4}
+
+# Terms per line of LP-files (keeps lines well below the format's length limit):
+LP_TERMS  = 8
+
+
+# Function num: Formats a float for a model-file
+def num(_value: float) -> str:
+    return repr(float(_value))
+
+
+# Function variable_bounds: Evaluates the bounds of every variable
+def variable_bounds(_model: ScriptModel, _parameters: dict) -> dict:
+    """
+    Return variable-symbol -> (lower, upper) for every variable, with infinite values where unbounded.
+    """
+
+    bounds = {symbol: (-math.inf, math.inf) for symbol in _model.variables}
+    for symbol, (lower, upper) in _model.bounds.items():
+        bounds[symbol] = (
+            -math.inf if lower is None else linearize(lower, _parameters)[1],
+            +math.inf if upper is None else linearize(upper, _parameters)[1]
+        )
+
+    return bounds
+
+
+# Function lp_terms: Renders linear terms for an LP-file, wrapped across lines
+def lp_terms(_coefs: dict) -> str:
+
+    items = [f"{'-' if value < 0 else '+'} {num(abs(value))} {symbol}" for symbol, value in _coefs.items()]
+    lines = [" ".join(items[start:start + LP_TERMS]) for start in range(0, len(items), LP_TERMS)]
+    return "\n   ".join(lines)
+
+
+# Function write_lp: Writes a linear model in CPLEX-LP format
+def write_lp(_script: str, _path: str, _values: dict | None = None) -> str:
+    """
+    Write a linear script as a CPLEX-LP file, one row at a time. Parameters are replaced by their values and the
+    first objective is written (its constant as an objective offset).
+
+    Parameters:
+        _script (str): The AMPL script (see `ModelBuilder.build()`).
+        _path (str): Output file.
+        _values (dict | None): Parameter-symbol -> value (default: the script's defaults).
+
+    Returns:
+        str: The path written to.
+
+    Raises:
+        ParseError, NonlinearError: If the script is not linear.
+    """
+
+    model      = LinearModel(_script)
+    parameters = model.parameters(_values)
+    placeholder= {model.variables[0]: 0.0} if model.variables else {}
+
+    with open(_path, "w") as file:
+
+        file.write(f"\\ Generated from {len(model.variables)} variable(s), {len(model.constraints)} constraint(s)\n")
+
+        sense, coefs, const = "minimize", dict(), 0.0
+        if  model.objectives:
+            _, sense, tree = model.objectives[0]
+            coefs, const   = linearize(tree, parameters)
+
+        file.write(f"{sense.capitalize()}\n obj: {lp_terms(coefs or placeholder)}")
+        file.write(f" {'-' if const < 0 else '+'} {num(abs(const))}\n" if const else "\n")
+
+        file.write("Subject To\n")
+        for name, relation, lhs, rhs in model.constraints:
+
+            coefs, rhs_value = model.row(lhs, rhs, parameters)
+            file.write(f" {name}: {lp_terms(coefs or placeholder)} {relation} {num(rhs_value)}\n")
+
+        file.write("Bounds\n")
+        for symbol, (lower, upper) in variable_bounds(model, parameters).items():
+
+            if  lower == -math.inf and upper == math.inf:   file.write(f" {symbol} free\n")
+            elif lower == upper:                            file.write(f" {symbol} = {num(lower)}\n")
+            else:
+                file.write(f" {'-inf' if lower == -math.inf else num(lower)} <= {symbol}"
+                           f"{'' if upper == math.inf else f' <= {num(upper)}'}\n")
+
+        file.write("End\n")
+
+    return _path
+
+
+# Function write_mps: Writes a linear model in free MPS-format
+def write_mps(_script: str, _path: str, _values: dict | None = None) -> str:
+    """
+    Write a linear script as a free-format MPS-file. The constraint matrix is assembled once (in sparse form) and
+    written column by column. The first objective is written, its constant as the negated right-hand side of the
+    objective row, and maximization with an OBJSENSE section.
+
+    Parameters:
+        _script (str): The AMPL script (see `ModelBuilder.build()`).
+        _path (str): Output file.
+        _values (dict | None): Parameter-symbol -> value (default: the script's defaults).
+
+    Returns:
+        str: The path written to.
+
+    Raises:
+        ParseError, NonlinearError: If the script is not linear.
+    """
+
+    model = LinearModel(_script)
+    A_eq, b_eq, A_ub, b_ub, c, c0, sense, parameters = model.assemble(_values)
+
+    # Row names, in the order of the assembled matrices (inequalities are stored as `<=`):
+    equalities   = [name for name, relation, _, _ in model.constraints if relation == "="]
+    inequalities = [name for name, relation, _, _ in model.constraints if relation != "="]
+
+    with open(_path, "w") as file:
+
+        file.write("NAME climact\n")
+        if  sense == "maximize":
+            file.write("OBJSENSE\n    MAX\n")
+
+        file.write("ROWS\n N  obj\n")
+        file.writelines(f" E  {name}\n" for name in equalities)
+        file.writelines(f" L  {name}\n" for name in inequalities)
+
+        file.write("COLUMNS\n")
+        eq_csc = A_eq.tocsc()
+        ub_csc = A_ub.tocsc()
+        for column, symbol in enumerate(model.variables):
+
+            if  c is not None and c[column] != 0.0:
+                file.write(f"    {symbol} obj {num(c[column])}\n")
+
+            for matrix, names in ((eq_csc, equalities), (ub_csc, inequalities)):
+                start, stop = matrix.indptr[column], matrix.indptr[column + 1]
+                for row, value in zip(matrix.indices[start:stop], matrix.data[start:stop]):
+                    file.write(f"    {symbol} {names[row]} {num(value)}\n")
+
+        file.write("RHS\n")
+        if  c0:
+            file.write(f"    RHS obj {num(-c0)}\n")
+
+        for vector, names in ((b_eq, equalities), (b_ub, inequalities)):
+            for name, value in zip(names, vector):
+                if  value != 0.0:
+                    file.write(f"    RHS {name} {num(value)}\n")
+
+        file.write("BOUNDS\n")
+        for symbol, (lower, upper) in variable_bounds(model, parameters).items():
+
+            if  lower == -math.inf and upper == math.inf:   file.write(f" FR BND {symbol}\n")
+            elif lower == upper:                            file.write(f" FX BND {symbol} {num(lower)}\n")
+            else:
+                file.write(f" MI BND {symbol}\n" if lower == -math.inf else f" LO BND {symbol} {num(lower)}\n")
+                if  upper != math.inf:
+                    file.write(f" UP BND {symbol} {num(upper)}\n")
+
+        file.write("ENDATA\n")
+
+    return _path
+
+
+# Function nl_expression: Renders a syntax tree as a .nl-expression
+def nl_expression(_tree: tuple, _columns: dict, _out: list):
+    """
+    Append the lines of a (constant-folded) syntax tree in the prefix notation of .nl-files to `_out`.
+    """
+
+    kind = _tree[0]
+
+    if  kind == "num":
+        _out.append(f"n{num(_tree[1])}")
+
+    elif kind == "sym":
+        if  _tree[1] not in _columns:
+            raise ParseError(f"Undeclared symbol: {_tree[1]}")
+
+        _out.append(f"v{_columns[_tree[1]]}")
+
+    elif kind == "neg":
+        _out.append(f"o{NL_NEG}")
+        nl_expression(_tree[1], _columns, _out)
+
+    elif kind in NL_BINARY:
+        _out.append(f"o{NL_BINARY[kind]}")
+        nl_expression(_tree[1], _columns, _out)
+        nl_expression(_tree[2], _columns, _out)
+
+    # A sum as the chain of binary operators it stands for, e.g. a - b + c -> o0 o1 a b c:
+    elif kind == "sum":
+        _out.extend(f"o{NL_BINARY[op]}" for op, _ in reversed(_tree[2]))
+        nl_expression(_tree[1], _columns, _out)
+        for _, term in _tree[2]:
+            nl_expression(term, _columns, _out)
+
+    elif kind == "call" and _tree[1] in NL_UNARY and len(_tree[2]) == 1:
+        _out.append(f"o{NL_UNARY[_tree[1]]}")
+        nl_expression(_tree[2][0], _columns, _out)
+
+    elif kind == "call" and _tree[1] in NL_LIST:
+        _out.append(f"o{NL_LIST[_tree[1]]}")
+        _out.append(str(len(_tree[2])))
+        for arg in _tree[2]:
+            nl_expression(arg, _columns, _out)
+
+    else:
+        raise ParseError(f"Cannot write '{_tree[1] if kind == 'call' else kind}' to a .nl-file")
+
+
+# Function split: Linear or nonlinear form of an expression
+def split(_tree: tuple, _constants: dict) -> tuple:
+    """
+    Return (coefficients, constant, None) if the expression is linear, and (variables, 0.0, folded tree) otherwise,
+    where the variables of a nonlinear expression have coefficient 0.0 (their linear part stays in the tree).
+    """
+
+    try:
+        coefs, const = linearize(_tree, _constants)
+        return coefs, const, None
+
+    except NonlinearError:
+        tree = fold(_tree, _constants)
+        return dict.fromkeys(sorted(symbols(tree)), 0.0), 0.0, tree
+
+
+# Function write_nl: Writes a model in the text-variant of the .nl-format
+def write_nl(_script: str, _path: str, _values: dict | None = None, _initial: dict | None = None) -> str:
+    """
+    Write a script as a .nl-file (text format, "g"), readable by AMPL-solvers such as ipopt without an AMPL
+    translator. Parameters are replaced by their values. Linear rows are written as Jacobian coefficients, nonlinear
+    rows as expression trees (with their variables listed in the Jacobian at coefficient 0). Variables and
+    constraints that appear nonlinearly are ordered first, as the format requires. The names of the variables and
+    of the constraints and objectives are written to `.col` and `.row` files next to the model.
+
+    Parameters:
+        _script (str): The AMPL script (see `ModelBuilder.build()`).
+        _path (str): Output file.
+        _values (dict | None): Parameter-symbol -> value (default: the script's defaults).
+        _initial (dict | None): Variable-symbol -> initial value.
+
+    Returns:
+        str: The path written to.
+    """
+
+    model      = ScriptModel(_script)
+    parameters = model.parameters(_values)
+    bounds     = variable_bounds(model, parameters)
+    _initial   = _initial or dict()
+
+    # Linear/nonlinear form of every row and objective:
+    rows = [(name, relation, *split(("sub", lhs, rhs), parameters)) for name, relation, lhs, rhs in model.constraints]
+    objs = [(name, sense, *split(tree, parameters)) for name, sense, tree in model.objectives]
+
+    # Nonlinear rows and objectives first:
+    rows.sort(key=lambda row: row[4] is None)
+    objs.sort(key=lambda obj: obj[4] is None)
+
+    nl_cons = set().union(*(coefs for _, _, coefs, _, tree in rows if tree is not None))
+    nl_objs = set().union(*(coefs for _, _, coefs, _, tree in objs if tree is not None))
+    nl_vars = nl_cons | nl_objs
+
+    # Variables appearing nonlinearly anywhere are declared nonlinear in both (a superset the format allows):
+    ordered = [symbol for symbol in model.variables if symbol in nl_vars]
+    ordered+= [symbol for symbol in model.variables if symbol not in nl_vars]
+    columns = {symbol: column for column, symbol in enumerate(ordered)}
+
+    unknown = set().union(*(coefs for _, _, coefs, _, _ in rows + objs)) - set(columns)
+    if  unknown:
+        raise ParseError(f"Undeclared symbol(s): {', '.join(sorted(unknown))}")
+
+    nlc  = sum(tree is not None for *_, tree in rows)
+    nlo  = sum(tree is not None for *_, tree in objs)
+    nlvc = len(nl_vars) if nlc else 0
+    nlvo = len(nl_vars) if nlo else 0
+    nlvb = len(nl_vars) if nlc and nlo else 0
+
+    counts = [0] * len(ordered)
+    for _, _, coefs, _, _ in rows:
+        for symbol in coefs:
+            counts[columns[symbol]] += 1
+
+    n_eqns = sum(relation == "=" for _, relation, *_ in rows)
+    nzo    = sum(len(coefs) for _, _, coefs, _, _ in objs)
+
+    with open(_path, "w") as file:
+
+        file.write(f"g3 1 1 0\t# problem {os.path.splitext(os.path.basename(_path))[0]}\n"
+                   f" {len(ordered)} {len(rows)} {len(objs)} 0 {n_eqns} 0\t# vars, constraints, objectives, ranges, eqns, lcons\n"
+                   f" {nlc} {nlo}\t# nonlinear constraints, objectives\n"
+                   f" 0 0\t# network constraints: nonlinear, linear\n"
+                   f" {nlvc} {nlvo} {nlvb}\t# nonlinear vars in constraints, objectives, both\n"
+                   f" 0 0 0 1\t# linear network variables; functions; arith, flags\n"
+                   f" 0 0 0 0 0\t# discrete variables: binary, integer, nonlinear (b,c,o)\n"
+                   f" {sum(counts)} {nzo}\t# nonzeros in Jacobian, gradients\n"
+                   f" 0 0\t# max name lengths: constraints, variables\n"
+                   f" 0 0 0 0 0\t# common exprs: b,c,o,c1,o1\n")
+
+        # Nonlinear parts of constraints and objectives:
+        for index, (_, _, _, _, tree) in enumerate(rows):
+            lines = ["n0"] if tree is None else list()
+            if  tree is not None:
+                nl_expression(tree, columns, lines)
+
+            file.write(f"C{index}\n" + "\n".join(lines) + "\n")
+
+        for index, (_, sense, _, const, tree) in enumerate(objs):
+            lines = [f"n{num(const)}"] if tree is None else list()
+            if  tree is not None:
+                nl_expression(tree, columns, lines)
+
+            file.write(f"O{index} {int(sense == 'maximize')}\n" + "\n".join(lines) + "\n")
+
+        # Initial values:
+        initial = [(columns[symbol], value) for symbol, value in _initial.items() if symbol in columns]
+        if  initial:
+            file.write(f"x{len(initial)}\n")
+            file.writelines(f"{column} {num(value)}\n" for column, value in sorted(initial))
+
+        # Constraint bounds (rows are `body (relation) -constant`):
+        file.write("r\n")
+        for _, relation, _, const, _ in rows:
+            file.write(f"{NL_RELATIONS[relation]} {num(-const)}\n")
+
+        # Variable bounds:
+        file.write("b\n")
+        for symbol in ordered:
+
+            lower, upper = bounds[symbol]
+            if  lower == -math.inf and upper == math.inf:   file.write("3\n")
+            elif lower == upper:                            file.write(f"4 {num(lower)}\n")
+            elif lower == -math.inf:                        file.write(f"1 {num(upper)}\n")
+            elif upper == math.inf:                         file.write(f"2 {num(lower)}\n")
+            else:                                           file.write(f"0 {num(lower)} {num(upper)}\n")
+
+        # Jacobian column counts (cumulative, all but the last column):
+        file.write(f"k{max(len(ordered) - 1, 0)}\n")
+        total = 0
+        for count in counts[:-1]:
+            total += count
+            file.write(f"{total}\n")
+
+        # Linear parts of constraints and objectives:
+        for index, (_, _, coefs, _, _) in enumerate(rows):
+            if  coefs:
+                entries = sorted((columns[symbol], value) for symbol, value in coefs.items())
+                file.write(f"J{index} {len(entries)}\n" + "".join(f"{column} {num(value)}\n" for column, value in entries))
+
+        for index, (_, _, coefs, _, _) in enumerate(objs):
+            if  coefs:
+                entries = sorted((columns[symbol], value) for symbol, value in coefs.items())
+                file.write(f"G{index} {len(entries)}\n" + "".join(f"{column} {num(value)}\n" for column, value in entries))
+
+    stem = os.path.splitext(_path)[0]
+    with open(f"{stem}.col", "w") as file:  file.writelines(f"{symbol}\n" for symbol in ordered)
+    with open(f"{stem}.row", "w") as file:  file.writelines(f"{name}\n" for name, *_ in rows + objs)
+
+    return _path
+
+
+# Function write_ampl: Writes a model as separate AMPL model- and data-files
+def write_ampl(_script: str, _path: str, _values: dict | None = None) -> str:
+    """
+    Split a script into its structure, written to `_path` (.mod, parameters declared without values), and its data,
+    written next to it (.dat). Load both with `model <file>.mod; data <file>.dat;`.
+
+    Parameters:
+        _script (str): The AMPL script (see `ModelBuilder.build()`).
+        _path (str): Output file (.mod).
+        _values (dict | None): Parameter-symbol -> value (default: the script's defaults).
+
+    Returns:
+        str: The path of the model-file.
+    """
+
+    parameters = ScriptModel(_script).parameters(_values)
+
+    with open(_path, "w") as file:
+        for statement in statements(_script):
+            match = PARAM_STMT.match(statement)
+            file.write(f"param {match.group(1)};\n" if match else f"{statement};\n")
+
+    with open(f"{os.path.splitext(_path)[0]}.dat", "w") as file:
+        file.write(dat(parameters))
+
+    return _path
+
+
+# Function write_model: Writes a model in the format given by the file's extension
+def write_model(_script: str, _path: str, _values: dict | None = None, _initial: dict | None = None) -> str:
+    """
+    Write a script as .nl, .lp, .mps or .mod/.dat, chosen by the extension of `_path`.
+    """
+
+    extension = os.path.splitext(_path)[1].lower()
+
+    if  extension == ".nl":     return write_nl (_script, _path, _values, _initial)
+    if  extension == ".lp":     return write_lp (_script, _path, _values)
+    if  extension == ".mps":    return write_mps(_script, _path, _values)
+    if  extension == ".mod":    return write_ampl(_script, _path, _values)
+
+    raise ValueError(f"Unknown model format '{extension}'")
@@ -28,10 +28,11 @@ from PyQt6.QtWidgets import (
     )
 
 from dataclasses import dataclass
-from .graph   import *
-from .jsonlib import JsonLib
+from .graph     import *
+from .jsonlib   import JsonLib
+from .flowgraph import FlowGraph
 
-from util    import random_id
+from util    import random_id, IdAllocator
 from enum    import Enum
 from custom  import *
 from actions import *
@@ -40,6 +41,21 @@ class SaveState(Enum):
     SAVED = 0
     UNSAVED = 1
 
+# Collect an entity's data-fields for the flow-graph (see tabs/schema/flowgraph.py):
+def entity_fields(_entity: Entity) -> dict:
+
+    return {
+        "symbol"  : _entity.symbol,
+        "label"   : _entity.label,
+        "units"   : _entity.units,
+        "strid"   : _entity.strid,
+        "info"    : _entity.info,
+        "value"   : _entity.value,
+        "sigma"   : _entity.sigma,
+        "minimum" : _entity.minimum,
+        "maximum" : _entity.maximum
+    }
+
 # Class Canvas - Subclass of QGraphicsScene, manages graphical items:
 class Canvas(QGraphicsScene):
 
@@ -101,11 +117,28 @@ class Canvas(QGraphicsScene):
         self.conn_db = dict()  # Maps each connector to a bool indicating whether it's currently visible/enabled.
         self.type_db = set()   # List of defined stream-types (e.g. Mass, Energy, Electricity, etc.)
 
+        # Headless model of the schematic, kept in sync with the registries above (see tabs/schema/flowgraph.py):
+        self.graph = FlowGraph()
+
+        # Identifier-allocators for connectors, nodes, handles, and terminals:
+        self.id_pool = {
+            "X": IdAllocator("X"),
+            "N": IdAllocator("N", 4),
+            "H": IdAllocator("H", 4),
+            "T": IdAllocator("T", 4)
+        }
+
+        # Hash-indexes for constant-time lookups (active items only, see `Canvas.index()`):
+        self.node_index = dict()    # UID -> Node or StreamTerminal
+        self.hndl_index = dict()    # UID -> Handle
+        self.conn_index = dict()    # Symbol -> Connector
+        self.type_index = dict()    # Stream-ID -> Stream
+
         # Add default streams:
-        self.type_db.add(Stream("Default", Qt.GlobalColor.darkGray))   # Default
-        self.type_db.add(Stream("Energy", QColor("#F6AE2D")))          # Energy
-        self.type_db.add(Stream("Power", QColor("#474973")))           # Power
-        self.type_db.add(Stream("Mass", QColor("#028CB6")))            # Mass
+        self.add_stream(Stream("Default", Qt.GlobalColor.darkGray))    # Default
+        self.add_stream(Stream("Energy", QColor("#F6AE2D")))           # Energy
+        self.add_stream(Stream("Power", QColor("#474973")))            # Power
+        self.add_stream(Stream("Mass", QColor("#028CB6")))             # Mass
 
         # Initialize menu:
         self._init_menu()
@@ -267,6 +300,7 @@ class Canvas(QGraphicsScene):
         _connector = Connector(self.create_cuid(), _origin, _target)
         self.conn_db[_connector] = True
         self.addItem(_connector)
+        self.sync_connector(_connector)
 
         # Push action to undo-stack:
         self.manager.do(ConnectHandleAction(self, _connector))
@@ -323,11 +357,13 @@ class Canvas(QGraphicsScene):
         _terminal.setPos(_coords)
         _terminal.socket.sig_item_clicked.connect(self.begin_transient, Qt.ConnectionType.UniqueConnection)
         _terminal.socket.sig_item_updated.connect(lambda: self.sig_canvas_state.emit(SaveState.UNSAVED), Qt.ConnectionType.UniqueConnection)
+        _terminal.socket.sig_item_updated.connect(self.sync_entity, Qt.ConnectionType.UniqueConnection)
         _terminal.sig_item_removed.connect(self.on_item_removed)
 
         # Add item to canvas:
         self.term_db[_terminal] = True
         self.addItem(_terminal)
+        self.sync_node(_terminal)
 
         # If flag is set, create and forward action to stack-manager:
         if _flag: self.manager.do(CreateStreamAction(self, _terminal))
@@ -368,10 +404,13 @@ class Canvas(QGraphicsScene):
         _node.sig_exec_actions.connect(self.manager.do)
         _node.sig_item_removed.connect(self.on_item_removed)
         _node.sig_handle_clicked.connect(self.begin_transient)
+        _node.sig_handle_created.connect(self.sync_entity)
+        _node.sig_handle_updated.connect(self.sync_entity)
 
         # Add node to database and canvas:
         self.node_db[_node] = True
         self.addItem(_node)
+        self.sync_node(_node)
 
         # Push action to undo-stack:
         if _push:   self.manager.do(CreateNodeAction(self, _node))
@@ -388,46 +427,17 @@ class Canvas(QGraphicsScene):
 
         Parameters: None
         Returns: 
-            str: Unique ID for a new connector.
+            str: Unique ID for a new connector (smallest unused, O(log n)).
         """
 
-        # Get existing connector UIDs:
-        id_set = {
-            int(connector.symbol.split('X')[1])
-            for connector in self.conn_db
-            if self.conn_db[connector]
-        }
-
-        # If `id_set` is empty, return "X0":
-        if not id_set:  return "X0"
-        
-        # Get sequence of integers from 0 to `max(id_set) + 1`, not in `id_set`:
-        sequence = set(range(0, max(id_set) + 2))
-        reusable = sequence - id_set
-
-        # Return UID (prefix + smallest integer not in `id_set`):
-        return "X" + str(min(reusable))
+        return self.id_pool["X"].acquire()
 
     def create_nuid(self):
         """
-        Create a unique ID for a new node.
+        Create a unique ID for a new node (smallest unused, O(log n)).
         """
 
-        id_set = {
-            int(_node.uid.split('N')[1])
-            for _node, state in self.node_db.items()
-            if state
-        }
-
-        # If `id_set` is empty, return "N0":
-        if not id_set:  return "N0000"
-        
-        # Get sequence of integers from 0 to `max(id_set) + 1`, not in `id_set`:
-        sequence = set(range(0, max(id_set) + 2))
-        reusable = sequence - id_set
-
-        # Return UID (prefix + smallest integer not in `id_set`):
-        return "N" + str(min(reusable)).zfill(4)
+        return self.id_pool["N"].acquire()
 
     def copy_selection(self):
         """
@@ -486,6 +496,7 @@ class Canvas(QGraphicsScene):
                 # Add connector to canvas:
                 self.conn_db[connector] = True
                 self.addItem(connector)
+                self.sync_connector(connector)
 
                 # Add connector-creation to batch:
                 batch.add_to_batch(ConnectHandleAction(self, connector))
@@ -520,16 +531,20 @@ class Canvas(QGraphicsScene):
             _item.sig_exec_actions.connect(self.manager.do, Qt.ConnectionType.UniqueConnection)
             _item.sig_item_removed.connect(self.on_item_removed, Qt.ConnectionType.UniqueConnection)
             _item.sig_handle_clicked.connect(self.begin_transient, Qt.ConnectionType.UniqueConnection)
+            _item.sig_handle_created.connect(self.sync_entity, Qt.ConnectionType.UniqueConnection)
+            _item.sig_handle_updated.connect(self.sync_entity, Qt.ConnectionType.UniqueConnection)
             _item.uid = self.create_nuid()
 
         elif isinstance(_item, StreamTerminal):
             self.term_db[_item] = True
             _item.socket.sig_item_clicked.connect(self.begin_transient)
             _item.socket.sig_item_updated.connect(lambda: self.sig_canvas_state.emit(SaveState.UNSAVED))
+            _item.socket.sig_item_updated.connect(self.sync_entity)
             _item.sig_item_removed.connect(self.on_item_removed)
 
-        # Add item to canvas:
+        # Add item to canvas and register it with the flow-graph:
         self.addItem(_item)
+        self.sync_node(_item)
 
         # If `_stack` is True, create and forward action to stack-manager:
         if _stack:
@@ -706,6 +721,208 @@ class Canvas(QGraphicsScene):
         ):
             self.delete_items({item: True})  # Delete item
     
+    # Flow-graph synchronization ---------------------------------------------------------------------------------------
+    # Name                      Description
+    # ------------------------------------------------------------------------------------------------------------------
+    # 1. sync_node              Registers a node or terminal (and its handles) with the flow-graph, pushes its data.
+    # 2. sync_entity            Registers a handle with the flow-graph, or pushes its data if already registered.
+    # 3. sync_connector         Registers a connector with the flow-graph and pushes its endpoints' data.
+    # 4. sync_state             Forwards an item's activation-state to the flow-graph.
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def sync_node(self, _item: QGraphicsObject):
+        """
+        Register a node or terminal with the flow-graph (if it isn't already), and push its data (title, equations,
+        handles, and parameters).
+
+        Parameters:
+            _item (Node | StreamTerminal): The node or terminal to synchronize.
+
+        Returns: None
+        """
+
+        # Terminals are single-handle nodes:
+        if isinstance(_item, StreamTerminal):
+
+            if _item.gid < 0:
+                _item.uid = self.id_pool["T"].acquire()
+                _item.gid = self.graph.add_node(_item.uid, _item.socket.label, FlowGraph.Role.TERMINAL)
+                self.index(_item, True)
+
+            self.graph.update_node(_item.gid, title=_item.socket.label)
+            self.sync_entity(_item.socket)
+            return
+
+        # Abort-conditions:
+        if not isinstance(_item, Node): return
+
+        # Register node:
+        if _item.gid < 0:
+            _item.gid = self.graph.add_node(_item.uid, _item.title)
+            self.index(_item, True)
+
+        self.graph.update_node(_item.gid,
+                               uid=_item.uid,
+                               title=_item.title,
+                               equations=_item[EntityClass.EQN]
+                               )
+
+        # Push handles:
+        for _handle, _state in _item[EntityClass.VAR].items():
+            self.sync_entity(_handle)
+            self.graph.set_entity_live(_handle.gid, _state == EntityState.ACTIVE)
+
+        # Replace parameters:
+        self.graph.set_parameters(_item.gid, [
+            entity_fields(_parameter)
+            for _parameter, _state in _item[EntityClass.PAR].items()
+            if _state == EntityState.ACTIVE
+        ])
+
+    @pyqtSlot(Handle)
+    def sync_entity(self, _handle: Handle):
+        """
+        Register a handle with the flow-graph (if it isn't already), or push its data.
+
+        Parameters:
+            _handle (Handle): The handle to synchronize.
+
+        Returns: None
+        """
+
+        # Validate argument(s):
+        if not isinstance(_handle, Handle): return
+
+        # Register handle's parent first:
+        _parent = _handle.parentItem()
+        if _parent is None:     return
+        if _parent.gid < 0:     self.sync_node(_parent)
+
+        if _handle.gid < 0:
+            _handle.uid = self.id_pool["H"].acquire()
+            _handle.gid = self.graph.add_entity(_parent.gid, _handle.eclass.value, **entity_fields(_handle))
+            self.index(_handle, True)
+
+        else:
+            self.graph.update_entity(_handle.gid, **entity_fields(_handle))
+
+    def sync_connector(self, _connector: Connector):
+        """
+        Register a connector with the flow-graph (if it isn't already), and push the data of its endpoints.
+
+        Parameters:
+            _connector (Connector): The connector to synchronize.
+
+        Returns: None
+        """
+
+        # Connectors copy the origin's data to the target, push both:
+        self.sync_entity(_connector.origin)
+        self.sync_entity(_connector.target)
+
+        if _connector.gid < 0:
+            _connector.gid = self.graph.add_connector(_connector.origin.gid,
+                                                      _connector.target.gid,
+                                                      _connector.symbol
+                                                      )
+
+        self.graph.set_connector_live(_connector.gid, bool(self.conn_db.get(_connector)))
+        self.index(_connector, bool(self.conn_db.get(_connector)))
+
+    def sync_state(self, _item: QGraphicsObject, _state: bool):
+        """
+        Forward an item's activation-state (see actions/actions.py) to the flow-graph.
+
+        Parameters:
+            _item (Node | StreamTerminal | Handle | Connector): The item that was (de)activated.
+            _state (bool): The item's new state.
+
+        Returns: None
+        """
+
+        # Ignore unregistered items:
+        if getattr(_item, "gid", -1) < 0:   return
+
+        if   isinstance(_item, Node | StreamTerminal):  _live, _update = self.graph.node_live, self.graph.set_node_live
+        elif isinstance(_item, Handle):                 _live, _update = self.graph.ent_live , self.graph.set_entity_live
+        elif isinstance(_item, Connector):              _live, _update = self.graph.conn_live, self.graph.set_connector_live
+        else:   return
+
+        # Recycle identifiers and update indexes only on actual state-changes:
+        if bool(_live[_item.gid]) != _state:
+
+            if not _state:  self.index(_item, False)    # Un-index under the old identifier
+            self.recycle_id(_item, _state)
+            if _state:      self.index(_item, True)     # Index under the (possibly reassigned) identifier
+
+            _update(_item.gid, _state)
+
+    def index(self, _item: QGraphicsObject, _state: bool):
+        """
+        Add an item to (or remove it from) the hash-index for its type.
+
+        Parameters:
+            _item (Node | StreamTerminal | Handle | Connector): The item to (un)index.
+            _state (bool): True to add the item, False to remove it.
+
+        Returns: None
+        """
+
+        if   isinstance(_item, Node | StreamTerminal):  _index, _key = self.node_index, _item.uid
+        elif isinstance(_item, Handle):                 _index, _key = self.hndl_index, _item.uid
+        elif isinstance(_item, Connector):              _index, _key = self.conn_index, _item.symbol
+        else:   return
+
+        if _state:                          _index[_key] = _item
+        elif _index.get(_key) is _item:     _index.pop(_key)
+
+    def recycle_id(self, _item: QGraphicsObject, _state: bool):
+        """
+        Keep the identifier-allocators in sync with undo/redo: deactivated items release their IDs, reactivated items
+        reclaim them. If an ID has been reused in the meantime, the reactivated item is assigned a new one.
+
+        Parameters:
+            _item (Node | StreamTerminal | Handle | Connector): The item that was (de)activated.
+            _state (bool): The item's new state.
+
+        Returns: None
+        """
+
+        if   isinstance(_item, Node):           _pool = self.id_pool["N"]
+        elif isinstance(_item, StreamTerminal): _pool = self.id_pool["T"]
+        elif isinstance(_item, Handle):         _pool = self.id_pool["H"]
+        elif isinstance(_item, Connector):      _pool = self.id_pool["X"]
+        else:   return
+
+        _uid = _item.symbol if isinstance(_item, Connector) else _item.uid
+
+        # Release or reclaim ID:
+        if not _state:              _pool.release(_uid); return
+        if _pool.claim(_uid):       return
+
+        # ID is taken, assign a new one:
+        _uid = _pool.acquire()
+        logging.info(f"Identifier of {_item} is in use, reassigned to {_uid}")
+
+        if isinstance(_item, Connector):
+            _item.symbol = _uid
+            self.graph.update_connector(_item.gid, _uid)
+
+        else:
+            _item.uid = _uid
+            if not isinstance(_item, Handle):   self.graph.update_node(_item.gid, uid=_uid)
+
+    def add_stream(self, _stream: Stream):
+        """
+        Add a stream-type to the canvas.
+
+        Args:
+            _stream (Stream): The stream to add (see custom/stream.py).
+        """
+
+        self.type_db.add(_stream)
+        self.type_index[_stream.strid] = _stream
+
     def find_stream(self, _stream: str):
         """
         Find a stream by its name.
@@ -717,15 +934,42 @@ class Canvas(QGraphicsScene):
             Stream: The stream with the given name (see custom/stream.py).
         """
 
-        return next((stream for stream in self.type_db if stream.strid == _stream), None) 
+        return self.type_index.get(_stream)
 
     def find_node(self, _uid: str):
+        """
+        Find an active node (or terminal) by its UID.
+        """
 
-        for _node in self.node_db.keys():
-            if self.node_db[_node] and _uid == _node.uid:
-                return _node
+        return self.node_index.get(_uid)
+
+    def find_handle(self, _uid: str):
+        """
+        Find an active handle by its UID.
+        """
+
+        return self.hndl_index.get(_uid)
+
+    def find_connector(self, _symbol: str):
+        """
+        Find an active connector by its symbol.
+        """
+
+        return self.conn_index.get(_symbol)
+
+    @pyqtSlot(object)
+    def apply_results(self, _result):
+        """
+        Show the results of a solve on the connectors they belong to.
+
+        Args:
+            _result (Solution): Results of a solve (see tabs/optima/ampl.py).
+        """
 
-        return None
+        for symbol, value in zip(_result.var_symbols.tolist(), _result.var_values.tolist()):
+            connector = self.find_connector(symbol)
+            if  connector is not None:
+                connector.result = value
 
     def clear(self):
         """
@@ -0,0 +1,368 @@
+import re
+import functools
+
+from dataclasses import dataclass, field
+
+
+# Class ParseError: Raised for expressions the parser does not understand
+class ParseError(ValueError):
+    pass
+
+
+# Tokens: numbers, names, and operators (longest operators first):
+TOKEN = re.compile(r"\s*(?:(\d+\.?\d*(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?)|([A-Za-z_]\w*)|(<=|>=|==|\*\*|[-+*/^(),=<>]))")
+
+# Relational operators:
+RELATIONS = {"=": "=", "==": "=", "<=": "<=", ">=": ">="}
+
+
+# Function lexemes: Splits an expression into token-matches
+def lexemes(_text: str) -> list[re.Match]:
+
+    matches = list()
+    index   = 0
+    text    = _text.rstrip()
+
+    # Matches must be contiguous, a gap is a character that no token matches:
+    for match in TOKEN.finditer(text):
+
+        if  match.start() != index or match.end() == index:
+            break
+
+        matches.append(match)
+        index = match.end()
+
+    if  index < len(text):
+        raise ParseError(f"Unexpected character '{text[index:].lstrip()[:1]}' in '{_text}'")
+
+    return matches
+
+
+# Function tokenize: Splits an expression into tokens
+def tokenize(_text: str) -> list[str]:
+    return [match.group(match.lastindex) for match in lexemes(_text)]
+
+
+# Class Parser: Recursive-descent parser for equations and expressions
+class Parser:
+    """
+    Parses AMPL-style scalar expressions into tuple-based syntax trees:
+
+        ("num", value) | ("sym", name) | ("neg", a) | ("add", a, b) | ("sub", a, b) | ("mul", a, b) |
+        ("div", a, b)  | ("pow", a, b) | ("call", name, (args...)) | ("sum", a, (("add" | "sub", b), ...))
+
+    Sums are parsed into a single "sum"-node, the first term followed by (operator, term) pairs applied from left to
+    right, so that a long sum is one level deep (its walkers loop over the terms instead of recursing once per term).
+    The binary "add" and "sub" nodes are not produced by the parser, but accepted wherever a "sum" is.
+
+    Equations parse into (relation, lhs, rhs), where relation is one of "=", "<=", ">=".
+    """
+
+    # Initializer:
+    def __init__(self, _text: str, _tokens: list[str] | None = None):
+
+        self._text   = _text
+        self._tokens = tokenize(_text) if _tokens is None else _tokens
+        self._index  = 0
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Name                      Description
+    # ------------------------------------------------------------------------------------------------------------------
+    # 1. expression             Parses the whole input as an expression.
+    # 2. equation               Parses the whole input as an (in)equality.
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def expression(self) -> tuple:
+
+        tree = self._sum()
+        self._expect_end()
+        return tree
+
+    def equation(self) -> tuple:
+
+        lhs = self._sum()
+        rel = self._next()
+        if  rel not in RELATIONS:
+            raise ParseError(f"Expected a relation in '{self._text}'")
+
+        rhs = self._sum()
+        self._expect_end()
+        return RELATIONS[rel], lhs, rhs
+
+    # Helpers ----------------------------------------------------------------------------------------------------------
+
+    def _peek(self):
+        return self._tokens[self._index] if self._index < len(self._tokens) else None
+
+    def _next(self):
+
+        token = self._peek()
+        if  token is None:
+            raise ParseError(f"Unexpected end of '{self._text}'")
+
+        self._index += 1
+        return token
+
+    def _expect(self, _token: str):
+
+        if  self._next() != _token:
+            raise ParseError(f"Expected '{_token}' in '{self._text}'")
+
+    def _expect_end(self):
+
+        if  self._peek() is not None:
+            raise ParseError(f"Unexpected '{self._peek()}' in '{self._text}'")
+
+    def _sum(self):
+
+        # A parenthesized sum on the left is continued, as sums are left-associative: (a + b) - c == a + b - c:
+        tree       = self._product()
+        tree, rest = (tree[1], list(tree[2])) if tree[0] == "sum" else (tree, list())
+
+        while self._peek() in ("+", "-"):
+            op = "add" if self._next() == "+" else "sub"
+            rest.append((op, self._product()))
+
+        return ("sum", tree, tuple(rest)) if rest else tree
+
+    def _product(self):
+
+        tree = self._unary()
+        while self._peek() in ("*", "/"):
+            op   = "mul" if self._next() == "*" else "div"
+            tree = (op, tree, self._unary())
+
+        return tree
+
+    def _unary(self):
+
+        if  self._peek() == "-":
+            self._next()
+            return ("neg", self._unary())
+
+        if  self._peek() == "+":
+            self._next()
+            return self._unary()
+
+        return self._power()
+
+    def _power(self):
+
+        base = self._atom()
+        if  self._peek() in ("^", "**"):
+            self._next()
+            return ("pow", base, self._unary())     # Right-associative, binds tighter than unary minus on the left
+
+        return base
+
+    def _atom(self):
+
+        token = self._next()
+
+        if  token == "(":
+            tree = self._sum()
+            self._expect(")")
+            return tree
+
+        if  token[0].isdigit() or token[0] == ".":
+            return ("num", float(token))
+
+        if  token[0].isalpha() or token[0] == "_":
+
+            if  self._peek() != "(":
+                return ("sym", token)
+
+            self._next()
+            args = list()
+            if  self._peek() != ")":
+                args.append(self._sum())
+                while self._peek() == ",":
+                    self._next()
+                    args.append(self._sum())
+
+            self._expect(")")
+            return ("call", token, tuple(args))
+
+        raise ParseError(f"Unexpected '{token}' in '{self._text}'")
+
+
+# Function parse: Parses an expression
+def parse(_text: str) -> tuple:
+    return Parser(_text).expression()
+
+
+# Function parse_equation: Parses an (in)equality
+def parse_equation(_text: str) -> tuple:
+    return Parser(_text).equation()
+
+
+# Function symbols: Names referenced by a syntax tree
+def symbols(_tree: tuple, _found: set | None = None) -> set:
+
+    _found = set() if _found is None else _found
+    kind   = _tree[0]
+
+    if   kind == "sym":     _found.add(_tree[1])
+    elif kind == "call":
+        for arg in _tree[2]:    symbols(arg, _found)
+    elif kind == "sum":
+        symbols(_tree[1], _found)
+        for _, term in _tree[2]:    symbols(term, _found)
+    elif kind != "num":
+        for arg in _tree[1:]:   symbols(arg, _found)
+
+    return _found
+
+
+# Symbol-occurrences in text that can't be tokenized (names that aren't function calls or part of a number):
+SLOT = re.compile(r"(?<![\w.])[A-Za-z_]\w*(?!\w|\s*\()")
+
+
+# Function slotted: Replaces the symbols of a syntax tree by slots
+def slotted(_tree: tuple, _slots: dict) -> tuple:
+
+    kind = _tree[0]
+
+    if  kind == "num":  return _tree
+    if  kind == "sym":  return ("slot", _slots[_tree[1]])
+    if  kind == "call": return ("call", _tree[1], tuple(slotted(arg, _slots) for arg in _tree[2]))
+    if  kind == "neg":  return ("neg", slotted(_tree[1], _slots))
+    if  kind == "sum":  return ("sum", slotted(_tree[1], _slots), tuple((op, slotted(term, _slots)) for op, term in _tree[2]))
+
+    return (kind, slotted(_tree[1], _slots), slotted(_tree[2], _slots))
+
+
+# Function bind: Replaces the slots of a syntax tree by symbols
+def bind(_tree: tuple, _names) -> tuple:
+
+    kind = _tree[0]
+
+    if  kind == "num":  return _tree
+    if  kind == "slot": return ("sym", _names[_tree[1]])
+    if  kind == "call": return ("call", _tree[1], tuple(bind(arg, _names) for arg in _tree[2]))
+    if  kind == "neg":  return ("neg", bind(_tree[1], _names))
+    if  kind == "sum":  return ("sum", bind(_tree[1], _names), tuple((op, bind(term, _names)) for op, term in _tree[2]))
+
+    return (kind, bind(_tree[1], _names), bind(_tree[2], _names))
+
+
+# Class Template: Equation compiled into syntax trees with symbol-slots
+@dataclass(eq=False)
+class Template:
+    """
+    An equation parsed once, with each distinct symbol replaced by a slot: ("slot", index). Binding one name per slot
+    yields the equation with substituted symbols, as text (`render()`) or as syntax trees (`equation()`), without
+    tokenizing or parsing it again. Templates are shared by all equations with the same text (see `compile_equation`).
+
+    Text that doesn't parse as an equation can still be rendered; its `relation` is None and `error` holds the reason.
+    The slotted trees and the format-string are derived on first use.
+    """
+
+    text     : str
+    slots    : tuple                # Distinct symbols, in order of first occurrence
+    order    : tuple                # Slot of each symbol-occurrence in the text
+    pieces   : tuple                # Text around the symbol-occurrences (one more than `order`)
+    parsed   : tuple | None = None  # (relation, lhs, rhs) with the original symbols
+    error    : str = ""
+
+    _trees   : tuple | None = field(default=None, repr=False)
+    _pattern : str   | None = field(default=None, repr=False)
+
+    @property # Relation (datatype = str | None): "=", "<=" or ">=", or None if the text isn't an equation
+    def relation(self) -> str | None:   return self.parsed[0] if self.parsed else None
+
+    @property # Left-hand side (datatype = tuple | None): Syntax tree with slots
+    def lhs(self) -> tuple | None:  return self.trees[0]
+
+    @property # Right-hand side (datatype = tuple | None): Syntax tree with slots
+    def rhs(self) -> tuple | None:  return self.trees[1]
+
+    @property # Trees (datatype = tuple): (lhs, rhs) with slots, or (None, None) if the text isn't an equation
+    def trees(self) -> tuple:
+
+        if  self._trees is None:
+            index = {symbol: slot for slot, symbol in enumerate(self.slots)}
+            self._trees = (
+                (slotted(self.parsed[1], index), slotted(self.parsed[2], index)) if self.parsed else (None, None)
+            )
+
+        return self._trees
+
+    @property # Pattern (datatype = str): `pieces` and `order` as a format-string
+    def pattern(self) -> str:
+
+        if  self._pattern is None:
+
+            pieces = self.pieces
+            if  "{" in self.text or "}" in self.text:
+                pieces = [piece.replace("{", "{{").replace("}", "}}") for piece in pieces]
+
+            pattern = [pieces[0]]
+            for slot, piece in zip(self.order, pieces[1:]):
+                pattern.append(f"{{{slot}}}")
+                pattern.append(piece)
+
+            self._pattern = "".join(pattern)
+
+        return self._pattern
+
+    def render(self, _names) -> str:
+        """
+        Render the equation with the given name in each slot, keeping the original text in between.
+        """
+
+        return self.pattern.format(*_names)
+
+    def equation(self, _names = None) -> tuple:
+        """
+        Return (relation, lhs, rhs) with the given names (default: the original symbols) in the slots.
+
+        Raises:
+            ParseError: If the text isn't a valid equation.
+        """
+
+        if  self.parsed is None:
+            raise ParseError(self.error)
+
+        if  _names is None:
+            return self.parsed
+
+        return self.relation, bind(self.lhs, _names), bind(self.rhs, _names)
+
+
+# Function compile_equation: Compiles an equation into a template
+@functools.lru_cache(maxsize=65536)
+def compile_equation(_text: str) -> Template:
+    """
+    Compile an equation into a `Template`. Results are cached by text, so each distinct equation is parsed only once.
+    """
+
+    # Symbol-occurrences: names that aren't followed by an argument list:
+    try:
+        matches = lexemes(_text)
+        tokens  = [match.group(match.lastindex) for match in matches]
+        spans   = [
+            match.span(2) for index, match in enumerate(matches)
+            if  match.lastindex == 2 and (index + 1 == len(tokens) or tokens[index + 1] != "(")
+        ]
+
+    except ParseError as error:
+        tokens, reason = None, str(error)
+        spans  = [match.span() for match in SLOT.finditer(_text)]
+
+    slots  = dict()
+    for start, end in spans:
+        slots.setdefault(_text[start:end], len(slots))
+
+    bounds   = [0, *(bound for span in spans for bound in span), len(_text)]
+    pieces   = tuple(_text[bounds[index]:bounds[index + 1]] for index in range(0, len(bounds), 2))
+    template = Template(_text, tuple(slots), tuple(slots[_text[start:end]] for start, end in spans), pieces)
+
+    if  tokens is None:
+        template.error = reason
+        return template
+
+    try:                        template.parsed = Parser(_text, tokens).equation()
+    except ParseError as error: template.error  = str(error)
+
+    return template
@@ -0,0 +1,474 @@
+import numpy as np
+
+from tabs.schema.equation import compile_equation
+
+# Class Column: Growable, typed NumPy array with amortized O(1) appends
+class Column:
+
+    # Initial capacity:
+    _CAPACITY = 64
+
+    # Initializer:
+    def __init__(self, dtype, fill):
+        """
+        Initialize an empty column.
+
+        Parameters:
+            dtype (np.dtype): Data-type of the column.
+            fill (Any): Value used for unset and newly allocated slots.
+        """
+
+        self._fill = fill
+        self._size = 0
+        self._data = np.full(Column._CAPACITY, fill, dtype=dtype)
+
+    def __len__(self):  return self._size
+
+    def __getitem__(self, index):   return self.view[index]
+
+    def __setitem__(self, index, value):    self.view[index] = value
+
+    @property # View (datatype = np.ndarray): The populated part of the column (no copy)
+    def view(self) -> np.ndarray:   return self._data[:self._size]
+
+    def append(self, value) -> int:
+        """
+        Append a value, doubling the capacity when the buffer is full.
+
+        Parameters:
+            value (Any): The value to append.
+
+        Returns:
+            int: Index of the appended value.
+        """
+
+        # Grow buffer:
+        if  self._size == len(self._data):
+            grown = np.full(2 * len(self._data), self._fill, dtype=self._data.dtype)
+            grown[:self._size] = self._data
+            self._data = grown
+
+        self._data[self._size] = value
+        self._size += 1
+
+        return self._size - 1
+
+# Convert an entity's string-field to float (NaN if empty or invalid):
+def to_float(_value) -> float:
+
+    if _value is None:  return np.nan
+
+    try:                            return float(_value)
+    except (TypeError, ValueError): return np.nan
+
+# Class FlowGraph: Headless, array-backed model of a schematic
+class FlowGraph:
+    """
+    Struct-of-arrays model of a schematic. Nodes, entities (handles and parameters) and connectors are addressed by
+    integer ids, their numeric attributes live in NumPy columns, and node-adjacency is exposed in CSR form. The canvas
+    keeps this model in sync with its graphical items, so that the optimizer, exporter and balance checks can run
+    without touching any Qt objects.
+
+    Deleted items are never compacted: their rows are marked inactive and ignored by all queries.
+    """
+
+    # Entity kinds (mirror the values of `EntityClass` in custom/entity.py):
+    class Kind:
+        INP = 0
+        OUT = 1
+        PAR = 3
+
+    # Node roles:
+    class Role:
+        NODE     = 0
+        TERMINAL = 1
+
+    # Entity fields that hold strings and floats, respectively:
+    TEXT_FIELDS  = ("symbol", "label", "units", "strid", "info")
+    FLOAT_FIELDS = ("value", "sigma", "minimum", "maximum")
+
+    # Float fields that only hold data, i.e. whose edits don't change the structure of the model (as long as a value
+    # isn't set or cleared, which turns a parameter into a variable or vice versa):
+    DATA_FIELDS  = ("value", "sigma")
+
+    # Initializer:
+    def __init__(self):
+
+        # Global revisions, bumped on every structural mutation and on every value-only edit, respectively:
+        self.revision      = 0
+        self.data_revision = 0
+
+        # Node columns:
+        self.node_uid   = list()                    # Unique identifier (N0000, T0, ...)
+        self.node_title = list()                    # Title
+        self.node_eqns  = list()                    # Equations (list of strings per node)
+        self.node_role  = Column(np.int8 , 0)       # FlowGraph.Role
+        self.node_live  = Column(np.bool_, False)   # Active-state
+        self.node_rev   = Column(np.int64, 0)       # Per-node revision counter
+
+        # Entity columns (handles and parameters):
+        self.ent_node    = Column(np.int32, -1)     # Owner node-id
+        self.ent_kind    = Column(np.int8 , -1)     # FlowGraph.Kind
+        self.ent_live    = Column(np.bool_, False)  # Active-state
+        self.ent_conn    = Column(np.int32, -1)     # Attached connector-id (-1 if none)
+        self.ent_text    = {field: list() for field in FlowGraph.TEXT_FIELDS}
+        self.ent_float   = {field: Column(np.float64, np.nan) for field in FlowGraph.FLOAT_FIELDS}
+
+        # Connector columns:
+        self.conn_origin = Column(np.int32, -1)     # Origin entity-id (output handle)
+        self.conn_target = Column(np.int32, -1)     # Target entity-id (input handle)
+        self.conn_live   = Column(np.bool_, False)  # Active-state
+        self.conn_symbol = list()                   # Symbol (X0, X1, ...)
+
+        # Per-node entity lists:
+        self._handles = list()
+        self._params  = list()
+
+        # Cached CSR-adjacency:
+        self._csr = None
+        self._csr_revision = -1
+
+        # Compiled equations of each node, cached per node-revision:
+        self._compiled = dict()     # Node-id -> (revision, [(template, names)], [equation])
+
+    # Sizes:
+    @property
+    def num_nodes(self)      -> int: return len(self.node_live)
+
+    @property
+    def num_entities(self)   -> int: return len(self.ent_live)
+
+    @property
+    def num_connectors(self) -> int: return len(self.conn_live)
+
+    # Mutators ---------------------------------------------------------------------------------------------------------
+    # Name                      Description
+    # ------------------------------------------------------------------------------------------------------------------
+    # 1. touch                  Bumps the revision counters of a node and of the graph.
+    #    touch_entity           Bumps the revisions of an entity's node and of the node at the other end of its connector.
+    #
+    #    Mutators only touch nodes if they change something that shows up in the model's structure. Edits of data
+    #    fields (see `DATA_FIELDS`) only bump `data_revision`, so that they don't invalidate cached model-fragments.
+    # 2. add_node               Appends a node (or terminal) and returns its id.
+    # 3. add_entity             Appends a handle or parameter and returns its id.
+    # 4. add_connector          Appends a connector between two handles and returns its id.
+    # 5. update_node            Updates a node's identifier, title or equations.
+    # 6. update_entity          Updates an entity's text and numeric fields.
+    # 7. set_parameters         Replaces all parameters of a node.
+    # 8. set_*_live             Toggles the active-state of a node, entity or connector.
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def touch(self, _nid: int):
+
+        if  _nid >= 0:
+            self.node_rev[_nid] += 1
+
+        self.revision += 1
+
+    def touch_entity(self, _eid: int):
+
+        # A handle's state also shows up in the model of the node it is connected to:
+        cid = int(self.ent_conn[_eid])
+        if  cid >= 0:
+            conjugate = self.conn_target[cid] if self.conn_origin[cid] == _eid else self.conn_origin[cid]
+            self.touch(int(self.ent_node[conjugate]))
+
+        self.touch(int(self.ent_node[_eid]))
+
+    def add_node(self, _uid: str, _title: str = "", _role: int = Role.NODE) -> int:
+
+        self.node_uid.append(_uid)
+        self.node_title.append(_title)
+        self.node_eqns.append(list())
+        self.node_role.append(_role)
+        self.node_live.append(True)
+        self.node_rev.append(0)
+
+        self._handles.append(list())
+        self._params .append(list())
+
+        self.revision += 1
+        return len(self.node_live) - 1
+
+    def add_entity(self, _nid: int, _kind: int, **fields) -> int:
+
+        # Validate argument(s):
+        if not 0 <= _nid < self.num_nodes:  raise IndexError(f"Invalid node-id {_nid}")
+
+        self.ent_node.append(_nid)
+        self.ent_kind.append(_kind)
+        self.ent_live.append(True)
+        self.ent_conn.append(-1)
+
+        for field in FlowGraph.TEXT_FIELDS:     self.ent_text [field].append(str(fields.get(field) or ""))
+        for field in FlowGraph.FLOAT_FIELDS:    self.ent_float[field].append(to_float(fields.get(field)))
+
+        eid = len(self.ent_live) - 1
+        if _kind == FlowGraph.Kind.PAR: self._params [_nid].append(eid)
+        else:                           self._handles[_nid].append(eid)
+
+        self.touch(_nid)
+        return eid
+
+    def add_connector(self, _origin: int, _target: int, _symbol: str) -> int:
+
+        # Validate argument(s):
+        if _origin == _target:  raise ValueError("Origin and target entities must be different")
+
+        self.conn_origin.append(_origin)
+        self.conn_target.append(_target)
+        self.conn_live.append(True)
+        self.conn_symbol.append(_symbol)
+
+        # Attach connector to its endpoints:
+        cid = len(self.conn_live) - 1
+        self.ent_conn[_origin] = cid
+        self.ent_conn[_target] = cid
+
+        self.touch(int(self.ent_node[_origin]))
+        self.touch(int(self.ent_node[_target]))
+        return cid
+
+    def update_node(self, _nid: int, **fields):
+
+        update = dict()
+        if "uid"       in fields:   update["uid"]       = (self.node_uid  , str (fields["uid"]))
+        if "title"     in fields:   update["title"]     = (self.node_title, str (fields["title"]))
+        if "equations" in fields:   update["equations"] = (self.node_eqns , list(fields["equations"]))
+
+        changed = False
+        for column, value in update.values():
+            if  column[_nid] != value:
+                column[_nid] = value
+                changed = True
+
+        if  changed:
+            self.touch(_nid)
+
+    def update_entity(self, _eid: int, **fields) -> bool:
+        """
+        Update an entity's fields.
+
+        Returns:
+            bool: True if the edit changed the model's structure, False if it changed data only (or nothing).
+        """
+
+        structural, edited = False, False
+        for field, value in fields.items():
+
+            if  field in self.ent_text:
+                value = str(value or "")
+                if  self.ent_text[field][_eid] != value:
+                    self.ent_text[field][_eid] = value
+                    structural = True
+
+            elif field in self.ent_float:
+                value   = to_float(value)
+                current = float(self.ent_float[field][_eid])
+                if  value == current or (np.isnan(value) and np.isnan(current)):
+                    continue
+
+                self.ent_float[field][_eid] = value
+                edited      = True
+                structural |= field not in FlowGraph.DATA_FIELDS or bool(np.isnan(value)) != bool(np.isnan(current))
+
+        if  structural:     self.touch_entity(_eid)
+        elif edited:        self.data_revision += 1
+
+        return structural
+
+    def update_connector(self, _cid: int, _symbol: str):
+
+        if  self.conn_symbol[_cid] == _symbol:
+            return
+
+        self.conn_symbol[_cid] = _symbol
+        self.touch(int(self.ent_node[self.conn_origin[_cid]]))
+        self.touch(int(self.ent_node[self.conn_target[_cid]]))
+
+    def set_parameters(self, _nid: int, _rows: list[dict]):
+        """
+        Replace the parameters of a node. Previous parameter-rows are deactivated, unless the node has the same
+        parameters (symbols, in the same order) as before, in which case they are updated in place: edits of values
+        then don't change the model's structure.
+
+        Parameters:
+            _nid (int): Node-id.
+            _rows (list[dict]): One dictionary of entity fields per parameter.
+        """
+
+        current = self.parameters(_nid)
+        if  len(current) == len(_rows) and all(
+            self.ent_text["symbol"][eid] == str(row.get("symbol") or "") for eid, row in zip(current, _rows)
+        ):
+            for eid, row in zip(current, _rows):
+                self.update_entity(eid, **row)
+
+            return
+
+        for eid in self._params[_nid]:
+            self.ent_live[eid] = False
+
+        self._params[_nid] = list()
+        for row in _rows:
+            self.add_entity(_nid, FlowGraph.Kind.PAR, **row)
+
+        self.touch(_nid)
+
+    def set_node_live(self, _nid: int, _state: bool):
+
+        if  self.node_live[_nid] == _state:
+            return
+
+        self.node_live[_nid] = _state
+        self.touch(_nid)
+
+        for eid in self._handles[_nid]:
+            self.touch_entity(eid)
+
+    def set_entity_live(self, _eid: int, _state: bool):
+
+        if  self.ent_live[_eid] == _state:
+            return
+
+        self.ent_live[_eid] = _state
+        self.touch_entity(_eid)
+
+    def set_connector_live(self, _cid: int, _state: bool):
+
+        if  self.conn_live[_cid] == _state:
+            return
+
+        self.conn_live[_cid] = _state
+        self.touch(int(self.ent_node[self.conn_origin[_cid]]))
+        self.touch(int(self.ent_node[self.conn_target[_cid]]))
+
+    # Queries ----------------------------------------------------------------------------------------------------------
+    # Name                      Description
+    # ------------------------------------------------------------------------------------------------------------------
+    # 1. entity_mask            Boolean mask of entities that are active and belong to active nodes.
+    # 2. connector_mask         Boolean mask of connectors whose endpoints are both effectively active.
+    # 3. adjacency              CSR node-adjacency over effectively active connectors (cached per revision).
+    # 4. handles, parameters    Active handle- and parameter-ids of a node.
+    # 5. symbol_of              Model-symbol of a handle (its connector's symbol), or None if unconnected.
+    # 6. compiled               Compiled equations of a node with the model symbol bound to each slot.
+    # 7. substituted            Equations of a node with handle- and parameter-symbols replaced by model symbols.
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def entity_mask(self) -> np.ndarray:
+        return self.ent_live.view & self.node_live.view[self.ent_node.view]
+
+    def connector_mask(self) -> np.ndarray:
+
+        emask = self.entity_mask()
+        return (
+            self.conn_live.view &
+            emask[self.conn_origin.view] &
+            emask[self.conn_target.view]
+        )
+
+    def adjacency(self, _directed: bool = True) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Return the node-adjacency in CSR form. Edges follow the flow-direction (origin node to target node), unless
+        `_directed` is False, in which case every edge is stored in both directions.
+
+        Returns:
+            tuple: (indptr, indices, edges), where `edges` holds the connector-id of each stored edge.
+        """
+
+        # Return cached result:
+        if  self._csr is not None and self._csr_revision == self.revision and self._csr[0] == _directed:
+            return self._csr[1]
+
+        cids = np.flatnonzero(self.connector_mask())
+        src  = self.ent_node.view[self.conn_origin.view[cids]]
+        dst  = self.ent_node.view[self.conn_target.view[cids]]
+
+        if not _directed:
+            src, dst = np.concatenate([src, dst]), np.concatenate([dst, src])
+            cids     = np.concatenate([cids, cids])
+
+        order   = np.argsort(src, kind="stable")
+        indptr  = np.zeros(self.num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=self.num_nodes), out=indptr[1:])
+
+        csr = (indptr, dst[order].astype(np.int32), cids[order].astype(np.int32))
+
+        self._csr = (_directed, csr)
+        self._csr_revision = self.revision
+        return csr
+
+    def nodes(self, _role: int | None = None) -> np.ndarray:
+
+        mask = self.node_live.view
+        if _role is not None:
+            mask = mask & (self.node_role.view == _role)
+
+        return np.flatnonzero(mask)
+
+    def handles(self, _nid: int) -> list[int]:
+        return [eid for eid in self._handles[_nid] if self.ent_live[eid]]
+
+    def parameters(self, _nid: int) -> list[int]:
+        return [eid for eid in self._params[_nid] if self.ent_live[eid]]
+
+    def text(self, _field: str, _eid: int) -> str:  return self.ent_text[_field][_eid]
+
+    def value(self, _field: str, _eid: int) -> float:   return float(self.ent_float[_field][_eid])
+
+    def symbol_of(self, _eid: int) -> str | None:
+
+        cid = int(self.ent_conn[_eid])
+        if (
+            cid < 0 or
+            not self.conn_live[cid] or
+            not self.ent_live[self.conn_origin[cid]] or
+            not self.ent_live[self.conn_target[cid]]
+        ):
+            return None
+
+        return self.conn_symbol[cid]
+
+    def compiled(self, _nid: int) -> list[tuple]:
+        """
+        Return the equations of a node compiled into templates (see `compile_equation`), each with the names bound to
+        its slots: handle-symbols are bound to connector-symbols, and parameter-symbols are prefixed with the node's
+        UID. Equations referencing an unconnected handle are dropped. The result is cached until the node's revision
+        changes, which all edits of connections and symbols do.
+
+        Returns:
+            list: (template, names) of each remaining equation.
+        """
+
+        revision = int(self.node_rev[_nid])
+        cached   = self._compiled.get(_nid)
+        if  cached is not None and cached[0] == revision:
+            return cached[1]
+
+        node_prefix  = self.node_uid[_nid]
+        replacements = dict()
+
+        for eid in self.handles(_nid):
+            replacements[self.ent_text["symbol"][eid]] = self.symbol_of(eid)
+
+        for eid in self.parameters(_nid):
+            symbol = self.ent_text["symbol"][eid]
+            replacements[symbol] = f"{node_prefix}_{symbol}"
+
+        bindings = list()
+        for equation in self.node_eqns[_nid]:
+            template = compile_equation(equation)
+            names    = tuple(map(replacements.get, template.slots, template.slots))
+            if  None not in names:
+                bindings.append((template, names))
+
+        self._compiled[_nid] = (revision, bindings, [template.render(names) for template, names in bindings])
+        return bindings
+
+    def substituted(self, _nid: int) -> list[str]:
+        """
+        Headless equivalent of `Node.substituted()`: the equations of `compiled()`, rendered as text.
+        """
+
+        self.compiled(_nid)
+        return list(self._compiled[_nid][2])
@@ -98,10 +98,12 @@ class Connector(QGraphicsObject):
 
         # Attrib:
         self._cuid = random_id(length=4, prefix='C')
+        self.gid   = -1     # Integer id in the canvas' flow-graph (-1 until registered)
         self._attr = self.Attr()
         self._styl = self.Style()
         self._text = None
         self._is_obsolete = False
+        self._result = None     # Optimal value from the last solve (see `Canvas.apply_results()`)
 
         # Customize behavior:   
         self.setZValue(-1)
@@ -168,6 +170,17 @@ class Connector(QGraphicsObject):
     @property
     def symbol(self):   return self._text.label
 
+    @symbol.setter
+    def symbol(self, value: str):   self._text.label = value
+
+    @property
+    def result(self):   return self._result
+
+    @result.setter
+    def result(self, value: float | None):
+        self._result = value
+        self.setToolTip(f"{self.symbol} = {value:.6g}" if value is not None else "")
+
     @property
     def geometry(self): return self._attr.geom
 
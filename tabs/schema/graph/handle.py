@@ -93,6 +93,7 @@ class Handle(QGraphicsObject, Entity):
         self._attr = self.Attr()
         self._styl = self.Style()
         self._huid = random_id(prefix='H')
+        self.gid   = -1     # Integer id in the canvas' flow-graph (-1 until registered)
 
         self.offset = _coords.toPoint().x()
         self.eclass = _eclass
@@ -409,4 +410,7 @@ class Handle(QGraphicsObject, Entity):
         self._tags.setVisible(_flag)
 
     @property
-    def uid(self):  return self._huid
\ No newline at end of file
+    def uid(self):  return self._huid
+
+    @uid.setter
+    def uid(self, value: str):  self._huid = value
\ No newline at end of file
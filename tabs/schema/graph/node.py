@@ -22,6 +22,8 @@ from actions import *
 from custom  import *
 from util    import *
 
+from tabs.schema.equation import compile_equation
+
 from .anchor import Anchor
 from .handle import Handle
 
@@ -33,6 +35,7 @@ class Node(QGraphicsObject):
     sig_exec_actions = pyqtSignal(AbstractAction)
 
     sig_handle_clicked = pyqtSignal(Handle)
+    sig_handle_created = pyqtSignal(Handle)
     sig_handle_updated = pyqtSignal(Handle)
     sig_handle_removed = pyqtSignal(Handle)
 
@@ -81,6 +84,8 @@ class Node(QGraphicsObject):
 
         # Initialize style and attrib:
         self._nuid = str()
+        self.gid   = -1     # Integer id in the canvas' flow-graph (-1 until registered)
+        self._subs = None   # Substituted equations, keyed by equations and symbol-replacements (see `substituted()`)
         self._spos = _spos
         self._styl = self.Style()
         self._attr = self.Attr()
@@ -91,6 +96,12 @@ class Node(QGraphicsObject):
             EntityClass.EQN:    list()  # List of equations
         })
 
+        # Handle-symbol allocators (R00, R01, ... for inputs and P00, P01, ... for outputs):
+        self._huid = dict({
+            EntityClass.INP:    IdAllocator("R", 2),
+            EntityClass.OUT:    IdAllocator("P", 2)
+        })
+
         # Adjust behaviour:
         self.setPos(_spos)
         self.setAcceptHoverEvents(True)
@@ -312,6 +323,8 @@ class Node(QGraphicsObject):
     # 2. resize                 Resizes the node in discrete steps.
     # 3. create_handle          Creates a new handle.
     # 4. create_huid            Creates a unique identifier for each handle.
+    #    assign_huid            Relabels a handle with a specific identifier.
+    #    release_huid           Returns a deleted handle's identifier to the allocator.
     # 5. on_anchor_clicked      Triggered when an anchor is clicked.
     # 6. on_handle_clicked      Triggered when a handle is clicked.
     # 7. on_handle_updated      Triggered when a handle is updated.
@@ -334,7 +347,7 @@ class Node(QGraphicsObject):
             if state == EntityState.ACTIVE
         ]
 
-        eqns = self._data[EntityClass.EQN].copy()
+        eqns = self._data[EntityClass.EQN]
 
         # Create a dictionary of symbol-replacements:
         replacements  = dict()
@@ -347,15 +360,21 @@ class Node(QGraphicsObject):
         for par in pars:
             replacements[par.symbol] = f"{node_prefix}_{par.symbol}"
 
-        # Modify all equations:
+        # Reuse the last result if neither the equations nor the replacements have changed:
+        key = (tuple(eqns), tuple(replacements.items()))
+        if  self._subs is not None and self._subs[0] == key:
+            return list(self._subs[1])
+
+        # Bind the replacements to the slots of each compiled equation:
         for equation in eqns:
-            tokens = equation.split(' ')
-            update = [replacements.get(token, token) for token in tokens]
+            template = compile_equation(equation)
+            names    = [replacements.get(symbol, symbol) for symbol in template.slots]
 
-            if not None in update:
-                transformed.append(str(" ").join(update))
+            if not None in names:
+                transformed.append(template.render(names))
 
-        return transformed
+        self._subs = (key, transformed)
+        return list(transformed)
 
     def duplicate(self, _canvas = None):
         """
@@ -479,6 +498,7 @@ class Node(QGraphicsObject):
 
         # Add handle to the node's database:
         self[_eclass][_handle] = EntityState.ACTIVE
+        self.sig_handle_created.emit(_handle)
 
         # Return reference to handle:
         return _handle 
@@ -494,22 +514,32 @@ class Node(QGraphicsObject):
         # Validate argument(s):
         if _eclass not in [EntityClass.INP, EntityClass.OUT]: raise ValueError("Expected argument: `EntityClass.INP` or `EntityClass.OUT`")
 
-        # Create a unique handle-identifier:
-        prefix = "P" if _eclass == EntityClass.OUT else "R"
-        id_set = {
-            int(handle.symbol.split(prefix)[1])     # Fetch existing handle-IDs
-            for handle in self[_eclass]             
-        }
+        # Return the smallest unused symbol (prefix + integer):
+        return self._huid[_eclass].acquire()
 
-        # If `id_set` is empty, return prefix + "00":
-        if not id_set:  return prefix + "00"
+    def assign_huid(self, _handle: Handle, _symbol: str):
+        """
+        Relabels a handle with a specific symbol (e.g. when loading a schematic), keeping the allocator in sync. The
+        handle keeps its current symbol if `_symbol` is already taken.
 
-        # Get sequence of integers from 0 to `max(id_set) + 1`, not in `id_set`:
-        sequence = set(range(0, max(id_set) + 2))
-        reusable = sequence - id_set
+        Parameters:
+            _handle (Handle): The handle to relabel.
+            _symbol (str): The requested symbol.
+        """
+
+        if  self._huid[_handle.eclass].claim(_symbol):
+            self._huid[_handle.eclass].release(_handle.symbol)
+            _handle.symbol = _symbol
+
+    def release_huid(self, _handle: Handle):
+        """
+        Returns a deleted handle's symbol to the allocator.
+
+        Parameters:
+            _handle (Handle): The deleted handle.
+        """
 
-        # Return UID (prefix + smallest integer not in `id_set`):
-        return prefix + str(min(reusable)).zfill(2)
+        self._huid[_handle.eclass].release(_handle.symbol)
 
     # Triggered when an anchor is clicked:
     def on_anchor_clicked(self, _coords: QPointF):
@@ -71,6 +71,7 @@ class StreamTerminal(QGraphicsObject):
 
         # Initialize attribute(s):
         self._tuid  = random_id(length=4, prefix='T')
+        self.gid    = -1    # Integer id in the canvas' flow-graph (-1 until registered)
         self._attr  = self.Attr()
         self._style = self.Style()
 
@@ -244,5 +245,8 @@ class StreamTerminal(QGraphicsObject):
     @property
     def uid(self) -> str: return self._tuid
 
+    @uid.setter
+    def uid(self, value: str):  self._tuid = value
+
     @property
     def eclass(self): return self._eclass
\ No newline at end of file
@@ -28,8 +28,18 @@ class JsonLib:
     - decode_json(code: str, canvas):
         Parses a schematic JSON string and reconstructs the corresponding nodes, variables, and connectors
         on the given `Canvas`. All actions are grouped into a single undoable `BatchAction`.
+
+    Schema Revisions:
+    -----------------
+    - 1: Connectors store the scene-positions of their endpoints, and are re-attached by hit-testing the scene.
+    - 2: Nodes, terminals, and variables also store their UIDs, and connectors reference their endpoints by
+         (parent-UID, handle-UID). Endpoints are resolved through a dictionary built during import; revision-1
+         files fall back to hit-testing.
     """
 
+    # Current schema revision:
+    SCHEMA = 2
+
     @staticmethod
     def create_json(_entity: Entity, _eclass: EntityClass):
 
@@ -53,10 +63,11 @@ class JsonLib:
                     f"{prefix}-maximum"  : _entity.maximum,
                 }
         
-        # If entity is a variable, add node- and scene-position:
+        # If entity is a variable, add UID, node- and scene-position:
         if _eclass in [EntityClass.INP, EntityClass.OUT, EntityClass.VAR]:
             
             entity_obj.update({
+                f"{prefix}-uid"      : _entity.uid,
                 f"{prefix}-position" : {
                     "x": _entity.pos().x(),
                     "y": _entity.pos().y()
@@ -91,6 +102,7 @@ class JsonLib:
 
             # JSON-composite:
             node_object = {
+                "node-uid"      : _item.uid,
                 "node-title"    : _item.title,
                 "node-height"   : _item.boundingRect().height(),
                 "node-scenepos" : {
@@ -106,7 +118,9 @@ class JsonLib:
         if isinstance(_item, graph.StreamTerminal):
 
             stream_obj = {
+                "terminal-uid"      : _item.uid,
                 "terminal-class"    : str(_item.socket.eclass),
+                "socket-uid"        : _item.socket.uid,
                 "terminal-label"    : _item.socket.label,
                 "terminal-strid"    : _item.socket.strid,
                 "terminal-color"    : _item.socket.color.name(),
@@ -122,12 +136,14 @@ class JsonLib:
 
             connection_obj = {
                 "origin-parent-uid" : _item.origin.parentItem().uid,
+                "origin-uid"        : _item.origin.uid,
                 "origin-label"      : _item.origin.label,
                 "origin-scenepos"   : {
                     "x": _item.origin.scenePos().x(),
                     "y": _item.origin.scenePos().y()
                 },
                 "target-parent-uid" : _item.target.parentItem().uid,
+                "target-uid"        : _item.target.uid,
                 "target-label"      : _item.target.label,
                 "target-scenepos": {
                     "x": _item.target.scenePos().x(),
@@ -160,6 +176,7 @@ class JsonLib:
 
         # Initialize JSON-objects:
         schematic = {
+            "SCHEMA"     : JsonLib.SCHEMA,
             "NODES"      : node_array,
             "TERMINALS"  : term_array,
             "CONNECTORS" : conn_array
@@ -168,6 +185,35 @@ class JsonLib:
         # Return JSON-string:
         return json.dumps(schematic, indent=4)
 
+    @staticmethod
+    def resolve_endpoint(_json_obj: dict,
+                         _prefix: str,
+                         _handle_map: dict,
+                         _canvas
+                         ):
+        """
+        Resolve a connector's endpoint to the handle created during import.
+
+        Parameters:
+            _json_obj (dict): The connector's JSON-object.
+            _prefix (str): Either "origin" or "target".
+            _handle_map (dict): Saved (parent-UID, handle-UID) -> created handle.
+            _canvas (Canvas): The canvas being populated.
+
+        Returns:
+            Handle | None: The endpoint, or None if it could not be resolved.
+        """
+
+        # Schema revision >= 2: Look up the endpoint by its saved UIDs:
+        if f"{_prefix}-uid" in _json_obj:
+            return _handle_map.get((_json_obj.get(f"{_prefix}-parent-uid"), _json_obj.get(f"{_prefix}-uid")))
+
+        # Schema revision 1: Fall back to hit-testing the saved scene-position:
+        xpos = _json_obj.get(f"{_prefix}-scenepos", {}).get("x", 0.0)
+        ypos = _json_obj.get(f"{_prefix}-scenepos", {}).get("y", 0.0)
+
+        return _canvas.itemAt(QPointF(xpos, ypos), QTransform())
+
     @staticmethod
     def decode_json(_code: str, 
                     _canvas, 
@@ -187,6 +233,9 @@ class JsonLib:
         # Initialize batch-actions:
         batch = BatchActions([])
 
+        # Saved (parent-UID, handle-UID) -> created handle, used to re-attach connectors (schema revision >= 2):
+        handle_map = dict()
+
         # Read node-data, create nodes:
         for element in root.get("NODES", []):
 
@@ -213,7 +262,7 @@ class JsonLib:
             # Load variable(s):
             for variable_obj in element.get("variables", []):
 
-                eclass = variable_obj.get("variable-stream", 0)
+                eclass = variable_obj.get("variable-eclass", variable_obj.get("variable-stream", 0))
                 eclass = EntityClass.INP if eclass == "EntityClass.INP" else EntityClass.OUT
 
                 xpos   = variable_obj.get("variable-position", {}).get("x", 0.0)
@@ -225,7 +274,7 @@ class JsonLib:
                     eclass
                 )
 
-                variable.symbol  = variable_obj.get("variable-symbol", "")
+                node.assign_huid(variable, variable_obj.get("variable-symbol", ""))
                 variable.info    = variable_obj.get("variable-info")
                 variable.label   = variable_obj.get("variable-label")
                 variable.units   = variable_obj.get("variable-units")
@@ -241,6 +290,7 @@ class JsonLib:
 
                 variable.rename(variable.label)
                 variable_action = CreateHandleAction(node, variable)
+                handle_map[(element.get("node-uid"), variable_obj.get("variable-uid"))] = variable
 
                 # Add action to batch:
                 if _group_actions:  batch.add_to_batch(variable_action)
@@ -266,6 +316,9 @@ class JsonLib:
                 # Add parameter to dictionary:
                 node[EntityClass.PAR][parameter] = EntityState.ACTIVE
 
+            # Push the node's data to the flow-graph:
+            _canvas.sync_node(node)
+
         # Load in / outflows:
         for element in root.get("TERMINALS", []):
 
@@ -280,6 +333,7 @@ class JsonLib:
 
                 terminal = _canvas.create_terminal(EntityClass.OUT, spos)
                 action   = CreateStreamAction(_canvas, terminal)
+                handle_map[(element.get("terminal-uid"), element.get("socket-uid"))] = terminal.socket
 
                 stream = _canvas.find_stream(element.get("terminal-strid", ""))
                 terminal.socket.strid = stream.strid
@@ -293,6 +347,7 @@ class JsonLib:
 
                 terminal = _canvas.create_terminal(EntityClass.INP, spos)
                 action   = CreateStreamAction(_canvas, terminal)
+                handle_map[(element.get("terminal-uid"), element.get("socket-uid"))] = terminal.socket
 
                 stream = _canvas.find_stream(element.get("terminal-strid", ""))
                 terminal.socket.label = element.get("terminal-label", "")
@@ -309,13 +364,8 @@ class JsonLib:
         # Now setup connections:
         for json_obj in root.get("CONNECTORS", []):
 
-            sxpos = json_obj.get("origin-scenepos", {}).get("x", 0.0)
-            sypos = json_obj.get("origin-scenepos", {}).get("y", 0.0)
-            txpos = json_obj.get("target-scenepos", {}).get("x", 0.0)
-            typos = json_obj.get("target-scenepos", {}).get("y", 0.0)
-
-            origin = _canvas.itemAt(QPointF(sxpos, sypos), QTransform())
-            target = _canvas.itemAt(QPointF(txpos, typos), QTransform())
+            origin = JsonLib.resolve_endpoint(json_obj, "origin", handle_map, _canvas)
+            target = JsonLib.resolve_endpoint(json_obj, "target", handle_map, _canvas)
 
             if (
                     isinstance(origin, graph.Handle) and
@@ -332,6 +382,7 @@ class JsonLib:
                 # Add connector to database:
                 _canvas.conn_db[connector] = True
                 _canvas.addItem(connector)
+                _canvas.sync_connector(connector)
 
                 # Add action to batch:
                 batch.add_to_batch(ConnectHandleAction(_canvas, connector))
@@ -0,0 +1,67 @@
+import random
+
+import pytest
+
+from util import IdAllocator
+
+
+# Class Reference: Naive allocator that rebuilds the set of used IDs (the behaviour `IdAllocator` replaces)
+class Reference:
+
+    def __init__(self):     self.used = set()
+
+    def acquire(self) -> int:
+
+        index = min(set(range(len(self.used) + 1)) - self.used)
+        self.used.add(index)
+        return index
+
+    def release(self, index: int):  self.used.discard(index)
+
+    def claim(self, index: int) -> bool:
+
+        if  index in self.used:
+            return False
+
+        self.used.add(index)
+        return True
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_reference(seed):
+
+    rng       = random.Random(seed)
+    allocator = IdAllocator("X")
+    reference = Reference()
+
+    for _ in range(2000):
+
+        action = rng.random()
+        if  action < 0.5:
+            assert allocator.parse(allocator.acquire()) == reference.acquire()
+
+        elif action < 0.75 and reference.used:
+            index = rng.choice(sorted(reference.used))
+            allocator.release(allocator.format(index))
+            reference.release(index)
+
+        else:
+            index = rng.randrange(0, max(reference.used, default=0) + 50)
+            assert allocator.claim(allocator.format(index)) == reference.claim(index)
+
+
+def test_claim_far_ahead():
+
+    allocator = IdAllocator("X")
+
+    assert allocator.claim("X99999999")
+    assert allocator.claim("X5")
+    assert not allocator.claim("X5")
+    assert len(allocator._gaps) == 2 and not allocator._heap
+
+    assert [allocator.acquire() for _ in range(6)] == ["X0", "X1", "X2", "X3", "X4", "X6"]
+
+    allocator.release("X2")
+    allocator.release("X7")     # Skipped, hence already free
+    assert allocator.acquire() == "X2"
+    assert allocator.acquire() == "X7"
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from tabs.optima.expression import NonlinearError
+from tabs.optima.linear import LinearModel
+
+
+# Coefficients that depend on parameters, constants on both sides, all relations:
+SCRIPT = """
+param a default 2.0;
+param b default 0.5;
+var x >= 0;
+var y;
+var z <= 4;
+subject to c1: 2*x + a*y >= 4 - x/a;
+subject to c2: -(x - y)*a = 3*(y + 1) + a^2;
+subject to c3: b*z - y/(a + b) <= 7*b;
+subject to c4: x + y + z = x + 1;
+maximize o: x*a/4 - 2*y + 7 - a;
+"""
+
+
+# Function rows: The assembled matrices, in constraint-order, as (coefficients, relation, rhs) with `>=` kept
+def rows(_model: LinearModel, _values: dict | None = None) -> list:
+
+    A_eq, b_eq, A_ub, b_ub, *_ = _model.assemble(_values)
+    eq, ub = iter(zip(A_eq.toarray(), b_eq)), iter(zip(A_ub.toarray(), b_ub))
+
+    result = list()
+    for _, relation, _, _ in _model.constraints:
+        coefs, rhs = next(eq) if relation == "=" else next(ub)
+        result.append((-coefs, relation, -rhs) if relation == ">=" else (coefs, relation, rhs))
+
+    return result
+
+
+@pytest.mark.parametrize("values", [None, {"a": 5.0}, {"a": -1.5, "b": 3.0}])
+def test_assemble_matches_rows(values):
+
+    model      = LinearModel(SCRIPT)
+    parameters = model.parameters(values)
+
+    # Each row of the matrices matches the row linearized on its own:
+    for (coefs, relation, rhs), (_, expected, lhs, rhs_tree) in zip(rows(model, values), model.constraints):
+
+        linear, constant = model.row(lhs, rhs_tree, parameters)
+        dense            = np.zeros(len(model.variables))
+        for symbol, value in linear.items():
+            dense[model.index[symbol]] = value
+
+        assert relation == expected
+        assert coefs == pytest.approx(dense)
+        assert rhs == pytest.approx(constant)
+
+    *_, c, c0, sense, _ = model.assemble(values)
+    assert sense == "maximize"
+    assert c == pytest.approx([parameters["a"] / 4, -2.0, 0.0])
+    assert c0 == pytest.approx(7.0 - parameters["a"])
+
+
+def test_undefined_coefficient():
+
+    with pytest.raises(NonlinearError):
+        LinearModel(SCRIPT).assemble({"a": 0.0})
+
+
+def test_long_sums():
+
+    # Sums of thousands of terms, as in networks of many streams:
+    n      = 5000
+    script = "".join(f"var x{i} >= 0;\n" for i in range(n))
+    script+= "subject to total: " + " + ".join(f"2*x{i}" for i in range(n)) + " >= 1;\n"
+    script+= "minimize cost: " + " + ".join(f"x{i}" for i in range(n)) + ";\n"
+
+    A_eq, b_eq, A_ub, b_ub, c, c0, sense, _ = LinearModel(script).assemble()
+    assert A_eq.shape == (0, n) and A_ub.nnz == n
+    assert A_ub.toarray() == pytest.approx(-2.0 * np.ones((1, n)))
+    assert b_ub == pytest.approx([-1.0])
+    assert c == pytest.approx(np.ones(n))
@@ -0,0 +1,51 @@
+from tabs.schema.flowgraph import FlowGraph
+from tabs.optima.structure import StructureAnalyzer
+
+
+# Function chain: A source feeding a chain of splitters, each with an extra (redundant) equation
+def chain(_nodes: int) -> tuple[FlowGraph, list]:
+
+    graph = FlowGraph()
+    kind  = FlowGraph.Kind
+
+    source = graph.add_node("S0", _role=FlowGraph.Role.TERMINAL)
+    last   = graph.add_entity(source, kind.OUT, symbol="P00", value="100")
+    nids   = list()
+
+    for index in range(_nodes):
+
+        nid  = graph.add_node(f"N{index:04d}")
+        feed = graph.add_entity(nid, kind.INP, symbol="R00")
+        main = graph.add_entity(nid, kind.OUT, symbol="P00")
+        side = graph.add_entity(nid, kind.OUT, symbol="P01")
+        graph.add_entity(nid, kind.PAR, symbol="k", value="0.9")
+        graph.update_node(nid, equations=["P00 = k * R00", "P01 = R00 - P00", "P00 + P01 = R00"])
+
+        sink = graph.add_node(f"T{index:04d}", _role=FlowGraph.Role.TERMINAL)
+        graph.add_connector(last, feed, f"X{index}")
+        graph.add_connector(side, graph.add_entity(sink, kind.INP, symbol="R00"), f"Y{index}")
+        nids.append(nid)
+        last = main
+
+    return graph, nids
+
+
+def report(_analyzer: StructureAnalyzer) -> tuple:
+
+    result = _analyzer.analyze()
+    return result.matched, result.overdetermined, result.undetermined, result.blocks, result.nodes
+
+
+def test_rename_node():
+
+    graph, nids = chain(5)
+    analyzer    = StructureAnalyzer(graph)
+    assert "N0002" in analyzer.analyze().nodes
+
+    # Renaming a node changes the names of its equations, also when only its segment of the stack is re-read:
+    graph.update_node(nids[2], uid="M0002")
+    result = analyzer.analyze()
+
+    assert "N0002" not in result.nodes and "M0002" in result.nodes
+    assert all(name.startswith("equation_M0002_") for name in result.nodes["M0002"][0])
+    assert report(analyzer) == report(StructureAnalyzer(graph))
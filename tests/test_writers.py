@@ -0,0 +1,474 @@
+import math
+
+import numpy as np
+import pytest
+from scipy.optimize import linprog
+
+from tabs.optima.expression import fold
+from tabs.optima.linear import LinearSession
+from tabs.optima.script import ScriptModel
+from tabs.optima.writers import write_lp, write_mps, write_nl
+
+
+# Tolerance of objective values and constraint residuals:
+TOL = 1e-7
+
+
+# Class Reference: A linear model as read back from a model-file
+class Reference:
+    """
+    Rows are kept as (coefficients, relation, rhs) with relation in "<=", ">=", "=", bounds as (lower, upper).
+    """
+
+    def __init__(self):
+
+        self.sense  = "minimize"
+        self.obj    = dict()
+        self.offset = 0.0
+        self.rows   = dict()
+        self.bounds = dict()
+
+    def variables(self) -> list:
+        return list(self.bounds)
+
+    def solve(self):
+        """
+        Solve the model with scipy's HiGHS and return (objective value, solution as a dict).
+        """
+
+        columns = {symbol: column for column, symbol in enumerate(self.variables())}
+        c = np.zeros(len(columns))
+        for symbol, value in self.obj.items():
+            c[columns[symbol]] = value
+
+        A_eq, b_eq, A_ub, b_ub = [], [], [], []
+        for coefs, relation, rhs in self.rows.values():
+
+            row = np.zeros(len(columns))
+            for symbol, value in coefs.items():
+                row[columns[symbol]] = value
+
+            if  relation == "=":    A_eq.append(row);   b_eq.append(rhs)
+            elif relation == "<=":  A_ub.append(row);   b_ub.append(rhs)
+            else:                   A_ub.append(-row);  b_ub.append(-rhs)
+
+        sign   = -1.0 if self.sense == "maximize" else 1.0
+        result = linprog(sign * c,
+                         A_ub=np.array(A_ub) if A_ub else None, b_ub=b_ub or None,
+                         A_eq=np.array(A_eq) if A_eq else None, b_eq=b_eq or None,
+                         bounds=[(None if lo == -math.inf else lo, None if hi == math.inf else hi)
+                                 for lo, hi in self.bounds.values()],
+                         method="highs")
+
+        assert result.status == 0, result.message
+        return float(c @ result.x + self.offset), dict(zip(columns, result.x.tolist()))
+
+    def check(self, _solution: dict):
+        """
+        Assert that a solution satisfies every row and bound, and return its objective value.
+        """
+
+        for name, (coefs, relation, rhs) in self.rows.items():
+
+            value = sum(coef * _solution[symbol] for symbol, coef in coefs.items())
+            if  relation in ("<=", "="):    assert value <= rhs + TOL * max(1.0, abs(rhs)), name
+            if  relation in (">=", "="):    assert value >= rhs - TOL * max(1.0, abs(rhs)), name
+
+        for symbol, (lower, upper) in self.bounds.items():
+            assert lower - TOL <= _solution[symbol] <= upper + TOL, symbol
+
+        return sum(coef * _solution[symbol] for symbol, coef in self.obj.items()) + self.offset
+
+
+# Function read_lp: Reads a CPLEX-LP file written by `write_lp`
+def read_lp(_path: str) -> Reference:
+
+    model    = Reference()
+    sections = {"minimize": [], "maximize": [], "subject to": [], "bounds": []}
+    current  = None
+
+    with open(_path) as file:
+        for line in file:
+
+            line = line.split("\\", 1)[0].strip()
+            if  line.lower() in sections:
+                current = sections[line.lower()]
+                if  line.lower() in ("minimize", "maximize"):
+                    model.sense = line.lower()
+
+            elif line and line.lower() != "end":
+                current.append(line)
+
+    # Objective and rows, as one token stream each (rows are continued across lines):
+    def terms(_tokens: list) -> tuple:
+
+        coefs, const, index = dict(), 0.0, 0
+        while index < len(_tokens) and _tokens[index] in "+-":
+
+            value = float(_tokens[index + 1]) * (-1.0 if _tokens[index] == "-" else 1.0)
+            if  index + 2 < len(_tokens) and _tokens[index + 2] not in ("+", "-", "<=", ">=", "="):
+                coefs[_tokens[index + 2]] = coefs.get(_tokens[index + 2], 0.0) + value
+                index += 3
+
+            else:
+                const += value
+                index += 2
+
+        return coefs, const, _tokens[index:]
+
+    objective = " ".join(sections[model.sense]).split()
+    model.obj, model.offset, _ = terms(objective[1:])
+
+    tokens = " ".join(sections["subject to"]).split()
+    starts = [index for index, token in enumerate(tokens) if token.endswith(":")] + [len(tokens)]
+    for start, stop in zip(starts, starts[1:]):
+
+        coefs, _, rest = terms(tokens[start + 1:stop])
+        model.rows[tokens[start][:-1]] = (coefs, rest[0], float(rest[1]))
+
+    for line in sections["bounds"]:
+
+        tokens = line.split()
+        if  tokens[-1] == "free":   model.bounds[tokens[0]] = (-math.inf, math.inf)
+        elif tokens[1] == "=":      model.bounds[tokens[0]] = (float(tokens[2]), float(tokens[2]))
+        else:
+            upper = float(tokens[4]) if len(tokens) == 5 else math.inf
+            model.bounds[tokens[2]] = (float(tokens[0]), upper)
+
+    return model
+
+
+# Function read_mps: Reads a free-format MPS-file written by `write_mps`
+def read_mps(_path: str) -> Reference:
+
+    model     = Reference()
+    relations = {"E": "=", "L": "<=", "G": ">="}
+    kinds     = dict()
+    objective = None
+    section   = None
+
+    with open(_path) as file:
+        for line in file:
+
+            tokens = line.split()
+            if  not line[0].isspace():
+                section = tokens[0]
+                continue
+
+            if  section == "OBJSENSE":
+                model.sense = "maximize" if tokens[0] == "MAX" else "minimize"
+
+            elif section == "ROWS":
+                if  tokens[0] == "N":   objective = tokens[1]
+                else:
+                    kinds[tokens[1]]      = relations[tokens[0]]
+                    model.rows[tokens[1]] = (dict(), relations[tokens[0]], 0.0)
+
+            elif section == "COLUMNS":
+                symbol = tokens[0]
+                model.bounds.setdefault(symbol, (0.0, math.inf))
+                for row, value in zip(tokens[1::2], tokens[2::2]):
+                    if  row == objective:   model.obj[symbol] = float(value)
+                    else:                   model.rows[row][0][symbol] = float(value)
+
+            elif section == "RHS":
+                for row, value in zip(tokens[1::2], tokens[2::2]):
+                    if  row == objective:   model.offset = -float(value)
+                    else:                   model.rows[row] = (model.rows[row][0], kinds[row], float(value))
+
+            elif section == "BOUNDS":
+                kind, symbol = tokens[0], tokens[2]
+                lower, upper = model.bounds.get(symbol, (0.0, math.inf))
+
+                if  kind == "FR":   lower, upper = -math.inf, math.inf
+                elif kind == "MI":  lower = -math.inf
+                elif kind == "FX":  lower = upper = float(tokens[3])
+                elif kind == "LO":  lower = float(tokens[3])
+                elif kind == "UP":  upper = float(tokens[3])
+
+                model.bounds[symbol] = (lower, upper)
+
+    return model
+
+
+# Function read_nl: Reads a linear .nl-file (text format) written by `write_nl`
+def read_nl(_path: str) -> Reference:
+
+    model = Reference()
+    stem  = _path.rsplit(".", 1)[0]
+
+    with open(f"{stem}.col") as file:   columns = file.read().split()
+    with open(f"{stem}.row") as file:   rows    = file.read().split()
+    with open(_path) as file:           lines   = [line.split("#", 1)[0].split() for line in file]
+
+    n_vars, n_cons, n_objs = map(int, lines[1][:3])
+    assert lines[2][:2] == ["0", "0"], "only linear models can be read back"
+    assert len(columns) == n_vars and len(rows) == n_cons + n_objs
+
+    constraints = [dict() for _ in range(n_cons)]
+    relations   = {1: "<=", 2: ">=", 4: "="}
+    counts      = [0] * n_vars
+    cumulative  = None
+    index       = 10
+
+    while index < len(lines):
+
+        head, index = lines[index], index + 1
+        kind, arg   = head[0][0], head[0][1:]
+
+        if  kind == "C":
+            assert lines[index] == ["n0"]
+            index += 1
+
+        elif kind == "O":
+            model.sense  = "maximize" if head[1] == "1" else "minimize"
+            model.offset = float(lines[index][0][1:])
+            index += 1
+
+        elif kind == "x":
+            index += int(arg)
+
+        elif kind == "r":
+            for row in range(n_cons):
+                relation, value = lines[index + row]
+                model.rows[rows[row]] = (constraints[row], relations[int(relation)], float(value))
+            index += n_cons
+
+        elif kind == "b":
+            for column in range(n_vars):
+                code, *values = lines[index + column]
+                values = [float(value) for value in values]
+
+                if  code == "0":    bounds = (values[0], values[1])
+                elif code == "1":   bounds = (-math.inf, values[0])
+                elif code == "2":   bounds = (values[0], math.inf)
+                elif code == "3":   bounds = (-math.inf, math.inf)
+                else:               bounds = (values[0], values[0])
+
+                model.bounds[columns[column]] = bounds
+            index += n_vars
+
+        elif kind == "k":
+            cumulative = [int(line[0]) for line in lines[index:index + int(arg)]]
+            index += int(arg)
+
+        elif kind in "JG":
+            for line in lines[index:index + int(head[1])]:
+                column, value = int(line[0]), float(line[1])
+                if  kind == "J":
+                    constraints[int(arg)][columns[column]] = value
+                    counts[column] += 1
+                else:
+                    model.obj[columns[column]] = value
+            index += int(head[1])
+
+    # The column counts of the Jacobian must match its entries:
+    assert cumulative == np.cumsum(counts[:-1]).tolist()
+    return model
+
+
+# Synthetic models:
+PRODUCTION = """
+param N0000_price default 3.0;
+param N0000_cap default 40.0;
+var X0 >= 0, <= 30;
+var X1 >= 0;
+var X2 >= -5, <= 5;
+var X3;
+var X4 = 2.0;
+subject to capacity: X0 + 2*X1 <= N0000_cap;
+subject to demand: X0 + X1 >= 10;
+subject to balance: X3 = 0.5*X0 - X1 + X2;
+subject to mix: X2 - X0/4 >= -8 + X4;
+maximize profit: N0000_price*X0 + 2*X1 - X3 + 7;
+"""
+
+BALANCE = """
+param N0001_eta default 0.8;
+var X0 >= 0;
+var X1;
+var X2 >= 0;
+subject to feed: X0 = 100;
+subject to conv: X1 = N0001_eta*X0;
+subject to loss: X2 = X0 - X1;
+"""
+
+
+# Function synthetic: A random feasible, bounded linear model
+def synthetic(_seed: int, _vars: int = 12, _rows: int = 8) -> str:
+
+    rng    = np.random.default_rng(_seed)
+    x0     = rng.uniform(1.0, 9.0, _vars)
+    script = "".join(f"var X{column} >= 0, <= 10;\n" for column in range(_vars))
+
+    for row in range(_rows):
+
+        coefs  = rng.normal(size=_vars) * (rng.random(_vars) < 0.6)
+        lhs    = " + ".join(f"({float(value)!r})*X{column}" for column, value in enumerate(coefs) if value) or "0"
+        rhs    = float(coefs @ x0)
+        if  row % 3 == 0:   script += f"subject to r{row}: {lhs} = {rhs!r};\n"
+        elif row % 3 == 1:  script += f"subject to r{row}: {lhs} <= {rhs + rng.uniform(0, 5)!r};\n"
+        else:               script += f"subject to r{row}: {lhs} >= {rhs - rng.uniform(0, 5)!r};\n"
+
+    cost   = " + ".join(f"({float(value)!r})*X{column}" for column, value in enumerate(rng.normal(size=_vars)))
+    sense  = "maximize" if _seed % 2 else "minimize"
+    return script + f"{sense} cost: {cost} - 1.5;\n"
+
+
+MODELS  = {"production": PRODUCTION, "balance": BALANCE, **{f"random{seed}": synthetic(seed) for seed in range(4)}}
+FORMATS = {"lp": (write_lp, read_lp), "mps": (write_mps, read_mps), "nl": (write_nl, read_nl)}
+
+
+# Function native: Reference solve of a script with the linear backend
+def native(_script: str, _values: dict | None = None):
+
+    session = LinearSession()
+    assert session.accepts(_script), session.error
+    session.load(_script, None, _values)
+
+    solution = session.solve()
+    assert solution is not None, session.error
+    return solution
+
+
+@pytest.mark.parametrize("extension", FORMATS)
+@pytest.mark.parametrize("name", MODELS)
+def test_round_trip(tmp_path, name, extension):
+
+    write, read = FORMATS[extension]
+    script      = MODELS[name]
+    solution    = native(script)
+    path        = write(script, str(tmp_path / f"{name}.{extension}"))
+    model       = read(path)
+
+    assert sorted(model.variables()) == sorted(solution.var_dict)
+
+    # Same optimum as the linear backend, which is also feasible in the model read back:
+    objective, _ = model.solve()
+    attained     = model.check(solution.var_dict)
+    assert attained == pytest.approx(objective, rel=TOL, abs=TOL)
+
+    if  solution.obj_dict:
+        assert objective == pytest.approx(next(iter(solution.obj_dict.values())), rel=TOL, abs=TOL)
+
+
+@pytest.mark.parametrize("extension", FORMATS)
+def test_parameter_values(tmp_path, extension):
+
+    write, read = FORMATS[extension]
+    values      = {"N0000_price": 0.5, "N0000_cap": 25.0}
+    solution    = native(PRODUCTION, values)
+    model       = read(write(PRODUCTION, str(tmp_path / f"production.{extension}"), values))
+
+    objective, _ = model.solve()
+    assert objective == pytest.approx(solution.obj_dict["profit"], rel=TOL, abs=TOL)
+
+
+@pytest.mark.parametrize("extension", FORMATS)
+def test_balance_solution(tmp_path, extension):
+
+    write, read = FORMATS[extension]
+    model       = read(write(BALANCE, str(tmp_path / f"balance.{extension}")))
+
+    _, x = model.solve()
+    assert x == pytest.approx({"X0": 100.0, "X1": 80.0, "X2": 20.0}, rel=TOL)
+
+
+# A nonlinear model: nonlinear rows and objective, and a variable (V) that only occurs in a linear row:
+NONLINEAR = """
+param a default 3.0;
+var x >= 0.5, <= 2;
+var y;
+var z >= 0;
+var w;
+var V >= 0;
+subject to lin: y + 2*V <= 10;
+subject to prod: x*y + z = a;
+subject to curve: z >= log(x) - w^2/4 + max(x, y);
+minimize cost: exp(x) - 2*w/(1 + z) - a;
+"""
+
+# Operators of the .nl-expressions written by `write_nl`, by opcode:
+NL_BINARY = {"o0": float.__add__, "o1": float.__sub__, "o2": float.__mul__, "o3": float.__truediv__, "o5": pow}
+NL_UNARY  = {"o15": abs, "o16": float.__neg__, "o38": math.tan, "o39": math.sqrt, "o41": math.sin,
+             "o42": math.log10, "o43": math.log, "o44": math.exp, "o46": math.cos}
+NL_LIST   = {"o11": min, "o12": max}
+
+
+# Function nl_value: Evaluates the prefix-expression at the start of `_lines`, removing its lines
+def nl_value(_lines: list, _x: list) -> float:
+
+    token = _lines.pop(0)[0]
+
+    if  token[0] == "n":    return float(token[1:])
+    if  token[0] == "v":    return float(_x[int(token[1:])])
+    if  token in NL_UNARY:  return NL_UNARY[token](nl_value(_lines, _x))
+    if  token in NL_LIST:   return NL_LIST[token](nl_value(_lines, _x) for _ in range(int(_lines.pop(0)[0])))
+
+    lhs = nl_value(_lines, _x)
+    return NL_BINARY[token](lhs, nl_value(_lines, _x))
+
+
+# Function read_segments: Reads the header and the segments of a .nl-file written by `write_nl`
+def read_segments(_path: str) -> tuple[list, dict]:
+    """
+    Returns:
+        tuple: (header, segments), the header as the tokens of its ten lines, and the segments by their first token
+            (e.g. "C0", "J1", "r"), each as the tokens of its lines.
+    """
+
+    with open(_path) as file:
+        lines = [line.split("#", 1)[0].split() for line in file]
+
+    segments, current = dict(), None
+    for line in lines[10:]:
+
+        # Segment heads are a letter and an index, body-lines start with a digit or a letter of an expression:
+        if  line[0][0] in "COxrbkJG" and (line[0][1:].isdigit() or line[0] in ("r", "b")):
+            current = segments.setdefault(line[0], list())
+
+        else:
+            current.append(line)
+
+    return lines[:10], segments
+
+
+def test_nonlinear_nl(tmp_path):
+
+    path             = write_nl(NONLINEAR, str(tmp_path / "nonlinear.nl"))
+    header, segments = read_segments(path)
+    with open(tmp_path / "nonlinear.col") as file:  columns = file.read().split()
+    with open(tmp_path / "nonlinear.row") as file:  names   = file.read().split()
+
+    # Nonlinear rows and variables first, and the variables of the nonlinear parts counted in the header:
+    assert names == ["prod", "curve", "lin", "cost"]
+    assert sorted(columns[:4]) == ["w", "x", "y", "z"] and columns[4] == "V"
+    assert header[1][:5] == ["5", "3", "1", "0", "1"]
+    assert header[2] == ["2", "1"] and header[4] == ["4", "4", "4"]
+
+    # The variables of nonlinear rows are listed in the Jacobian (and gradient) at coefficient zero:
+    jacobian = [{int(column): float(value) for column, value in segments[f"J{row}"]} for row in range(3)]
+    gradient = {int(column): float(value) for column, value in segments["G0"]}
+
+    assert {columns[column] for column in jacobian[0]} == {"x", "y", "z"} and not any(jacobian[0].values())
+    assert {columns[column] for column in jacobian[1]} == {"x", "y", "z", "w"} and not any(jacobian[1].values())
+    assert {columns[column]: value for column, value in jacobian[2].items()} == {"y": 1.0, "V": 2.0}
+    assert {columns[column] for column in gradient} == {"x", "z", "w"} and not any(gradient.values())
+    assert segments["C2"] == [["n0"]]
+
+    # Rows (as `body - rhs`) and the objective evaluate to the script's values at a random point:
+    model    = ScriptModel(NONLINEAR)
+    point    = dict(zip(model.variables, np.random.default_rng(7).uniform(0.5, 2.0, len(model.variables))))
+    values   = {**model.parameters(), **point}
+    expected = {name: fold(("sub", lhs, rhs), values)[1] for name, _, lhs, rhs in model.constraints}
+    expected.update({name: fold(tree, values)[1] for name, _, tree in model.objectives})
+
+    x      = [point[symbol] for symbol in columns]
+    bodies = [(segments[f"C{row}"], jacobian[row], float(segments["r"][row][1])) for row in range(3)]
+    bodies+= [(segments["O0"], gradient, 0.0)]
+
+    for name, (lines, linear, rhs) in zip(names, bodies):
+
+        lines = list(lines)
+        value = nl_value(lines, x) + sum(coef * x[column] for column, coef in linear.items()) - rhs
+        assert not lines and value == pytest.approx(expected[name], rel=1e-12)
@@ -2,6 +2,8 @@ from PyQt6.QtCore import Qt
 from PyQt6.QtGui  import QColor
 from enum         import Enum
 
+import bisect
+import heapq
 import string
 import random
 
@@ -51,6 +53,145 @@ def random_id(length: int = 4, prefix: str = ""):
 
     return prefix + ''.join(random.choices(string.digits, k=length))
 
+# Class IdAllocator: Hands out the smallest unused integer ID for a given prefix:
+class IdAllocator:
+    """
+    Free-list allocator for prefixed identifiers (e.g. X0, X1, ... or N0000, N0001, ...). Released IDs are kept in a
+    min-heap, so that `acquire()` always returns the smallest unused ID in O(log n) instead of rebuilding the set of
+    live IDs on every call. IDs skipped by `claim()` are kept as ranges, so claiming a large ID (e.g. from a file)
+    costs O(1) memory instead of one heap-entry per skipped ID.
+    """
+
+    # Initializer:
+    def __init__(self, prefix: str, width: int = 0):
+        """
+        Initialize an allocator.
+
+        Args:
+            prefix (str): Prefix of the generated IDs.
+            width (int): Minimum number of digits (zero-padded) of the generated IDs.
+        """
+
+        self.prefix = prefix
+        self.width  = width
+
+        self._next = 0          # Smallest ID that has never been handed out
+        self._heap = list()     # Min-heap of released IDs (may contain stale entries)
+        self._free = set()      # Released IDs
+        self._gaps = list()     # Sorted, disjoint (start, stop) ranges of IDs skipped by `claim()`
+
+    def format(self, index: int) -> str:    return self.prefix + str(index).zfill(self.width)
+
+    def _gap(self, index: int) -> int | None:
+        """
+        Returns the position of the skipped range containing an ID, or None.
+        """
+
+        position = bisect.bisect_right(self._gaps, index, key=lambda gap: gap[0]) - 1
+        if  position >= 0 and index < self._gaps[position][1]:
+            return position
+
+        return None
+
+    def parse(self, uid: str) -> int | None:
+        """
+        Returns the integer part of an ID, or None if the ID does not belong to this allocator.
+        """
+
+        if (
+            not isinstance(uid, str) or
+            not uid.startswith(self.prefix) or
+            not uid[len(self.prefix):].isdigit()
+        ):
+            return None
+
+        return int(uid[len(self.prefix):])
+
+    def acquire(self) -> str:
+        """
+        Returns the smallest unused ID and marks it as used.
+        """
+
+        # Drop stale heap-entries:
+        while self._heap and self._heap[0] not in self._free:
+            heapq.heappop(self._heap)
+
+        # Reuse the smallest released or skipped ID first:
+        if  self._gaps and (not self._heap or self._gaps[0][0] < self._heap[0]):
+            start, stop   = self._gaps[0]
+            self._gaps[0] = (start + 1, stop)
+            if  start + 1 == stop:
+                self._gaps.pop(0)
+
+            return self.format(start)
+
+        if  self._heap:
+            index = heapq.heappop(self._heap)
+            self._free.discard(index)
+            return self.format(index)
+
+        self._next += 1
+        return self.format(self._next - 1)
+
+    def release(self, uid: str) -> None:
+        """
+        Marks an ID as unused, making it available to `acquire()`.
+        """
+
+        index = self.parse(uid)
+        if (
+            index is None or
+            index >= self._next or
+            index in self._free or
+            self._gap(index) is not None
+        ):
+            return
+
+        self._free.add(index)
+        heapq.heappush(self._heap, index)
+
+    def claim(self, uid: str) -> bool:
+        """
+        Marks a specific ID as used (e.g. when an item is reactivated by undo/redo, or loaded from a file).
+
+        Returns:
+            bool: True if the ID was unused and is now claimed, False otherwise.
+        """
+
+        index = self.parse(uid)
+        if index is None:
+            return False
+
+        # Release the IDs skipped over, as one range (merged with an adjacent one):
+        if  index >= self._next:
+            if  index > self._next and self._gaps and self._gaps[-1][1] == self._next:
+                self._gaps[-1] = (self._gaps[-1][0], index)
+
+            elif index > self._next:
+                self._gaps.append((self._next, index))
+
+            self._next = index + 1
+            return True
+
+        if  index in self._free:
+            self._free.discard(index)   # Stale heap-entry is skipped by `acquire()`
+            return True
+
+        # Split the skipped range containing the ID:
+        position = self._gap(index)
+        if  position is not None:
+            start, stop = self._gaps[position]
+            self._gaps[position:position + 1] = [gap for gap in ((start, index), (index + 1, stop)) if gap[0] < gap[1]]
+            return True
+
+        return False
+
+    def reset(self) -> None:
+        self._next = 0
+        self._heap.clear()
+        self._free.clear()
+        self._gaps.clear()
+
 # Generate a random color:
 def random_hex():   return "#{:06x}".format(random.randint(0, 0xffffff))
 